@@ -1,8 +1,9 @@
 """
 Configuration settings for the application
 """
+from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -26,6 +27,64 @@ class Settings(BaseSettings):
     neo4j_uri: str = "bolt://localhost:7687"
     neo4j_user: str = "neo4j"
     neo4j_password: str = "password"
+    neo4j_database: Optional[str] = None
+
+    # Neo4j connection pool and transactions (times in seconds)
+    neo4j_max_connection_pool_size: int = 100
+    neo4j_connection_acquisition_timeout: float = 60.0
+    neo4j_max_connection_lifetime: float = 3600.0
+    neo4j_max_transaction_retry_time: float = 30.0
+    neo4j_transaction_timeout: Optional[float] = None
+    neo4j_fetch_size: int = 1000
+
+    # Neo4j read query result cache (size 0 disables it)
+    neo4j_query_cache_size: int = 1024
+    neo4j_query_cache_ttl_seconds: float = 60.0
+
+    # Neo4j slow query log (threshold 0 disables it); slow reads can be
+    # sampled and re-run with PROFILE, keeping the last plans for /api/admin
+    neo4j_slow_query_threshold_ms: float = 500.0
+    neo4j_slow_query_buffer_size: int = 100
+    neo4j_profile_slow_queries: bool = False
+    neo4j_profile_sample_rate: float = 0.1
+
+    # Demo-mode course data (used when Neo4j is not connected)
+    demo_data_path: str = "data/course_data.json"
+
+    # Knowledge Tracking
+    irt_parameters_path: str = "data/irt_parameters.json"
+    # Course → knowledge domains JSON mapping; the built-in mapping when unset
+    course_domains_path: Optional[str] = None
+    knowledge_state_max_students: int = 100000
+    # Evidence of one course score: a score of s counts as s% of this many
+    # binomial trials, so the N(0, 1) prior does not squeeze mastery levels
+    knowledge_score_trials: float = Field(10.0, gt=0)
+
+    # Cache-Control max-age (seconds) of catalog-wide GET endpoints
+    catalog_cache_max_age: int = 60
+
+    # Course autocomplete: completions precomputed per trie node
+    suggest_top_k: int = 10
+
+    # Prerequisite closure: ancestor/descendant sets kept per direction
+    prerequisite_closure_cache_size: int = 4096
+
+    # Learning path planning
+    semester_credit_cap: float = 20.0
+
+    # Recommendation cache (size 0 disables it)
+    recommendation_cache_size: int = 10000
+    recommendation_cache_ttl_seconds: float = 300.0
+    recommendation_cache_quantum: float = Field(0.05, gt=0)
+    # Students × courses cells scored per batch matrix pass (~90 bytes each)
+    recommendation_batch_max_cells: int = 2_000_000
+
+    # Prometheus metrics: request timing middleware and the /metrics endpoint
+    metrics_enabled: bool = True
+
+    # Admin endpoints (/api/admin) are only mounted when a token is set;
+    # requests must send it as "Authorization: Bearer <token>"
+    admin_api_token: Optional[str] = None
 
     # Security
     secret_key: str = "your-secret-key-change-in-production"
@@ -1,4 +1,9 @@
 """Database package"""
-from app.database.neo4j_driver import neo4j_driver, get_neo4j_driver
+from app.database.neo4j_driver import (
+    neo4j_driver,
+    get_neo4j_driver,
+    async_neo4j_driver,
+    get_async_neo4j_driver
+)
 
-__all__ = ["neo4j_driver", "get_neo4j_driver"]
+__all__ = ["neo4j_driver", "get_neo4j_driver", "async_neo4j_driver", "get_async_neo4j_driver"]
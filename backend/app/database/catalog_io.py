@@ -0,0 +1,136 @@
+"""
+Course catalog files - course_data.json and the bulk directory format
+
+The JSON format is a single ``{"courses": [...], "relationships": [...]}``
+document. The bulk format is a directory holding one JSON record per line,
+so large catalogs can be streamed and imported in batches:
+
+    manifest.json        format marker and record counts
+    courses.jsonl        one course per line
+    relationships.jsonl  one {"from", "to"} prerequisite edge per line
+    domains.json         optional course label → knowledge domains mapping
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+from itertools import islice
+from pathlib import Path
+import json
+
+BULK_FORMAT = "smartpath-bulk"
+BULK_FORMAT_VERSION = 1
+BULK_FILES = {"courses": "courses.jsonl", "relationships": "relationships.jsonl"}
+
+
+def _dumps(record: Mapping[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(", ", ": "))
+
+
+def is_bulk_catalog(path: Union[str, Path]) -> bool:
+    """Whether a path is a bulk catalog directory"""
+    return (Path(path) / "manifest.json").is_file()
+
+
+def read_manifest(directory: Union[str, Path]) -> Dict[str, Any]:
+    """Read and check the manifest of a bulk catalog directory"""
+    with open(Path(directory) / "manifest.json", 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BULK_FORMAT:
+        raise ValueError(f"Not a bulk course catalog: {directory}")
+    return manifest
+
+
+def iter_bulk_records(directory: Union[str, Path], kind: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of a bulk catalog
+
+    Args:
+        directory: Bulk catalog directory
+        kind: "courses" or "relationships"
+    """
+    with open(Path(directory) / BULK_FILES[kind], 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batched(records: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most ``batch_size`` items"""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def load_catalog(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Load a catalog from a course_data.json-style file or a bulk directory
+
+    Returns:
+        Dictionary with ``courses`` and ``relationships`` lists, plus
+        ``domains`` when the bulk directory has a domain mapping
+    """
+    path = Path(path)
+    if not path.is_dir():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    read_manifest(path)
+    catalog = {
+        "courses": list(iter_bulk_records(path, "courses")),
+        "relationships": list(iter_bulk_records(path, "relationships"))
+    }
+    domains_file = path / "domains.json"
+    if domains_file.is_file():
+        with open(domains_file, 'r', encoding='utf-8') as f:
+            catalog["domains"] = json.load(f)
+    return catalog
+
+
+def write_course_data(catalog: Mapping[str, Any], path: Union[str, Path]) -> Path:
+    """Write the courses and relationships of a catalog as course_data.json, one record per line"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("{\n")
+        for n, kind in enumerate(("courses", "relationships")):
+            records = catalog[kind]
+            f.write(f'  "{kind}": [\n')
+            f.write(",\n".join(f"    {_dumps(record)}" for record in records))
+            f.write("\n  ]" + (",\n" if n == 0 else "\n"))
+        f.write("}\n")
+    return path
+
+
+def write_bulk(catalog: Mapping[str, Any],
+               directory: Union[str, Path],
+               metadata: Optional[Mapping[str, Any]] = None) -> Path:
+    """
+    Write a catalog as a bulk directory
+
+    Args:
+        catalog: Dictionary with ``courses``, ``relationships`` and optionally ``domains``
+        directory: Output directory (created if missing)
+        metadata: Extra manifest entries, e.g. generator parameters
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for kind, filename in BULK_FILES.items():
+        with open(directory / filename, 'w', encoding='utf-8') as f:
+            for record in catalog[kind]:
+                f.write(_dumps(record))
+                f.write("\n")
+    if catalog.get("domains"):
+        with open(directory / "domains.json", 'w', encoding='utf-8') as f:
+            json.dump(catalog["domains"], f, ensure_ascii=False)
+
+    manifest = {
+        "format": BULK_FORMAT,
+        "version": BULK_FORMAT_VERSION,
+        "courses": len(catalog["courses"]),
+        "relationships": len(catalog["relationships"]),
+        **(metadata or {})
+    }
+    with open(directory / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return directory
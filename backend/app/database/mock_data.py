@@ -1,72 +1,89 @@
 """
 Mock data for demo mode when Neo4j is not available
+
+Course data is loaded once into a read-only store that feeds the course
+graph snapshot. Lookups, search and prerequisite paths in demo mode are
+served by the snapshot (``CourseGraph.from_mock_data``), not from here.
 """
-import json
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Optional, Tuple
 from pathlib import Path
+import threading
+from app.config import settings
+from app.database.catalog_io import load_catalog
 
-# Load course data from JSON
-data_file = Path(__file__).parent.parent.parent / "data" / "course_data.json"
-with open(data_file, 'r', encoding='utf-8') as f:
-    COURSE_DATA = json.load(f)
+BACKEND_DIR = Path(__file__).parent.parent.parent
 
 
-def get_mock_courses():
-    """Get all courses from mock data"""
-    return COURSE_DATA['courses']
+def _freeze(record: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Read-only copy of a record; list values become tuples"""
+    return MappingProxyType({
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in record.items()
+    })
+
+
+class MockDataStore:
+    """
+    Immutable demo-mode course data, as loaded from disk
+
+    Only holds the course and relationship records; lookups are served by
+    the CourseGraph snapshot compiled from them. Records are read-only
+    mappings and are safe to share between requests.
+    """
+
+    def __init__(self,
+                 courses: Iterable[Mapping[str, Any]],
+                 relationships: Iterable[Mapping[str, Any]]):
+        self.courses: Tuple[Mapping[str, Any], ...] = tuple(_freeze(c) for c in courses)
+        self.relationships: Tuple[Mapping[str, Any], ...] = tuple(_freeze(r) for r in relationships)
+
+    @classmethod
+    def from_file(cls, path) -> "MockDataStore":
+        """Load a store from a course_data.json-style file or a bulk catalog directory"""
+        data = load_catalog(path)
+        return cls(data['courses'], data['relationships'])
+
+    def __len__(self) -> int:
+        return len(self.courses)
 
 
-def get_mock_course_by_id(course_id):
-    """Get course by ID from mock data"""
-    for course in COURSE_DATA['courses']:
-        if course['id'] == course_id:
-            # Add prerequisites
-            prereqs = [
-                rel['from'] for rel in COURSE_DATA['relationships']
-                if rel['to'] == course_id
-            ]
-            course['prerequisites'] = prereqs
-            course['knowledge_points'] = []
-            course['description'] = course['label']
-            return course
-    return None
+# Global store, loaded on first use
+_store: Optional[MockDataStore] = None
+_store_lock = threading.Lock()
+
+
+def load_mock_store(path=None) -> MockDataStore:
+    """
+    (Re)load the global demo-mode store
+
+    Args:
+        path: Course data file or bulk directory; defaults to ``settings.demo_data_path``,
+            relative paths are resolved against the backend directory
+    """
+    global _store
+    path = Path(path or settings.demo_data_path)
+    if not path.is_absolute():
+        path = BACKEND_DIR / path
+    store = MockDataStore.from_file(path)
+    _store = store
+    return store
+
+
+def get_mock_store() -> MockDataStore:
+    """Get the global demo-mode store, loading it on first use"""
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                return load_mock_store()
+    return _store
+
+
+def get_mock_courses():
+    """Get all courses from mock data"""
+    return get_mock_store().courses
 
 
 def get_mock_relationships():
     """Get all relationships from mock data"""
-    return COURSE_DATA['relationships']
-
-
-def search_mock_courses(keyword):
-    """Search courses in mock data"""
-    results = []
-    for course in COURSE_DATA['courses']:
-        if keyword in course['label']:
-            results.append(course)
-    return results
-
-
-def get_mock_prerequisites(course_id, max_depth=5):
-    """Get prerequisites from mock data using BFS"""
-    relationships = COURSE_DATA['relationships']
-
-    # Build adjacency list
-    graph = {}
-    for rel in relationships:
-        if rel['to'] not in graph:
-            graph[rel['to']] = []
-        graph[rel['to']].append(rel['from'])
-
-    # BFS to find all paths
-    paths = []
-
-    def dfs(current, path, depth):
-        if depth > max_depth:
-            return
-        if current in graph:
-            for prereq in graph[current]:
-                new_path = [prereq] + path
-                paths.append(new_path)
-                dfs(prereq, new_path, depth + 1)
-
-    dfs(course_id, [course_id], 0)
-    return paths
+    return get_mock_store().relationships
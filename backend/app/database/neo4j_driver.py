@@ -1,29 +1,353 @@
 """
 Neo4j database driver and connection management
 """
-from neo4j import GraphDatabase
-from typing import Optional, List, Dict, Any
+from neo4j import GraphDatabase, AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS, unit_of_work
+from typing import Optional, List, Dict, Any, Hashable, Tuple
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
 import logging
+from app.cache import TTLCache
 from app.config import settings
+from app.metrics import NEO4J_QUERY_DURATION, NEO4J_SLOW_QUERIES, registry
 
 logger = logging.getLogger(__name__)
 
 
+def driver_options() -> Dict[str, Any]:
+    """Connection pool and retry options for the Neo4j drivers"""
+    return {
+        "max_connection_pool_size": settings.neo4j_max_connection_pool_size,
+        "connection_acquisition_timeout": settings.neo4j_connection_acquisition_timeout,
+        "max_connection_lifetime": settings.neo4j_max_connection_lifetime,
+        "max_transaction_retry_time": settings.neo4j_max_transaction_retry_time,
+        "fetch_size": settings.neo4j_fetch_size,
+    }
+
+
+def session_options(access_mode: str) -> Dict[str, Any]:
+    """
+    Session options for one unit of work
+
+    Read sessions can be routed to cluster followers when the URI uses the
+    ``neo4j://`` routing scheme; write sessions always go to the leader.
+    """
+    return {
+        "database": settings.neo4j_database,
+        "default_access_mode": access_mode,
+        "fetch_size": settings.neo4j_fetch_size,
+    }
+
+
+def _update_counters(summary) -> Dict[str, Any]:
+    """Update counters of a result summary"""
+    return {
+        "nodes_created": summary.counters.nodes_created,
+        "relationships_created": summary.counters.relationships_created,
+        "properties_set": summary.counters.properties_set
+    }
+
+
+def _records(tx, query: str, parameters: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Any]:
+    """Transaction function returning all records of a query and its summary"""
+    result = tx.run(query, parameters)
+    records = [record.data() for record in result]
+    return records, result.consume()
+
+
+def _counters(tx, query: str, parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+    """Transaction function returning the update counters of a query and its summary"""
+    summary = tx.run(query, parameters).consume()
+    return _update_counters(summary), summary
+
+
+def _profile(tx, query: str, parameters: Dict[str, Any]):
+    """Transaction function running a query under PROFILE, returning its summary"""
+    return tx.run("PROFILE " + query, parameters).consume()
+
+
+async def _async_records(tx, query: str, parameters: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Any]:
+    """Async transaction function returning all records of a query and its summary"""
+    result = await tx.run(query, parameters)
+    records = [record.data() async for record in result]
+    return records, await result.consume()
+
+
+async def _async_counters(tx, query: str, parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+    """Async transaction function returning the update counters of a query and its summary"""
+    result = await tx.run(query, parameters)
+    summary = await result.consume()
+    return _update_counters(summary), summary
+
+
+async def _async_profile(tx, query: str, parameters: Dict[str, Any]):
+    """Async transaction function running a query under PROFILE, returning its summary"""
+    result = await tx.run("PROFILE " + query, parameters)
+    return await result.consume()
+
+
+def _with_timeout(work):
+    """Apply the configured transaction timeout to a transaction function"""
+    return unit_of_work(timeout=settings.neo4j_transaction_timeout)(work)
+
+
+def query_name(query: str, name: Optional[str] = None) -> str:
+    """Metrics name of a query: the given name, else a short hash of its text"""
+    if name:
+        return name
+    return "query_" + hashlib.sha1(" ".join(query.split()).encode("utf-8")).hexdigest()[:8]
+
+
+@contextmanager
+def _timed(query: str, name: Optional[str], access_mode: str):
+    """
+    Record the duration and outcome of one query in the metrics registry
+
+    Yields a dict whose ``seconds`` entry holds the duration once the block
+    has finished.
+    """
+    timing: Dict[str, float] = {}
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield timing
+        outcome = "ok"
+    finally:
+        timing["seconds"] = time.perf_counter() - start
+        NEO4J_QUERY_DURATION.labels(query_name(query, name), access_mode, outcome).observe(timing["seconds"])
+
+
+def _format_parameters(parameters: Dict[str, Any], limit: int = 500) -> str:
+    """Query parameters as JSON for logging, truncated to ``limit`` characters"""
+    text = json.dumps(parameters, ensure_ascii=False, default=str)
+    return text if len(text) <= limit else text[:limit] + f"… ({len(text)} chars)"
+
+
+def _plan_tree(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact operator tree of a PROFILE plan"""
+    args = profile.get("args", {})
+    return {
+        "operator": profile.get("operatorType"),
+        "details": args.get("Details"),
+        "rows": profile.get("rows"),
+        "db_hits": profile.get("dbHits"),
+        "page_cache_hits": profile.get("pageCacheHits"),
+        "page_cache_misses": profile.get("pageCacheMisses"),
+        "children": [_plan_tree(child) for child in profile.get("children", [])]
+    }
+
+
+def _total_db_hits(profile: Dict[str, Any]) -> int:
+    return (profile.get("dbHits") or 0) + sum(_total_db_hits(child) for child in profile.get("children", []))
+
+
+class SlowQueryLog:
+    """
+    Slow query log with sampled PROFILE capture
+
+    Queries slower than the threshold are logged with their parameters,
+    duration, row count and server-reported timings, and kept in a bounded
+    buffer. When profiling is enabled, a sample of slow read queries is
+    re-run with ``PROFILE`` (one at a time, in the background) and the
+    operator plan with its db hits is kept in a second bounded buffer.
+    Writes are never re-run.
+    """
+
+    def __init__(self, threshold_ms: float, buffer_size: int, profile: bool, sample_rate: float):
+        self.threshold_ms = threshold_ms
+        self.profile_enabled = profile
+        self.sample_rate = sample_rate
+        self._entries: deque = deque(maxlen=buffer_size)
+        self._profiles: deque = deque(maxlen=buffer_size)
+        self._profiling = threading.Lock()
+        self._lock = threading.Lock()
+        self.total = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def observe(self,
+                query: str,
+                name: Optional[str],
+                parameters: Dict[str, Any],
+                seconds: float,
+                rows: Optional[int],
+                summary,
+                access_mode: str,
+                error: Optional[BaseException] = None) -> Optional[Dict[str, Any]]:
+        """
+        Log a query if it exceeded the threshold, whether it succeeded or failed
+
+        Args:
+            query: Cypher query string
+            name: Query name used in metrics
+            parameters: Query parameters
+            seconds: Client-side duration, including network and retries
+            rows: Records returned (None for writes and failed queries)
+            summary: Result summary carrying the server timings (None if failed)
+            access_mode: "read" or "write"
+            error: Exception the query failed with, if any
+
+        Returns:
+            The slow query entry, or None if the query was fast enough
+        """
+        duration_ms = seconds * 1000
+        if not self.enabled or duration_ms < self.threshold_ms:
+            return None
+
+        name = query_name(query, name)
+        entry = {
+            "captured_at": datetime.now().isoformat(timespec="milliseconds"),
+            "query_name": name,
+            "access_mode": access_mode,
+            "query": " ".join(query.split()),
+            "parameters": _format_parameters(parameters),
+            "duration_ms": round(duration_ms, 3),
+            "rows": rows,
+            "server_available_after_ms": getattr(summary, "result_available_after", None),
+            "server_consumed_after_ms": getattr(summary, "result_consumed_after", None),
+            "error": f"{type(error).__name__}: {error}" if error is not None else None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.total += 1
+        NEO4J_SLOW_QUERIES.labels(name, access_mode).inc()
+        logger.warning(
+            f"Slow {'failed ' if error is not None else ''}Neo4j query {name} ({access_mode}): "
+            f"{entry['duration_ms']:.1f} ms, "
+            f"{rows if rows is not None else '-'} rows, server available after "
+            f"{entry['server_available_after_ms']} ms / consumed after {entry['server_consumed_after_ms']} ms; "
+            f"query: {entry['query']}; parameters: {entry['parameters']}"
+            + (f"; error: {entry['error']}" if error is not None else "")
+        )
+        return entry
+
+    def start_profile(self, entry: Dict[str, Any]) -> bool:
+        """
+        Whether to PROFILE a slow query now
+
+        Only successful read queries are sampled, and only one profile runs at a time so
+        a burst of slow queries does not add a burst of load. A True return
+        must be paired with ``finish_profile``.
+        """
+        if not self.profile_enabled or entry["access_mode"] != "read" or entry["error"] is not None \
+                or random.random() >= self.sample_rate:
+            return False
+        return self._profiling.acquire(blocking=False)
+
+    def finish_profile(self, entry: Dict[str, Any], summary=None, error: Optional[Exception] = None):
+        """Store the PROFILE result of a sampled slow query and allow the next one"""
+        try:
+            profile = getattr(summary, "profile", None)
+            if error is not None:
+                logger.warning(f"PROFILE of slow query {entry['query_name']} failed: {error}")
+            elif profile:
+                with self._lock:
+                    self._profiles.append({
+                        **entry,
+                        "profiled_at": datetime.now().isoformat(timespec="milliseconds"),
+                        "total_db_hits": _total_db_hits(profile),
+                        "plan": _plan_tree(profile)
+                    })
+        finally:
+            self._profiling.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Settings, recent slow queries and captured profiles, newest first"""
+        with self._lock:
+            entries, profiles = list(self._entries), list(self._profiles)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "profile_enabled": self.profile_enabled,
+            "profile_sample_rate": self.sample_rate,
+            "total_slow_queries": self.total,
+            "slow_queries": entries[::-1],
+            "profiles": profiles[::-1]
+        }
+
+    def clear(self):
+        """Drop buffered slow queries and profiles"""
+        with self._lock:
+            self._entries.clear()
+            self._profiles.clear()
+
+
+class QueryResultCache:
+    """
+    Read query result cache invalidated by writes
+
+    Entries are keyed by the graph version, query text and parameters. Every
+    write bumps the version, so results read before a write are never served
+    after it, even if the read finished after the write.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size, ttl_seconds)
+        self._version_lock = threading.Lock()
+        self.graph_version = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    def make_key(self, query: str, parameters: Dict[str, Any]) -> Hashable:
+        """Cache key of a query at the current graph version"""
+        return (
+            self.graph_version,
+            query,
+            json.dumps(parameters, sort_keys=True, ensure_ascii=False, default=str)
+        )
+
+    def get(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        """Cached records (copied, callers may modify them), or None"""
+        records = self._cache.get(key)
+        return [dict(record) for record in records] if records is not None else None
+
+    def put(self, key: Hashable, records: List[Dict[str, Any]]):
+        """Store a copy of query records"""
+        self._cache.put(key, [dict(record) for record in records])
+
+    def bump_version(self):
+        """Invalidate all cached results after a write"""
+        with self._version_lock:
+            self.graph_version += 1
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, size and current graph version"""
+        return {**self._cache.stats(), "graph_version": self.graph_version}
+
+
 class Neo4jDriver:
     """Neo4j database driver wrapper"""
 
-    def __init__(self, uri: str, user: str, password: str):
+    def __init__(self,
+                 uri: str,
+                 user: str,
+                 password: str,
+                 cache: Optional[QueryResultCache] = None,
+                 slow_queries: Optional[SlowQueryLog] = None):
         self._driver = None
         self._uri = uri
         self._user = user
         self._password = password
+        self.cache = cache
+        self.slow_queries = slow_queries
 
     def connect(self):
         """Establish connection to Neo4j database"""
         try:
             self._driver = GraphDatabase.driver(
                 self._uri,
-                auth=(self._user, self._password)
+                auth=(self._user, self._password),
+                **driver_options()
             )
             # Verify connectivity
             self._driver.verify_connectivity()
@@ -39,13 +363,23 @@ class Neo4jDriver:
             self._driver.close()
             logger.info("Neo4j connection closed")
 
-    def execute_query(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def execute_query(self,
+                      query: str,
+                      parameters: Optional[Dict[str, Any]] = None,
+                      use_cache: bool = True,
+                      name: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Execute a Cypher query and return results
+        Execute a read-only Cypher query and return results
+
+        Runs in a managed read transaction, retried on transient errors and
+        routable to cluster followers. Results are served from the query
+        cache when one is configured.
 
         Args:
             query: Cypher query string
             parameters: Query parameters
+            use_cache: Whether the result may be served from or stored in the cache
+            name: Query name used in metrics (defaults to a hash of the query)
 
         Returns:
             List of result records as dictionaries
@@ -53,17 +387,41 @@ class Neo4jDriver:
         if not self._driver:
             raise RuntimeError("Database not connected. Call connect() first.")
 
-        with self._driver.session() as session:
-            result = session.run(query, parameters or {})
-            return [record.data() for record in result]
+        parameters = parameters or {}
+        cache = self.cache if use_cache and self.cache is not None and self.cache.enabled else None
+        if cache is not None:
+            key = cache.make_key(query, parameters)
+            records = cache.get(key)
+            if records is not None:
+                return records
 
-    def execute_write(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        try:
+            with _timed(query, name, "read") as timing, \
+                    self._driver.session(**session_options(READ_ACCESS)) as session:
+                records, summary = session.execute_read(_with_timeout(_records), query, parameters)
+        except Exception as e:
+            self._check_slow(query, name, parameters, timing["seconds"], None, None, "read", e)
+            raise
+        self._check_slow(query, name, parameters, timing["seconds"], len(records), summary, "read")
+
+        if cache is not None:
+            cache.put(key, records)
+        return records
+
+    def execute_write(self,
+                      query: str,
+                      parameters: Optional[Dict[str, Any]] = None,
+                      name: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute a write query (CREATE, UPDATE, DELETE)
 
+        Runs in a managed write transaction on the cluster leader, retried
+        on transient errors.
+
         Args:
             query: Cypher query string
             parameters: Query parameters
+            name: Query name used in metrics (defaults to a hash of the query)
 
         Returns:
             Summary of the operation
@@ -71,24 +429,236 @@ class Neo4jDriver:
         if not self._driver:
             raise RuntimeError("Database not connected. Call connect() first.")
 
-        with self._driver.session() as session:
-            result = session.run(query, parameters or {})
-            summary = result.consume()
-            return {
-                "nodes_created": summary.counters.nodes_created,
-                "relationships_created": summary.counters.relationships_created,
-                "properties_set": summary.counters.properties_set
-            }
+        parameters = parameters or {}
+        try:
+            with _timed(query, name, "write") as timing, \
+                    self._driver.session(**session_options(WRITE_ACCESS)) as session:
+                counters, summary = session.execute_write(_with_timeout(_counters), query, parameters)
+        except Exception as e:
+            self._check_slow(query, name, parameters, timing["seconds"], None, None, "write", e)
+            raise
+        finally:
+            if self.cache is not None:
+                self.cache.bump_version()
+        self._check_slow(query, name, parameters, timing["seconds"], None, summary, "write")
+        return counters
+
+    def _check_slow(self, query, name, parameters, seconds, rows, summary, access_mode, error=None):
+        """Log a slow (or slow failed) query and start a sampled PROFILE of it in a background thread"""
+        if self.slow_queries is None:
+            return
+        entry = self.slow_queries.observe(query, name, parameters, seconds, rows, summary, access_mode, error)
+        if entry is not None and self.slow_queries.start_profile(entry):
+            threading.Thread(target=self._profile, args=(query, parameters, entry), daemon=True).start()
+
+    def _profile(self, query: str, parameters: Dict[str, Any], entry: Dict[str, Any]):
+        """Re-run a read query with PROFILE and store its plan"""
+        try:
+            with self._driver.session(**session_options(READ_ACCESS)) as session:
+                summary = session.execute_read(_with_timeout(_profile), query, parameters)
+        except Exception as e:
+            self.slow_queries.finish_profile(entry, error=e)
+        else:
+            self.slow_queries.finish_profile(entry, summary)
+
+
+class AsyncNeo4jDriver:
+    """
+    Neo4j driver wrapper for use inside the event loop
+
+    Same interface as ``Neo4jDriver`` with awaitable methods, backed by
+    ``AsyncGraphDatabase`` so request handlers yield to other requests
+    while waiting on the database.
+    """
+
+    def __init__(self,
+                 uri: str,
+                 user: str,
+                 password: str,
+                 cache: Optional[QueryResultCache] = None,
+                 slow_queries: Optional[SlowQueryLog] = None):
+        self._driver = None
+        self._uri = uri
+        self._user = user
+        self._password = password
+        self.cache = cache
+        self.slow_queries = slow_queries
+        # Background PROFILE tasks, referenced until they finish
+        self._profile_tasks = set()
+
+    async def connect(self):
+        """Establish connection to Neo4j database"""
+        try:
+            self._driver = AsyncGraphDatabase.driver(
+                self._uri,
+                auth=(self._user, self._password),
+                **driver_options()
+            )
+            # Verify connectivity
+            await self._driver.verify_connectivity()
+            logger.info(f"Async driver connected to Neo4j at {self._uri}")
+        except Exception as e:
+            logger.error(f"Async driver failed to connect to Neo4j: {e}")
+            if self._driver:
+                await self._driver.close()
+            self._driver = None  # Use demo mode
+
+    async def close(self):
+        """Close database connection"""
+        if self._driver:
+            await self._driver.close()
+            logger.info("Async Neo4j connection closed")
+
+    async def execute_query(self,
+                            query: str,
+                            parameters: Optional[Dict[str, Any]] = None,
+                            use_cache: bool = True,
+                            name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Execute a read-only Cypher query and return results
+
+        Runs in a managed read transaction, retried on transient errors and
+        routable to cluster followers. Results are served from the query
+        cache when one is configured.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+            use_cache: Whether the result may be served from or stored in the cache
+            name: Query name used in metrics (defaults to a hash of the query)
+
+        Returns:
+            List of result records as dictionaries
+        """
+        if not self._driver:
+            raise RuntimeError("Database not connected. Call connect() first.")
+
+        parameters = parameters or {}
+        cache = self.cache if use_cache and self.cache is not None and self.cache.enabled else None
+        if cache is not None:
+            key = cache.make_key(query, parameters)
+            records = cache.get(key)
+            if records is not None:
+                return records
+
+        try:
+            with _timed(query, name, "read") as timing:
+                async with self._driver.session(**session_options(READ_ACCESS)) as session:
+                    records, summary = await session.execute_read(_with_timeout(_async_records), query, parameters)
+        except Exception as e:
+            self._check_slow(query, name, parameters, timing["seconds"], None, None, "read", e)
+            raise
+        self._check_slow(query, name, parameters, timing["seconds"], len(records), summary, "read")
+
+        if cache is not None:
+            cache.put(key, records)
+        return records
+
+    async def execute_write(self,
+                            query: str,
+                            parameters: Optional[Dict[str, Any]] = None,
+                            name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a write query (CREATE, UPDATE, DELETE)
+
+        Runs in a managed write transaction on the cluster leader, retried
+        on transient errors.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+            name: Query name used in metrics (defaults to a hash of the query)
+
+        Returns:
+            Summary of the operation
+        """
+        if not self._driver:
+            raise RuntimeError("Database not connected. Call connect() first.")
+
+        parameters = parameters or {}
+        try:
+            with _timed(query, name, "write") as timing:
+                async with self._driver.session(**session_options(WRITE_ACCESS)) as session:
+                    counters, summary = await session.execute_write(
+                        _with_timeout(_async_counters), query, parameters
+                    )
+        except Exception as e:
+            self._check_slow(query, name, parameters, timing["seconds"], None, None, "write", e)
+            raise
+        finally:
+            if self.cache is not None:
+                self.cache.bump_version()
+        self._check_slow(query, name, parameters, timing["seconds"], None, summary, "write")
+        return counters
+
+    def _check_slow(self, query, name, parameters, seconds, rows, summary, access_mode, error=None):
+        """Log a slow (or slow failed) query and schedule a sampled PROFILE of it as a background task"""
+        if self.slow_queries is None:
+            return
+        entry = self.slow_queries.observe(query, name, parameters, seconds, rows, summary, access_mode, error)
+        if entry is not None and self.slow_queries.start_profile(entry):
+            task = asyncio.get_running_loop().create_task(self._profile(query, parameters, entry))
+            self._profile_tasks.add(task)
+            task.add_done_callback(self._profile_tasks.discard)
+
+    async def _profile(self, query: str, parameters: Dict[str, Any], entry: Dict[str, Any]):
+        """Re-run a read query with PROFILE and store its plan"""
+        try:
+            async with self._driver.session(**session_options(READ_ACCESS)) as session:
+                summary = await session.execute_read(_with_timeout(_async_profile), query, parameters)
+        except Exception as e:
+            self.slow_queries.finish_profile(entry, error=e)
+        else:
+            self.slow_queries.finish_profile(entry, summary)
+
+
+# Query result cache shared by both global drivers, so a write through
+# either one invalidates reads cached by the other
+query_cache = QueryResultCache(
+    max_size=settings.neo4j_query_cache_size,
+    ttl_seconds=settings.neo4j_query_cache_ttl_seconds
+)
+registry.register_cache("neo4j_query", query_cache.stats)
+
+# Slow query log shared by both global drivers
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.neo4j_slow_query_threshold_ms,
+    buffer_size=settings.neo4j_slow_query_buffer_size,
+    profile=settings.neo4j_profile_slow_queries,
+    sample_rate=settings.neo4j_profile_sample_rate
+)
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    """Get the global slow query log"""
+    return slow_query_log
 
 
 # Global driver instance
 neo4j_driver = Neo4jDriver(
     uri=settings.neo4j_uri,
     user=settings.neo4j_user,
-    password=settings.neo4j_password
+    password=settings.neo4j_password,
+    cache=query_cache,
+    slow_queries=slow_query_log
 )
 
 
 def get_neo4j_driver() -> Neo4jDriver:
     """Get the global Neo4j driver instance"""
     return neo4j_driver
+
+
+# Global async driver instance, used by request handlers
+async_neo4j_driver = AsyncNeo4jDriver(
+    uri=settings.neo4j_uri,
+    user=settings.neo4j_user,
+    password=settings.neo4j_password,
+    cache=query_cache,
+    slow_queries=slow_query_log
+)
+
+
+def get_async_neo4j_driver() -> AsyncNeo4jDriver:
+    """Get the global async Neo4j driver instance"""
+    return async_neo4j_driver
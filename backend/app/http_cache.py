@@ -0,0 +1,82 @@
+"""
+HTTP caching helpers - pre-serialized JSON bodies with strong ETags
+"""
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import hashlib
+import json
+from fastapi import Request, Response
+from app.config import settings
+
+
+class CachedJSONBody:
+    """
+    JSON response body serialized once per source version
+
+    The body bytes and their ETag are rebuilt only when the version passed
+    to ``get`` differs from the one they were built for.
+    """
+
+    def __init__(self):
+        self._entry: Optional[Tuple[Hashable, bytes, str]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: Hashable, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        """
+        Get the serialized body and its ETag for a source version
+
+        Args:
+            version: Version of the data the body is built from
+            build: Returns the body as bytes or as a JSON-serializable value
+
+        Returns:
+            Tuple of (body bytes, strong ETag)
+        """
+        entry = self._entry
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+        else:
+            self.misses += 1
+            body = build()
+            if not isinstance(body, bytes):
+                body = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            entry = (version, body, etag)
+            self._entry = entry
+        return entry[1], entry[2]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters (a miss is a rebuild of the body)"""
+        return {"size": int(self._entry is not None), "hits": self.hits, "misses": self.misses}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def conditional_json_response(request: Request,
+                              body: bytes,
+                              etag: str,
+                              max_age: Optional[int] = None) -> Response:
+    """
+    Serve a pre-serialized JSON body, or 304 if the client's copy is current
+
+    Args:
+        request: Incoming request, checked for ``If-None-Match``
+        body: Serialized JSON body
+        etag: Strong ETag of the body
+        max_age: ``Cache-Control`` max-age in seconds (defaults to settings)
+    """
+    if max_age is None:
+        max_age = settings.catalog_cache_max_age
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate"
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
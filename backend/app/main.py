@@ -2,14 +2,16 @@
 SmartPath Backend - Main FastAPI Application
 Knowledge Tracking-Enhanced Agentic Search for Personalized Learning (KTAS)
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
 from app.config import settings
-from app.database.neo4j_driver import neo4j_driver
-from app.routers import courses_router, knowledge_router
+from app.database.neo4j_driver import neo4j_driver, async_neo4j_driver, query_cache
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from app.services.course_graph import load_course_graph
+from app.routers import courses_router, knowledge_router, admin_router
 
 # Configure logging
 logging.basicConfig(
@@ -29,15 +31,20 @@ async def lifespan(app: FastAPI):
     logger.info("Starting SmartPath API...")
     try:
         neo4j_driver.connect()
+        await async_neo4j_driver.connect()
         logger.info("Neo4j database connected successfully")
     except Exception as e:
         logger.error(f"Failed to connect to Neo4j: {e}")
         logger.warning("API will start but database operations will fail")
 
+    # Compile the in-memory course graph snapshot used by all read paths
+    load_course_graph(neo4j_driver)
+
     yield
 
     # Shutdown
     logger.info("Shutting down SmartPath API...")
+    await async_neo4j_driver.close()
     neo4j_driver.close()
 
 
@@ -58,9 +65,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency metrics; added last so it is outermost and times CORS too
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(courses_router)
 app.include_router(knowledge_router)
+# Admin endpoints expose query text and parameters; opt-in with a token
+if settings.admin_api_token:
+    app.include_router(admin_router)
 
 
 @app.get("/")
@@ -73,6 +87,8 @@ async def root():
         "endpoints": {
             "courses": "/api/courses",
             "knowledge": "/api/knowledge",
+            **({"admin": "/api/admin"} if settings.admin_api_token else {}),
+            "metrics": "/metrics",
             "docs": "/docs",
             "redoc": "/redoc"
         }
@@ -84,7 +100,7 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test database connection
-        neo4j_driver.execute_query("RETURN 1 as test")
+        await async_neo4j_driver.execute_query("RETURN 1 as test", use_cache=False, name="health.ping")
         db_status = "connected"
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
@@ -92,10 +108,19 @@ async def health_check():
 
     return {
         "status": "healthy" if db_status == "connected" else "degraded",
-        "database": db_status
+        "database": db_status,
+        "query_cache": query_cache.stats()
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,290 @@
+"""
+Runtime metrics - counters, gauges and histograms in Prometheus text format
+
+A small in-process registry (no client library needed) fed by the HTTP
+timing middleware, the Neo4j drivers and the caches, and rendered by the
+``/metrics`` endpoint.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Scrape and probe endpoints left out of the HTTP request metrics
+EXCLUDED_PATHS = ("/metrics", "/health")
+
+# Latency bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """A metric family with one child per label value combination"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: Any):
+        """Child metric for one combination of label values"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Value holder for a new label combination"""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def render(self, name: str, labelnames, key) -> List[str]:
+        return [f"{name}{_labels(labelnames, key)} {_number(self.value)}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        bucket = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.sum += value
+
+    def render(self, name: str, labelnames, key) -> List[str]:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="%s"' % _number(bound)
+            lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labelnames, key)} {repr(total)}")
+        lines.append(f"{name}_count{_labels(labelnames, key)} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+
+class MetricsRegistry:
+    """Metric families plus collectors that read existing counters at scrape time"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, Any]]):
+        """
+        Expose a cache's hit/miss counters
+
+        Args:
+            name: Value of the ``cache`` label
+            stats: Returns a dict with ``hits``, ``misses`` and optionally
+                ``evictions``, ``invalidations`` and ``size``
+        """
+        self._caches[name] = stats
+
+    def _cache_lines(self) -> List[str]:
+        families = {
+            "hits": ("counter", "Cache lookups served from the cache"),
+            "misses": ("counter", "Cache lookups not served from the cache"),
+            "evictions": ("counter", "Cache entries evicted by size or expiry"),
+            "invalidations": ("counter", "Whole-cache invalidations"),
+            "size": ("gauge", "Entries currently cached"),
+        }
+        stats = {name: stats() for name, stats in sorted(self._caches.items())}
+        lines = []
+        for field, (kind, documentation) in families.items():
+            name = f"smartpath_cache_{field}" + ("_total" if kind == "counter" else "")
+            samples = [(cache, values[field]) for cache, values in stats.items() if values.get(field) is not None]
+            if not samples:
+                continue
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{cache="{_escape(cache)}"}} {_number(value)}' for cache, value in samples]
+        return lines
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        lines.extend(self._cache_lines())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "smartpath_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "smartpath_http_request_duration_seconds", "HTTP request latency by route and status",
+    ("method", "route", "status")
+))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "smartpath_http_requests_in_flight", "HTTP requests currently being served", ("method",)
+))
+NEO4J_QUERY_DURATION = registry.register(Histogram(
+    "smartpath_neo4j_query_duration_seconds", "Neo4j query latency by query name (cache hits excluded)",
+    ("query", "access_mode", "outcome")
+))
+NEO4J_SLOW_QUERIES = registry.register(Counter(
+    "smartpath_neo4j_slow_queries_total", "Neo4j queries over the slow query threshold", ("query", "access_mode")
+))
+STAGE_DURATION = registry.register(Histogram(
+    "smartpath_stage_duration_seconds", "Latency of in-process request stages such as scoring", ("stage",)
+))
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """Time a block into the stage duration histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage).observe(time.perf_counter() - start)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Path template of the route that served a request, so IDs do not become
+    label values
+
+    Routing stores the matched route in the request scope; requests that
+    matched no route share the label "unmatched".
+    """
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status and in-flight requests
+
+    The route is only known once routing has run, so the in-flight gauge
+    is labelled by method alone. Requests to ``excluded_paths`` (metric
+    scrapes and health probes) are passed through unrecorded.
+    """
+
+    def __init__(self, app, excluded_paths: Iterable[str] = EXCLUDED_PATHS):
+        self.app = app
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        status = "500"
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            route = route_template(scope)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+            HTTP_REQUEST_DURATION.labels(method, route, status).observe(elapsed)
@@ -1,5 +1,6 @@
 """API Routers"""
 from app.routers.courses import router as courses_router
 from app.routers.knowledge import router as knowledge_router
+from app.routers.admin import router as admin_router
 
-__all__ = ["courses_router", "knowledge_router"]
+__all__ = ["courses_router", "knowledge_router", "admin_router"]
@@ -0,0 +1,46 @@
+"""
+Operational API endpoints
+
+Only mounted when ``settings.admin_api_token`` is set; every request must
+carry the token as a bearer credential.
+"""
+from typing import Optional
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.config import settings
+from app.database.neo4j_driver import SlowQueryLog, get_slow_query_log
+
+
+async def require_admin_token(authorization: Optional[str] = Header(None)):
+    """Reject requests without the configured admin bearer token"""
+    token = settings.admin_api_token
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if not token or scheme.lower() != "bearer" or not secrets.compare_digest(credentials.encode(), token.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="Admin token required",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(log: SlowQueryLog = Depends(get_slow_query_log)):
+    """
+    Get recent slow Neo4j queries and their captured PROFILE plans
+
+    Returns:
+        Threshold and profiling settings, the most recent slow queries and
+        the sampled PROFILE results (operator tree with rows and db hits),
+        newest first
+    """
+    return log.snapshot()
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(log: SlowQueryLog = Depends(get_slow_query_log)):
+    """Clear the buffered slow queries and profiles"""
+    log.clear()
+    return {"cleared": True}
@@ -1,47 +1,120 @@
 """
 Course management API endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from typing import List
 from app.schemas.course import (
     CourseBase,
     CourseDetail,
     CourseSearchRequest,
     CourseSearchResponse,
+    CourseSuggestion,
+    CourseSuggestResponse,
     PrerequisitePathRequest,
     PrerequisitePathResponse,
     LearningPathRequest,
-    LearningPathResponse
+    LearningPathResponse,
+    MultiTargetLearningPathRequest,
+    MultiTargetLearningPathResponse
 )
+from app.http_cache import CachedJSONBody, conditional_json_response
+from app.metrics import registry
 from app.services.course_service import CourseService
-from app.database.neo4j_driver import get_neo4j_driver, Neo4jDriver
+from app.services.prerequisite_paths import build_path_tree
+from app.database.neo4j_driver import (
+    get_neo4j_driver,
+    Neo4jDriver,
+    get_async_neo4j_driver,
+    AsyncNeo4jDriver
+)
+from itertools import islice
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/courses", tags=["courses"])
 
+# Pre-serialized bodies of catalog-wide endpoints, rebuilt per snapshot version
+_all_courses_body = CachedJSONBody()
+_statistics_body = CachedJSONBody()
+registry.register_cache("courses_body", _all_courses_body.stats)
+registry.register_cache("statistics_body", _statistics_body.stats)
+_course_list_adapter = TypeAdapter(List[CourseBase])
+
 
-def get_course_service(db: Neo4jDriver = Depends(get_neo4j_driver)) -> CourseService:
+def get_course_service(
+    db: Neo4jDriver = Depends(get_neo4j_driver),
+    async_db: AsyncNeo4jDriver = Depends(get_async_neo4j_driver)
+) -> CourseService:
     """Dependency to get course service"""
-    return CourseService(db)
+    return CourseService(db, async_db=async_db)
 
 
 @router.get("/", response_model=List[CourseBase])
-async def get_all_courses(service: CourseService = Depends(get_course_service)):
+async def get_all_courses(
+    request: Request,
+    service: CourseService = Depends(get_course_service)
+):
     """
     Get all courses in the knowledge graph
 
+    The body is serialized once per catalog snapshot and served with a
+    strong ETag; a matching ``If-None-Match`` gets 304.
+
     Returns:
         List of all courses with basic information
     """
     try:
-        courses = service.get_all_courses()
-        return courses
+        body, etag = _all_courses_body.get(
+            service.graph.version,
+            lambda: _course_list_adapter.dump_json(service.get_all_courses())
+        )
+        return conditional_json_response(request, body, etag)
     except Exception as e:
         logger.error(f"Error fetching courses: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Must be registered before /{course_id}, which would otherwise match "suggest"
+@router.get("/suggest", response_model=CourseSuggestResponse)
+async def suggest_courses(
+    prefix: str = Query(..., max_length=100, description="Typed prefix (label, pinyin or initials)"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions"),
+    service: CourseService = Depends(get_course_service)
+):
+    """
+    Autocomplete course names from a typed prefix
+
+    Served from the snapshot's prefix trie; courses that unlock more
+    courses rank first.
+
+    Args:
+        prefix: Typed prefix
+        limit: Maximum number of suggestions
+
+    Returns:
+        Best matching courses for the prefix
+    """
+    try:
+        graph = service.graph
+        trie = graph.suggest_trie
+        suggestions = [
+            CourseSuggestion(
+                id=graph.courses[idx]["id"],
+                label=graph.courses[idx]["label"],
+                unlocks=trie.unlocks[idx]
+            )
+            for idx in trie.suggest(prefix, limit)
+        ]
+        return CourseSuggestResponse(prefix=prefix, suggestions=suggestions)
+    except Exception as e:
+        logger.error(f"Error suggesting courses: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{course_id}", response_model=CourseDetail)
 async def get_course(
     course_id: int,
@@ -57,7 +130,7 @@ async def get_course(
         Detailed course information including prerequisites
     """
     try:
-        course = service.get_course_by_id(course_id)
+        course = await service.get_course_by_id(course_id)
         if not course:
             raise HTTPException(status_code=404, detail=f"Course {course_id} not found")
         return course
@@ -77,13 +150,13 @@ async def search_courses(
     Search courses by keyword
 
     Args:
-        request: Search request with keyword and search type
+        request: Search request with keyword, search type and limit
 
     Returns:
-        List of matching courses
+        List of matching courses, best match first
     """
     try:
-        courses = service.search_courses(request.keyword, request.search_type)
+        courses = service.search_courses(request.keyword, request.search_type, request.limit)
         return CourseSearchResponse(
             courses=courses,
             total=len(courses)
@@ -101,52 +174,54 @@ async def get_prerequisites(
     """
     Get prerequisite paths for a course
 
+    Paths are counted without being enumerated; only the requested page
+    (``offset``/``limit``, shortest first) is materialized.
+
     Args:
-        request: Request with course ID and max depth
+        request: Request with course ID, max depth and page
 
     Returns:
-        All prerequisite paths and detailed information
+        Path counts, one page of prerequisite paths and detailed information
     """
     try:
-        # Get course info
-        course = service.get_course_by_id(request.course_id)
+        engine = service.get_prerequisite_paths(request.course_id, request.max_depth)
+        path_counts = engine.counts_by_length()
+        total_paths = sum(path_counts.values())
+        paths = engine.page(request.offset, request.limit)
+
+        # Fetch the course and every course in the paths concurrently
+        all_course_ids = set()
+        for path in paths:
+            all_course_ids.update(path)
+        course, courses = await asyncio.gather(
+            service.get_course_by_id(request.course_id),
+            service.get_courses_by_ids(all_course_ids)
+        )
         if not course:
             raise HTTPException(
                 status_code=404,
                 detail=f"Course {request.course_id} not found"
             )
-
-        # Get all prerequisite paths
-        paths = service.get_prerequisites(request.course_id, request.max_depth)
-
-        # Get detailed info for each course in paths
-        all_course_ids = set()
-        for path in paths:
-            all_course_ids.update(path)
+        labels = {cid: c.label for cid, c in courses.items()}
 
         path_details = []
         for path in paths:
-            path_info = {
+            path_details.append({
                 "path": path,
                 "length": len(path) - 1,  # -1 because target course is included
-                "courses": []
-            }
-
-            for cid in path:
-                c = service.get_course_by_id(cid)
-                if c:
-                    path_info["courses"].append({
-                        "id": c.id,
-                        "name": c.label
-                    })
-
-            path_details.append(path_info)
+                "courses": [{"id": cid, "name": labels[cid]} for cid in path if cid in labels]
+            })
 
         return PrerequisitePathResponse(
             course_id=request.course_id,
             course_name=course.label,
             path=paths,
-            path_details=path_details
+            path_details=path_details,
+            total_paths=total_paths,
+            path_counts=path_counts,
+            offset=request.offset,
+            has_more=request.offset + len(paths) < total_paths,
+            path_tree=build_path_tree(paths, labels)
         )
 
     except HTTPException:
@@ -156,6 +231,39 @@ async def get_prerequisites(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/prerequisites/stream")
+async def stream_prerequisites(
+    request: PrerequisitePathRequest,
+    service: CourseService = Depends(get_course_service)
+):
+    """
+    Stream prerequisite paths for a course as NDJSON
+
+    Paths are generated lazily, shortest first, and the same page as the
+    non-streaming endpoint (``offset`` to ``offset + limit``) is sent one
+    JSON object per line.
+
+    Args:
+        request: Request with course ID, max depth, offset and limit
+
+    Returns:
+        Streaming response of ``{"path", "length"}`` lines
+    """
+    if await service.get_course_by_id(request.course_id) is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Course {request.course_id} not found"
+        )
+
+    engine = service.get_prerequisite_paths(request.course_id, request.max_depth)
+
+    def lines():
+        for path in islice(engine.iter_paths(request.offset), request.limit):
+            yield json.dumps({"path": path, "length": len(path) - 1}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/learning-path", response_model=LearningPathResponse)
 async def generate_learning_path(
     request: LearningPathRequest,
@@ -165,39 +273,34 @@ async def generate_learning_path(
     Generate a personalized learning path to target course
 
     Args:
-        request: Request with target course and completed courses
+        request: Request with target course, completed courses and
+            optional per-semester credit cap
 
     Returns:
-        Recommended learning sequence
+        Recommended learning sequence and semester-by-semester schedule
     """
     try:
-        # Get target course
-        target_course = service.get_course_by_id(request.target_course_id)
+        # Plan a prerequisite-ordered semester schedule
+        plan = service.plan_learning_path(
+            [request.target_course_id],
+            request.completed_courses,
+            request.max_credits_per_semester
+        )
+        sequence = plan["sequence"]
+
+        # Fetch the target course and every course in sequence concurrently
+        target_course, courses = await asyncio.gather(
+            service.get_course_by_id(request.target_course_id),
+            service.get_courses_by_ids(sequence)
+        )
         if not target_course:
             raise HTTPException(
                 status_code=404,
                 detail=f"Course {request.target_course_id} not found"
             )
 
-        # Generate learning path
-        sequence = service.get_learning_path(
-            request.target_course_id,
-            request.completed_courses
-        )
-
-        # Get detailed information for each course in sequence
-        course_details = []
-        total_credits = 0.0
-
-        for course_id in sequence:
-            course = service.get_course_by_id(course_id)
-            if course:
-                course_details.append(course)
-                if course.credits:
-                    total_credits += course.credits
-
-        # Estimate semesters (assuming ~20 credits per semester)
-        estimated_semesters = max(1, int(total_credits / 20))
+        course_details = [courses[course_id] for course_id in sequence if course_id in courses]
+        total_credits = sum(semester["credits"] for semester in plan["semesters"])
 
         return LearningPathResponse(
             target_course_id=request.target_course_id,
@@ -205,7 +308,8 @@ async def generate_learning_path(
             recommended_sequence=sequence,
             course_details=course_details,
             total_credits=total_credits,
-            estimated_semesters=estimated_semesters
+            estimated_semesters=max(1, len(plan["semesters"])),
+            semesters=plan["semesters"]
         )
 
     except HTTPException:
@@ -215,8 +319,68 @@ async def generate_learning_path(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/learning-path/multi", response_model=MultiTargetLearningPathResponse)
+async def generate_multi_target_learning_path(
+    request: MultiTargetLearningPathRequest,
+    service: CourseService = Depends(get_course_service)
+):
+    """
+    Generate one learning path reaching several target courses
+
+    Prerequisites shared by several targets are planned once, in a single
+    prerequisite-ordered, credit-capped semester schedule.
+
+    Args:
+        request: Request with target courses, completed courses and
+            optional per-semester credit cap
+
+    Returns:
+        Combined learning sequence and semester-by-semester schedule
+    """
+    try:
+        target_ids = list(dict.fromkeys(request.target_course_ids))
+        plan = service.plan_learning_path(
+            target_ids,
+            request.completed_courses,
+            request.max_credits_per_semester
+        )
+        sequence = plan["sequence"]
+
+        # Targets and sequence overlap, so fetch them in one lookup
+        courses = await service.get_courses_by_ids(target_ids + sequence)
+        unknown = [cid for cid in target_ids if cid not in courses]
+        if unknown:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Courses {unknown} not found"
+            )
+
+        course_details = [courses[course_id] for course_id in sequence if course_id in courses]
+        total_credits = sum(semester["credits"] for semester in plan["semesters"])
+
+        return MultiTargetLearningPathResponse(
+            target_course_ids=target_ids,
+            target_course_names=[courses[cid].label for cid in target_ids],
+            recommended_sequence=sequence,
+            shared_prerequisites=plan["shared_prerequisites"],
+            course_details=course_details,
+            total_credits=total_credits,
+            estimated_semesters=max(1, len(plan["semesters"])),
+            semesters=plan["semesters"]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating multi-target learning path: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/stats/summary")
-async def get_statistics(service: CourseService = Depends(get_course_service)):
+async def get_statistics(
+    request: Request,
+    service: CourseService = Depends(get_course_service)
+):
     """
     Get knowledge graph statistics
 
@@ -224,8 +388,8 @@ async def get_statistics(service: CourseService = Depends(get_course_service)):
         Statistics about courses and relationships
     """
     try:
-        stats = service.get_course_statistics()
-        return stats
+        body, etag = _statistics_body.get(service.graph.version, service.get_course_statistics)
+        return conditional_json_response(request, body, etag)
     except Exception as e:
         logger.error(f"Error getting statistics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,28 +1,45 @@
 """
 Knowledge tracking and recommendation API endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from app.schemas.knowledge import (
     KnowledgeStateRequest,
     KnowledgeStateResponse,
+    AbilityEstimate,
+    BatchKnowledgeStateRequest,
+    BatchKnowledgeStateResponse,
+    GradeEvent,
+    GradeEventResponse,
     RecommendationRequest,
     RecommendationResponse,
-    RecommendationItem
+    RecommendationItem,
+    BatchRecommendationRequest,
+    BatchRecommendationResponse
 )
+from app.http_cache import CachedJSONBody, conditional_json_response
+from app.metrics import observe_stage, registry
 from app.services.knowledge_tracking import get_knowledge_tracker, IRTKnowledgeTracker
-from app.services.course_service import CourseService
-from app.database.neo4j_driver import get_neo4j_driver, Neo4jDriver
+from app.services.knowledge_state_store import KnowledgeStateStore, get_knowledge_state_store
+from app.services.recommendation import (
+    RecommendationScorer,
+    RecommendationCache,
+    get_recommendation_scorer,
+    get_recommendation_cache
+)
+from typing import Optional
 from datetime import datetime
+from scipy import sparse
+from scipy.special import expit
+import numpy as np
 import logging
 import random
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/knowledge", tags=["knowledge"])
 
-
-def get_course_service(db: Neo4jDriver = Depends(get_neo4j_driver)) -> CourseService:
-    """Dependency to get course service"""
-    return CourseService(db)
+# Pre-serialized body of the domain list, rebuilt when the domains change
+_domains_body = CachedJSONBody()
+registry.register_cache("domains_body", _domains_body.stats)
 
 
 def generate_personalized_reason(
@@ -30,13 +47,17 @@ def generate_personalized_reason(
     prerequisites_met: bool,
     knowledge_readiness: float,
     difficulty_score: float,
-    missing_prerequisites: list
+    missing_prerequisites: list,
+    rng: Optional[random.Random] = None
 ) -> str:
     """
     Generate personalized course recommendation reasons based on course characteristics
 
+    The wording is picked with ``rng`` (the module RNG when omitted).
+
     TODO: Replace with LLM-generated personalized recommendations in the future
     """
+    rng = rng or random
     # Course category detection
     ai_keywords = ['人工智能', '机器学习', '深度学习', '神经网络', '计算机视觉', '自然语言', '模式识别', '智能', '数据挖掘']
     system_keywords = ['操作系统', '计算机系统', '编译', '体系结构', '嵌入式', '组成']
@@ -61,7 +82,7 @@ def generate_personalized_reason(
             f"当前还需完成{len(missing_prerequisites)}门前置课程，建议循序渐进学习",
             f"为更好掌握本课程，建议优先完成{len(missing_prerequisites)}门先修课"
         ]
-        reason_templates.append(random.choice(prereq_reasons))
+        reason_templates.append(rng.choice(prereq_reasons))
     else:
         prereq_reasons = [
             "已具备必要的知识基础",
@@ -69,7 +90,7 @@ def generate_personalized_reason(
             "前置知识储备充足",
             "基础课程已掌握"
         ]
-        reason_templates.append(random.choice(prereq_reasons))
+        reason_templates.append(rng.choice(prereq_reasons))
 
     # Knowledge readiness with course-specific advice
     if knowledge_readiness > 0.7:
@@ -103,7 +124,7 @@ def generate_personalized_reason(
                 "理论基础扎实，学习起来会比较顺利",
                 "已具备良好的知识基础"
             ]
-        reason_templates.append(random.choice(readiness_reasons))
+        reason_templates.append(rng.choice(readiness_reasons))
 
     elif knowledge_readiness > 0.4:
         if is_ai:
@@ -136,7 +157,7 @@ def generate_personalized_reason(
                 "基础知识已具备，建议稳扎稳打学习",
                 "适合当前水平，边学边巩固基础"
             ]
-        reason_templates.append(random.choice(readiness_reasons))
+        reason_templates.append(rng.choice(readiness_reasons))
 
     else:
         if is_ai or is_math:
@@ -157,7 +178,7 @@ def generate_personalized_reason(
                 "基础知识需要巩固，建议先学习前置课程",
                 "为更好掌握内容，建议优先完成基础课程"
             ]
-        reason_templates.append(random.choice(readiness_reasons))
+        reason_templates.append(rng.choice(readiness_reasons))
 
     # Difficulty assessment with specific advice
     if 0.4 <= difficulty_score <= 0.7:
@@ -185,7 +206,7 @@ def generate_personalized_reason(
                 "课程难度设置合理，学习体验良好",
                 "挑战度适宜，能有效提升专业能力"
             ]
-        reason_templates.append(random.choice(difficulty_reasons))
+        reason_templates.append(rng.choice(difficulty_reasons))
 
     elif difficulty_score < 0.4:
         if is_practical:
@@ -206,7 +227,7 @@ def generate_personalized_reason(
                 "入门难度友好，学习压力较小",
                 "内容相对简单，适合轻松学习"
             ]
-        reason_templates.append(random.choice(difficulty_reasons))
+        reason_templates.append(rng.choice(difficulty_reasons))
 
     else:  # High difficulty
         if is_ai:
@@ -233,11 +254,31 @@ def generate_personalized_reason(
                 "内容较为深入，需要持续投入学习",
                 "难度较高，建议充分利用课程资源"
             ]
-        reason_templates.append(random.choice(difficulty_reasons))
+        reason_templates.append(rng.choice(difficulty_reasons))
 
     return "，".join(reason_templates)
 
 
+def build_recommendation_item(item: dict) -> RecommendationItem:
+    """Turn a scored course from the recommendation scorer into a response item"""
+    return RecommendationItem(
+        course_id=item["course_id"],
+        course_name=item["course_name"],
+        reason=generate_personalized_reason(
+            course_name=item["course_name"],
+            prerequisites_met=item["prerequisites_met"],
+            knowledge_readiness=item["knowledge_readiness"],
+            difficulty_score=item["difficulty_score"],
+            missing_prerequisites=item["missing_prerequisites"],
+            rng=random.Random(item["reason_seed"])
+        ),
+        match_score=item["match_score"],
+        difficulty_match=item["difficulty_label"],
+        prerequisites_met=item["prerequisites_met"],
+        missing_prerequisites=item["missing_prerequisites"]
+    )
+
+
 @router.post("/state", response_model=KnowledgeStateResponse)
 async def calculate_knowledge_state(
     request: KnowledgeStateRequest,
@@ -247,7 +288,8 @@ async def calculate_knowledge_state(
     Calculate student's knowledge state from course scores
 
     Uses IRT (Item Response Theory) model to estimate mastery levels
-    for different knowledge domains based on course performance.
+    for different knowledge domains based on course performance, with
+    EAP (default) or MLE ability estimates and their standard errors.
 
     Args:
         request: Student ID and course scores
@@ -256,8 +298,10 @@ async def calculate_knowledge_state(
         Knowledge state with domain-wise mastery levels
     """
     try:
-        # Estimate knowledge state using IRT
-        knowledge_vector = tracker.estimate_knowledge_state(request.course_scores)
+        # Estimate per-domain abilities using IRT, mapped to mastery levels
+        with observe_stage("knowledge.estimate"):
+            abilities = tracker.estimate_abilities(request.course_scores, request.method)
+        knowledge_vector = {domain: float(expit(theta)) for domain, (theta, _) in abilities.items()}
 
         # Analyze strengths and weaknesses
         overall_level, strengths, weaknesses = tracker.analyze_knowledge_state(
@@ -270,19 +314,177 @@ async def calculate_knowledge_state(
             overall_level=overall_level,
             strengths=strengths,
             weaknesses=weaknesses,
+            ability_estimates={
+                domain: AbilityEstimate(theta=theta, standard_error=se)
+                for domain, (theta, se) in abilities.items()
+            },
             calculated_at=datetime.now()
         )
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error calculating knowledge state: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/state/batch", response_model=BatchKnowledgeStateResponse)
+async def calculate_knowledge_state_batch(
+    request: BatchKnowledgeStateRequest,
+    tracker: IRTKnowledgeTracker = Depends(get_knowledge_tracker)
+):
+    """
+    Calculate knowledge states for many students at once
+
+    Student scores are packed into a sparse students × courses matrix and
+    domain mastery is computed with one sparse product against the
+    course → domain incidence matrix. Each student's ``method`` (EAP or
+    MLE) is honoured.
+
+    Args:
+        request: Student IDs, course scores and estimation methods
+
+    Returns:
+        Knowledge states in request order
+    """
+    try:
+        # Build sparse students × courses score matrix
+        course_columns = {}
+        rows, cols, scores = [], [], []
+        for s, student in enumerate(request.students):
+            for course_name, score in student.course_scores.items():
+                rows.append(s)
+                cols.append(course_columns.setdefault(course_name, len(course_columns)))
+                scores.append(score)
+        score_matrix = sparse.csr_matrix(
+            (np.array(scores, dtype=np.float64), (rows, cols)),
+            shape=(len(request.students), len(course_columns))
+        )
+
+        with observe_stage("knowledge.estimate_batch"):
+            theta, se = tracker.estimate_ability_matrix(
+                score_matrix,
+                list(course_columns),
+                [student.method for student in request.students]
+            )
+        mastery = expit(theta)
+
+        calculated_at = datetime.now()
+        results = []
+        for s, student in enumerate(request.students):
+            observed = np.flatnonzero(~np.isnan(theta[s]))
+            knowledge_vector = {tracker.domains[j]: float(mastery[s, j]) for j in observed}
+            overall_level, strengths, weaknesses = tracker.analyze_knowledge_state(knowledge_vector)
+            results.append(KnowledgeStateResponse(
+                student_id=student.student_id,
+                knowledge_vector=knowledge_vector,
+                overall_level=overall_level,
+                strengths=strengths,
+                weaknesses=weaknesses,
+                ability_estimates={
+                    tracker.domains[j]: AbilityEstimate(theta=theta[s, j], standard_error=se[s, j])
+                    for j in observed
+                },
+                calculated_at=calculated_at
+            ))
+
+        return BatchKnowledgeStateResponse(results=results, total=len(results))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error calculating batch knowledge states: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/events/grade", response_model=GradeEventResponse)
+async def record_grade_event(
+    event: GradeEvent,
+    store: KnowledgeStateStore = Depends(get_knowledge_state_store)
+):
+    """
+    Fold a single new grade into the student's server-side knowledge state
+
+    Only the knowledge domains covered by the graded course are updated,
+    so clients no longer need to resend the full score history. An event
+    issued before the stored grade of the same course is ignored.
+
+    Args:
+        event: Student ID, course name, score and issue time
+
+    Returns:
+        Updated mastery levels of the affected domains
+    """
+    try:
+        abilities, applied = store.record_grade(
+            event.student_id, event.course_name, event.score, event.occurred_at
+        )
+        return GradeEventResponse(
+            student_id=event.student_id,
+            updated_domains={domain: float(expit(theta)) for domain, (theta, _) in abilities.items()},
+            ability_estimates={
+                domain: AbilityEstimate(theta=theta, standard_error=se)
+                for domain, (theta, se) in abilities.items()
+            },
+            applied=applied,
+            processed_at=datetime.now()
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error recording grade event: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/state/{student_id}", response_model=KnowledgeStateResponse)
+async def get_knowledge_state(
+    student_id: str,
+    tracker: IRTKnowledgeTracker = Depends(get_knowledge_tracker),
+    store: KnowledgeStateStore = Depends(get_knowledge_state_store)
+):
+    """
+    Get a student's running knowledge state built from grade events
+
+    Args:
+        student_id: Student ID
+
+    Returns:
+        Knowledge state with domain-wise mastery levels
+    """
+    try:
+        abilities = store.get_abilities(student_id)
+        if abilities is None:
+            raise HTTPException(status_code=404, detail=f"No knowledge state for student {student_id}")
+
+        knowledge_vector = {domain: float(expit(theta)) for domain, (theta, _) in abilities.items()}
+        overall_level, strengths, weaknesses = tracker.analyze_knowledge_state(knowledge_vector)
+
+        return KnowledgeStateResponse(
+            student_id=student_id,
+            knowledge_vector=knowledge_vector,
+            overall_level=overall_level,
+            strengths=strengths,
+            weaknesses=weaknesses,
+            ability_estimates={
+                domain: AbilityEstimate(theta=theta, standard_error=se)
+                for domain, (theta, se) in abilities.items()
+            },
+            calculated_at=datetime.now()
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting knowledge state for {student_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/recommend", response_model=RecommendationResponse)
 async def recommend_courses(
     request: RecommendationRequest,
-    tracker: IRTKnowledgeTracker = Depends(get_knowledge_tracker),
-    course_service: CourseService = Depends(get_course_service)
+    scorer: RecommendationScorer = Depends(get_recommendation_scorer),
+    cache: RecommendationCache = Depends(get_recommendation_cache)
 ):
     """
     Recommend courses based on student's knowledge state
@@ -293,6 +495,10 @@ async def recommend_courses(
     - Personalized difficulty assessment
     - Completed courses
 
+    Results are computed from the knowledge state rounded to the cache
+    quantum and memoized by completed-course set, quantized knowledge
+    state and max_recommendations.
+
     Args:
         request: Student ID, knowledge state, completed courses
 
@@ -307,141 +513,112 @@ async def recommend_courses(
                 detail="Knowledge state required for recommendations"
             )
 
-        # Get all available courses
-        all_courses = course_service.get_all_courses()
+        def compute(knowledge_state, completed_courses):
+            # Score every course in one vectorized pass and keep the top N;
+            # only the winners become response objects
+            with observe_stage("recommendation.score"):
+                scored = scorer.recommend(
+                    knowledge_state,
+                    completed_courses,
+                    request.max_recommendations
+                )
+            return [build_recommendation_item(item) for item in scored]
+
+        top_recommendations = cache.get_or_compute(
+            scorer,
+            request.knowledge_state,
+            request.completed_courses,
+            request.max_recommendations,
+            compute
+        )
 
-        recommendations = []
+        return RecommendationResponse(
+            student_id=request.student_id,
+            recommendations=top_recommendations,
+            generated_at=datetime.now()
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating recommendations: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        for course in all_courses:
-            # Skip completed courses
-            if course.id in request.completed_courses:
-                continue
 
-            # Get detailed course info
-            course_detail = course_service.get_course_by_id(course.id)
-            if not course_detail:
-                continue
+@router.post("/recommend/batch", response_model=BatchRecommendationResponse)
+async def recommend_courses_batch(
+    request: BatchRecommendationRequest,
+    scorer: RecommendationScorer = Depends(get_recommendation_scorer),
+    cache: RecommendationCache = Depends(get_recommendation_cache)
+):
+    """
+    Recommend courses for many students at once
 
-            # Check prerequisites
-            missing_prerequisites = []
-            prerequisites_met = True
+    Scores all students against the catalog as a students × courses
+    matrix in one pass. Knowledge states are rounded to the cache quantum
+    as for the single-student endpoint, so both return the same results.
 
-            for prereq_id in course_detail.prerequisites:
-                if prereq_id not in request.completed_courses:
-                    prerequisites_met = False
-                    missing_prerequisites.append(prereq_id)
+    Args:
+        request: Per-student knowledge states and completed courses
 
-            # Calculate personalized difficulty
-            difficulty_score, difficulty_label = tracker.calculate_course_difficulty_for_student(
-                course.label,
-                request.knowledge_state
+    Returns:
+        Per-student recommendation lists, in request order
+    """
+    try:
+        # Same validation as the single-student endpoint, per student
+        for student in request.students:
+            if not student.knowledge_state:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Knowledge state required for recommendations (student {student.student_id})"
+                )
+
+        with observe_stage("recommendation.score_batch"):
+            scored = scorer.recommend_batch(
+                [cache.quantize(student.knowledge_state) for student in request.students],
+                [student.completed_courses for student in request.students],
+                request.max_recommendations
             )
 
-            # Calculate match score based on:
-            # 1. Prerequisites satisfaction (35%)
-            # 2. Knowledge readiness (40%)
-            # 3. Optimal challenge curve (25%)
-            match_score = 0.0
-
-            # 1. Prerequisites (35%)
-            if prerequisites_met:
-                match_score += 0.35
-            else:
-                # Strong penalty for missing prerequisites
-                penalty = min(0.35, len(missing_prerequisites) * 0.12)
-                match_score += max(0, 0.35 - penalty)
-
-            # 2. Knowledge readiness (40%) - Most important factor
-            # Use a bell curve that peaks at moderate readiness
-            knowledge_readiness = 1.0 - difficulty_score
-            if knowledge_readiness > 0.85:
-                # Too easy - discourage
-                readiness_score = 0.40 * (0.5 + 0.5 * (1 - knowledge_readiness) / 0.15)
-            elif knowledge_readiness >= 0.6:
-                # Sweet spot - high readiness
-                readiness_score = 0.40
-            elif knowledge_readiness >= 0.4:
-                # Moderate - acceptable
-                readiness_score = 0.40 * (0.6 + 0.4 * (knowledge_readiness - 0.4) / 0.2)
-            elif knowledge_readiness >= 0.25:
-                # Below threshold - penalize
-                readiness_score = 0.40 * (0.3 + 0.3 * (knowledge_readiness - 0.25) / 0.15)
-            else:
-                # Too difficult - strong penalty
-                readiness_score = 0.40 * (0.3 * knowledge_readiness / 0.25)
-            match_score += readiness_score
-
-            # 3. Optimal challenge curve (25%)
-            # Prefer moderate challenge - not too easy, not too hard
-            if 0.3 <= difficulty_score <= 0.5:
-                # Optimal zone
-                challenge_score = 0.25
-            elif 0.2 <= difficulty_score < 0.3 or 0.5 < difficulty_score <= 0.6:
-                # Good zone
-                challenge_score = 0.20
-            elif 0.1 <= difficulty_score < 0.2 or 0.6 < difficulty_score <= 0.7:
-                # Acceptable zone
-                challenge_score = 0.15
-            elif difficulty_score < 0.1:
-                # Too easy - penalize
-                challenge_score = 0.08
-            elif difficulty_score <= 0.8:
-                # Getting hard
-                challenge_score = 0.10
-            else:
-                # Too hard - strong penalty
-                challenge_score = 0.05
-            match_score += challenge_score
-
-            # Add random variation to ensure diversity (±3%)
-            match_score += random.uniform(-0.03, 0.03)
-
-            # Clamp to [0, 1] and scale to 60-95% range for display
-            match_score = max(0.0, min(1.0, match_score))
-            # Scale: map [0.5, 1.0] -> [0.6, 0.95], map [0, 0.5) -> [0.3, 0.6)
-            if match_score >= 0.5:
-                match_score = 0.6 + (match_score - 0.5) * 0.7  # 0.5->0.6, 1.0->0.95
-            else:
-                match_score = 0.3 + match_score * 0.6  # 0->0.3, 0.5->0.6
-
-            # Generate personalized recommendation reason
-            reason = generate_personalized_reason(
-                course_name=course.label,
-                prerequisites_met=prerequisites_met,
-                knowledge_readiness=knowledge_readiness,
-                difficulty_score=difficulty_score,
-                missing_prerequisites=missing_prerequisites
+        generated_at = datetime.now()
+        results = [
+            RecommendationResponse(
+                student_id=student.student_id,
+                recommendations=[build_recommendation_item(item) for item in items],
+                generated_at=generated_at
             )
+            for student, items in zip(request.students, scored)
+        ]
 
-            recommendations.append(RecommendationItem(
-                course_id=course.id,
-                course_name=course.label,
-                reason=reason,
-                match_score=match_score,
-                difficulty_match=difficulty_label,
-                prerequisites_met=prerequisites_met,
-                missing_prerequisites=missing_prerequisites
-            ))
-
-        # Sort by match score and take top N
-        recommendations.sort(key=lambda x: x.match_score, reverse=True)
-        top_recommendations = recommendations[:request.max_recommendations]
-
-        return RecommendationResponse(
-            student_id=request.student_id,
-            recommendations=top_recommendations,
-            generated_at=datetime.now()
+        return BatchRecommendationResponse(
+            results=results,
+            total=len(results),
+            generated_at=generated_at
         )
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error generating recommendations: {e}")
+        logger.error(f"Error generating batch recommendations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/recommend/cache")
+async def get_recommendation_cache_stats(
+    cache: RecommendationCache = Depends(get_recommendation_cache)
+):
+    """
+    Get recommendation cache statistics
+
+    Returns:
+        Cache size, hit/miss/eviction/invalidation counters and hit rate
+    """
+    return cache.stats()
+
+
 @router.get("/domains")
 async def get_knowledge_domains(
+    request: Request,
     tracker: IRTKnowledgeTracker = Depends(get_knowledge_tracker)
 ):
     """
@@ -451,15 +628,12 @@ async def get_knowledge_domains(
         List of knowledge domains tracked by the system
     """
     try:
-        # Extract unique domains from course mapping
-        domains = set()
-        for course_domains in tracker.course_knowledge_mapping.values():
-            domains.update(course_domains)
-
-        return {
-            "domains": sorted(list(domains)),
-            "total": len(domains)
-        }
+        # Domains are the sorted union of the course mapping's domains
+        body, etag = _domains_body.get(
+            tuple(tracker.domains),
+            lambda: {"domains": list(tracker.domains), "total": len(tracker.domains)}
+        )
+        return conditional_json_response(request, body, etag)
 
     except Exception as e:
         logger.error(f"Error getting knowledge domains: {e}")
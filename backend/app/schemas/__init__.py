@@ -4,17 +4,30 @@ from app.schemas.course import (
     CourseDetail,
     CourseSearchRequest,
     CourseSearchResponse,
+    CourseSuggestion,
+    CourseSuggestResponse,
     PrerequisitePathRequest,
     PrerequisitePathResponse,
     LearningPathRequest,
-    LearningPathResponse
+    SemesterPlan,
+    LearningPathResponse,
+    MultiTargetLearningPathRequest,
+    MultiTargetLearningPathResponse
 )
 from app.schemas.knowledge import (
     KnowledgeStateRequest,
+    AbilityEstimate,
     KnowledgeStateResponse,
+    BatchKnowledgeStateRequest,
+    BatchKnowledgeStateResponse,
+    GradeEvent,
+    GradeEventResponse,
     RecommendationRequest,
     RecommendationItem,
-    RecommendationResponse
+    RecommendationResponse,
+    StudentRecommendationInput,
+    BatchRecommendationRequest,
+    BatchRecommendationResponse
 )
 
 __all__ = [
@@ -22,13 +35,26 @@ __all__ = [
     "CourseDetail",
     "CourseSearchRequest",
     "CourseSearchResponse",
+    "CourseSuggestion",
+    "CourseSuggestResponse",
     "PrerequisitePathRequest",
     "PrerequisitePathResponse",
     "LearningPathRequest",
+    "SemesterPlan",
     "LearningPathResponse",
+    "MultiTargetLearningPathRequest",
+    "MultiTargetLearningPathResponse",
     "KnowledgeStateRequest",
+    "AbilityEstimate",
     "KnowledgeStateResponse",
+    "BatchKnowledgeStateRequest",
+    "BatchKnowledgeStateResponse",
+    "GradeEvent",
+    "GradeEventResponse",
     "RecommendationRequest",
     "RecommendationItem",
-    "RecommendationResponse"
+    "RecommendationResponse",
+    "StudentRecommendationInput",
+    "BatchRecommendationRequest",
+    "BatchRecommendationResponse"
 ]
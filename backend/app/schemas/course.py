@@ -25,6 +25,7 @@ class CourseSearchRequest(BaseModel):
     """Course search request"""
     keyword: str = Field(..., description="Search keyword")
     search_type: str = Field("fuzzy", description="Search type: fuzzy or exact")
+    limit: Optional[int] = Field(None, ge=1, le=1000, description="Maximum number of results")
 
 
 class CourseSearchResponse(BaseModel):
@@ -33,18 +34,38 @@ class CourseSearchResponse(BaseModel):
     total: int = Field(..., description="Total number of results")
 
 
+class CourseSuggestion(BaseModel):
+    """Autocomplete suggestion"""
+    id: int
+    label: str = Field(..., description="Course name")
+    unlocks: int = Field(..., description="Number of courses this course (transitively) unlocks")
+
+
+class CourseSuggestResponse(BaseModel):
+    """Autocomplete response"""
+    prefix: str
+    suggestions: List[CourseSuggestion]
+
+
 class PrerequisitePathRequest(BaseModel):
     """Request for prerequisite path"""
     course_id: int = Field(..., description="Target course ID")
-    max_depth: int = Field(5, description="Maximum depth of prerequisite chain")
+    max_depth: int = Field(5, ge=1, le=20, description="Maximum depth of prerequisite chain")
+    offset: int = Field(0, ge=0, description="Number of shortest paths to skip")
+    limit: int = Field(100, ge=0, le=1000, description="Maximum number of paths to return")
 
 
 class PrerequisitePathResponse(BaseModel):
     """Prerequisite path response"""
     course_id: int
     course_name: str
-    path: List[List[int]] = Field(..., description="All possible prerequisite paths")
+    path: List[List[int]] = Field(..., description="Requested page of prerequisite paths, shortest first")
     path_details: List[Dict[str, Any]] = Field(..., description="Detailed path information")
+    total_paths: int = Field(0, description="Total number of paths up to max_depth")
+    path_counts: Dict[int, int] = Field(default_factory=dict, description="Number of paths of each length")
+    offset: int = 0
+    has_more: bool = Field(False, description="Whether more paths follow this page")
+    path_tree: Optional[Dict[str, Any]] = Field(None, description="Paths of this page merged by shared prefix from the target")
 
 
 class LearningPathRequest(BaseModel):
@@ -52,6 +73,14 @@ class LearningPathRequest(BaseModel):
     target_course_id: int
     completed_courses: List[int] = Field(default_factory=list)
     knowledge_state: Optional[Dict[str, float]] = Field(None, description="Student's knowledge state")
+    max_credits_per_semester: Optional[float] = Field(None, gt=0, description="Credit cap per semester (server default if omitted)")
+
+
+class SemesterPlan(BaseModel):
+    """Courses scheduled in one semester"""
+    semester: int = Field(..., description="Semester number, starting at 1")
+    course_ids: List[int]
+    credits: float
 
 
 class LearningPathResponse(BaseModel):
@@ -62,3 +91,23 @@ class LearningPathResponse(BaseModel):
     course_details: List[CourseDetail]
     total_credits: float
     estimated_semesters: int
+    semesters: List[SemesterPlan] = Field(default_factory=list, description="Semester-by-semester schedule")
+
+
+class MultiTargetLearningPathRequest(BaseModel):
+    """Request for one learning path reaching several target courses"""
+    target_course_ids: List[int] = Field(..., min_length=1, max_length=50, description="Target course IDs")
+    completed_courses: List[int] = Field(default_factory=list)
+    max_credits_per_semester: Optional[float] = Field(None, gt=0, description="Credit cap per semester (server default if omitted)")
+
+
+class MultiTargetLearningPathResponse(BaseModel):
+    """Combined learning path response for several targets"""
+    target_course_ids: List[int]
+    target_course_names: List[str]
+    recommended_sequence: List[int] = Field(..., description="Recommended course sequence covering all targets")
+    shared_prerequisites: List[int] = Field(default_factory=list, description="Planned prerequisites needed by more than one target")
+    course_details: List[CourseDetail]
+    total_credits: float
+    estimated_semesters: int
+    semesters: List[SemesterPlan] = Field(default_factory=list, description="Semester-by-semester schedule")
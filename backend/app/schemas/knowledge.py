@@ -1,18 +1,25 @@
 """
 Knowledge tracking related schemas
 """
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, confloat
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 
 
 class KnowledgeStateRequest(BaseModel):
     """Request for knowledge state calculation"""
     student_id: str
-    course_scores: Dict[str, float] = Field(
+    course_scores: Dict[str, confloat(ge=0, le=100)] = Field(
         ...,
         description="Course ID to score mapping (0-100)"
     )
+    method: Literal["eap", "mle"] = Field("eap", description="Ability estimation method: eap or mle")
+
+
+class AbilityEstimate(BaseModel):
+    """IRT ability estimate for one knowledge domain"""
+    theta: float = Field(..., description="Ability on the IRT scale")
+    standard_error: float = Field(..., description="Standard error of the ability estimate")
 
 
 class KnowledgeStateResponse(BaseModel):
@@ -25,9 +32,48 @@ class KnowledgeStateResponse(BaseModel):
     overall_level: float = Field(..., description="Overall knowledge level")
     strengths: List[str] = Field(..., description="Strong knowledge areas")
     weaknesses: List[str] = Field(..., description="Weak knowledge areas")
+    ability_estimates: Dict[str, AbilityEstimate] = Field(
+        default_factory=dict,
+        description="Knowledge domain to IRT ability estimate mapping"
+    )
     calculated_at: datetime = Field(default_factory=datetime.now)
 
 
+class BatchKnowledgeStateRequest(BaseModel):
+    """Request for knowledge state calculation for many students"""
+    students: List[KnowledgeStateRequest]
+
+
+class BatchKnowledgeStateResponse(BaseModel):
+    """Batch knowledge state response"""
+    results: List[KnowledgeStateResponse]
+    total: int = Field(..., description="Number of students")
+
+
+class GradeEvent(BaseModel):
+    """A single new grade for a student"""
+    student_id: str
+    course_name: str = Field(..., description="Graded course name")
+    score: float = Field(..., ge=0, le=100, description="Course score (0-100)")
+    occurred_at: Optional[datetime] = Field(
+        None,
+        description="When the grade was issued (time of receipt if omitted); "
+                    "events older than the stored grade of the course are ignored"
+    )
+
+
+class GradeEventResponse(BaseModel):
+    """Knowledge state changes caused by a grade event"""
+    student_id: str
+    updated_domains: Dict[str, float] = Field(
+        ...,
+        description="Updated mastery levels (0-1) of the domains covered by the course"
+    )
+    ability_estimates: Dict[str, AbilityEstimate] = Field(default_factory=dict)
+    applied: bool = Field(True, description="False if the event was older than the stored grade and ignored")
+    processed_at: datetime = Field(default_factory=datetime.now)
+
+
 class RecommendationRequest(BaseModel):
     """Request for course recommendation"""
     student_id: str
@@ -52,3 +98,23 @@ class RecommendationResponse(BaseModel):
     student_id: str
     recommendations: List[RecommendationItem]
     generated_at: datetime = Field(default_factory=datetime.now)
+
+
+class StudentRecommendationInput(BaseModel):
+    """Per-student input for batch course recommendation"""
+    student_id: str
+    knowledge_state: Dict[str, float]
+    completed_courses: List[int] = Field(default_factory=list)
+
+
+class BatchRecommendationRequest(BaseModel):
+    """Request for course recommendations for many students"""
+    students: List[StudentRecommendationInput]
+    max_recommendations: int = Field(5, description="Maximum number of recommendations per student")
+
+
+class BatchRecommendationResponse(BaseModel):
+    """Batch course recommendation response"""
+    results: List[RecommendationResponse]
+    total: int = Field(..., description="Number of students")
+    generated_at: datetime = Field(default_factory=datetime.now)
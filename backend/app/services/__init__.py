@@ -1,5 +1,13 @@
 """Services package"""
+from app.services.course_graph import CourseGraph, get_course_graph, load_course_graph
 from app.services.course_service import CourseService
 from app.services.knowledge_tracking import IRTKnowledgeTracker, get_knowledge_tracker
 
-__all__ = ["CourseService", "IRTKnowledgeTracker", "get_knowledge_tracker"]
+__all__ = [
+    "CourseGraph",
+    "get_course_graph",
+    "load_course_graph",
+    "CourseService",
+    "IRTKnowledgeTracker",
+    "get_knowledge_tracker"
+]
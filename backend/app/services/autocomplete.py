@@ -0,0 +1,119 @@
+"""
+Course autocomplete - prefix trie with precomputed top-k completions
+
+Built on first use per course graph snapshot over normalized course labels
+and their full pinyin and initials. Every trie node stores its k best
+completions, ranked by how many courses a course (transitively) unlocks,
+so a keystroke is answered with one walk down the trie and no sorting.
+
+Nodes are expanded lazily: a node keeps its (key, course) pairs until a
+lookup first walks through it, so only prefixes that are actually typed
+are ever split into children. A branch holding at most k courses is never
+expanded and is filtered on lookup instead, which bounds memory on large
+catalogs.
+"""
+from typing import Dict, List, Optional, Tuple
+import logging
+from app.services.search_index import normalize, pinyin_forms
+
+logger = logging.getLogger(__name__)
+
+
+class _TrieNode:
+    __slots__ = ("children", "top", "items", "depth")
+
+    def __init__(self, items: List[Tuple[str, int]], depth: int, k: int):
+        # (key, course index) pairs below this node, best first; dropped once expanded
+        self.items: Optional[List[Tuple[str, int]]] = items
+        self.depth = depth
+        top = _unique((idx for _, idx in items), k + 1)
+        self.top: Tuple[int, ...] = top[:k]
+        # None until expanded; stays None for a branch of at most k courses
+        self.children: Optional[Dict[str, "_TrieNode"]] = None if len(top) <= k else {}
+
+    @property
+    def is_bucket(self) -> bool:
+        """Whether this branch is small enough to be filtered instead of walked"""
+        return self.children is None
+
+
+def _unique(indices, k: int) -> Tuple[int, ...]:
+    """First k distinct course indices, order preserved"""
+    seen = []
+    for idx in indices:
+        if idx not in seen:
+            seen.append(idx)
+            if len(seen) == k:
+                break
+    return tuple(seen)
+
+
+class CourseSuggestTrie:
+    """Prefix trie over course labels with top-k completions per node"""
+
+    def __init__(self, graph, k: int = 10, use_pinyin: bool = True):
+        """
+        Args:
+            graph: Course graph snapshot
+            k: Completions stored per node (maximum suggestions returned)
+            use_pinyin: Also index pinyin and initials
+        """
+        self.graph = graph
+        self.k = k
+        self.pinyin_enabled = use_pinyin
+
+        # Courses unlocked (transitively) by each course, in one topological pass
+        self.unlocks = graph.closure.descendant_counts()
+
+        items = []
+        for idx, course in enumerate(graph.courses):
+            keys = {normalize(course["label"])}
+            if self.pinyin_enabled:
+                keys.update(pinyin_forms(course["label"]))
+            items.extend((key, idx) for key in keys if key)
+        courses = graph.courses
+        items.sort(key=lambda item: (-self.unlocks[item[1]], len(courses[item[1]]["label"]), item[1]))
+
+        self.num_keys = len(items)
+        self.root = _TrieNode(items, 0, k)
+        logger.info(f"Built course autocomplete trie: {len(items)} keys, top {k} per node")
+
+    def _expand(self, node: _TrieNode) -> Dict[str, _TrieNode]:
+        """Split a node's pairs into children by their next character, once"""
+        items = node.items
+        if items is not None:
+            groups: Dict[str, List[Tuple[str, int]]] = {}
+            depth = node.depth
+            for key, idx in items:
+                if len(key) > depth:
+                    groups.setdefault(key[depth], []).append((key, idx))
+            # Publish the finished children before dropping the pairs
+            node.children = {char: _TrieNode(group, depth + 1, self.k) for char, group in groups.items()}
+            node.items = None
+        return node.children
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Best completions of a prefix
+
+        Args:
+            prefix: Typed prefix of a label, its pinyin or its initials
+            limit: Maximum number of suggestions (at most k)
+
+        Returns:
+            Snapshot indices of the suggested courses, best first
+        """
+        limit = self.k if limit is None else min(limit, self.k)
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        node = self.root
+        for char in prefix:
+            if node.is_bucket:
+                matches = (idx for key, idx in node.items if key.startswith(prefix))
+                return list(_unique(matches, limit))
+            node = self._expand(node).get(char)
+            if node is None:
+                return []
+        return list(node.top[:limit])
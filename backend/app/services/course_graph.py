@@ -0,0 +1,232 @@
+"""
+Course graph snapshot - compiled, read-only view of the course catalog
+
+The catalog changes a few times per semester but is read on every request,
+so it is loaded once (from Neo4j or the demo data) into an integer-indexed
+course table with CSR adjacency for both directions of PREREQUISITE edges.
+"""
+from types import MappingProxyType
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Iterable, Mapping, Tuple
+from datetime import datetime
+import hashlib
+import json
+import logging
+import numpy as np
+from app.database.neo4j_driver import Neo4jDriver, neo4j_driver
+
+logger = logging.getLogger(__name__)
+
+
+def _build_csr(rows: np.ndarray, cols: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build CSR (indptr, indices) arrays from edge row/column index arrays
+
+    Neighbours of each row are sorted by column index.
+    """
+    order = np.lexsort((cols, rows))
+    indices = cols[order].astype(np.int32)
+    counts = np.bincount(rows, minlength=n)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indptr.flags.writeable = False
+    indices.flags.writeable = False
+    return indptr, indices
+
+
+class CourseGraph:
+    """
+    Immutable snapshot of the course knowledge graph
+
+    Courses are stored in a table ordered by course ID and addressed by a
+    dense integer index. Prerequisite edges are kept in CSR form twice:
+    ``prereq_indptr/prereq_indices`` lists the prerequisites of each course,
+    ``succ_indptr/succ_indices`` lists the courses each course unlocks.
+    """
+
+    def __init__(self,
+                 courses: Iterable[Mapping[str, Any]],
+                 relationships: Iterable[Mapping[str, Any]],
+                 source: str = "demo"):
+        """
+        Compile a snapshot from raw course and relationship records
+
+        Args:
+            courses: Course records with at least ``id`` and ``label``
+            relationships: Edge records with ``from`` (prerequisite) and ``to``
+            source: Backend the data was loaded from ("neo4j" or "demo")
+        """
+        records = sorted((self._freeze_course(c) for c in courses), key=lambda c: c["id"])
+        self.courses: Tuple[Mapping[str, Any], ...] = tuple(records)
+        self.course_ids = np.array([c["id"] for c in records], dtype=np.int64)
+        self.course_ids.flags.writeable = False
+        self._index: Dict[int, int] = {c["id"]: i for i, c in enumerate(records)}
+
+        edges = set()
+        for rel in relationships:
+            src = self._index.get(rel["from"])
+            dst = self._index.get(rel["to"])
+            if src is None or dst is None:
+                logger.warning(f"Skipping relationship with unknown course: {rel['from']} -> {rel['to']}")
+                continue
+            edges.add((src, dst))
+
+        n = len(records)
+        edge_array = np.array(sorted(edges), dtype=np.int64).reshape(-1, 2)
+        src_idx, dst_idx = edge_array[:, 0], edge_array[:, 1]
+        self.prereq_indptr, self.prereq_indices = _build_csr(dst_idx, src_idx, n)
+        self.succ_indptr, self.succ_indices = _build_csr(src_idx, dst_idx, n)
+
+        self.source = source
+        self.built_at = datetime.now()
+        self.version = self._compute_version(records, edge_array)
+
+    @staticmethod
+    def _freeze_course(course: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Normalize a raw course record into a read-only mapping"""
+        return MappingProxyType({
+            "id": int(course["id"]),
+            "label": course["label"],
+            "difficulty": course.get("difficulty"),
+            "credits": course.get("credits"),
+            "course_type": course.get("course_type"),
+            "description": course.get("description") or course["label"],
+            "knowledge_points": tuple(course.get("knowledge_points") or ()),
+        })
+
+    def _compute_version(self, records: List[Mapping[str, Any]], edges: np.ndarray) -> str:
+        """Content hash identifying this catalog snapshot"""
+        digest = hashlib.sha1()
+        digest.update(json.dumps([dict(c) for c in records], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        digest.update(self.course_ids[edges].tobytes())
+        return digest.hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def __contains__(self, course_id: int) -> bool:
+        return course_id in self._index
+
+    @property
+    def num_relationships(self) -> int:
+        """Number of PREREQUISITE edges in the snapshot"""
+        return int(self.prereq_indices.shape[0])
+
+    def index_of(self, course_id: int) -> Optional[int]:
+        """Dense index of a course ID, or None if unknown"""
+        return self._index.get(course_id)
+
+    def get(self, course_id: int) -> Optional[Mapping[str, Any]]:
+        """Course record by ID, or None if unknown"""
+        idx = self._index.get(course_id)
+        return self.courses[idx] if idx is not None else None
+
+    def prerequisite_indices(self, idx: int) -> np.ndarray:
+        """Indices of direct prerequisites of the course at ``idx``"""
+        return self.prereq_indices[self.prereq_indptr[idx]:self.prereq_indptr[idx + 1]]
+
+    def successor_indices(self, idx: int) -> np.ndarray:
+        """Indices of courses directly unlocked by the course at ``idx``"""
+        return self.succ_indices[self.succ_indptr[idx]:self.succ_indptr[idx + 1]]
+
+    def prerequisite_ids(self, course_id: int) -> List[int]:
+        """Direct prerequisite IDs of a course, sorted ascending"""
+        idx = self._index.get(course_id)
+        if idx is None:
+            return []
+        return self.course_ids[self.prerequisite_indices(idx)].tolist()
+
+    def successor_ids(self, course_id: int) -> List[int]:
+        """IDs of courses directly unlocked by a course, sorted ascending"""
+        idx = self._index.get(course_id)
+        if idx is None:
+            return []
+        return self.course_ids[self.successor_indices(idx)].tolist()
+
+    def course_detail(self, course_id: int) -> Optional[Dict[str, Any]]:
+        """Course record with its direct prerequisites, as a plain dict"""
+        course = self.get(course_id)
+        if course is None:
+            return None
+        detail = dict(course)
+        detail["knowledge_points"] = list(course["knowledge_points"])
+        detail["prerequisites"] = self.prerequisite_ids(course_id)
+        return detail
+
+    @cached_property
+    def closure(self):
+        """Transitive prerequisite closure (memoized DFS), filled lazily per snapshot"""
+        from app.services.prerequisite_closure import PrerequisiteClosure
+        return PrerequisiteClosure(self)
+
+    @cached_property
+    def search_index(self):
+        """N-gram search index over course labels, built once per snapshot"""
+        from app.services.search_index import CourseSearchIndex
+        return CourseSearchIndex(self)
+
+    @cached_property
+    def suggest_trie(self):
+        """Autocomplete prefix trie over course labels, built on first use per snapshot"""
+        from app.services.autocomplete import CourseSuggestTrie
+        from app.config import settings
+        return CourseSuggestTrie(self, k=settings.suggest_top_k)
+
+    @classmethod
+    def from_mock_data(cls) -> "CourseGraph":
+        """Compile a snapshot from the demo-mode JSON data"""
+        from app.database.mock_data import get_mock_courses, get_mock_relationships
+        return cls(get_mock_courses(), get_mock_relationships(), source="demo")
+
+    @classmethod
+    def from_neo4j(cls, db: Neo4jDriver) -> "CourseGraph":
+        """Compile a snapshot from the Neo4j knowledge graph"""
+        courses = db.execute_query("""
+        MATCH (c:Course)
+        RETURN c.id as id, c.label as label,
+               c.difficulty as difficulty, c.credits as credits,
+               c.course_type as course_type,
+               c.description as description,
+               c.knowledge_points as knowledge_points
+        """, use_cache=False, name="course_graph.courses")
+        relationships = db.execute_query("""
+        MATCH (prereq:Course)-[:PREREQUISITE]->(c:Course)
+        RETURN prereq.id as from, c.id as to
+        """, use_cache=False, name="course_graph.relationships")
+        return cls(courses, relationships, source="neo4j")
+
+
+def build_course_graph(db: Neo4jDriver) -> CourseGraph:
+    """Compile a snapshot from Neo4j, or from demo data when not connected"""
+    if db._driver is None:
+        return CourseGraph.from_mock_data()
+    return CourseGraph.from_neo4j(db)
+
+
+# Global snapshot, replaced wholesale on reload
+_course_graph: Optional[CourseGraph] = None
+
+
+def load_course_graph(db: Neo4jDriver) -> CourseGraph:
+    """
+    (Re)build the global course graph snapshot
+
+    Readers holding the previous snapshot keep a consistent view; new
+    requests see the new one once it is fully compiled.
+    """
+    global _course_graph
+    graph = build_course_graph(db)
+    graph.search_index
+    _course_graph = graph
+    logger.info(
+        f"Loaded course graph snapshot {graph.version} from {graph.source}: "
+        f"{len(graph)} courses, {graph.num_relationships} prerequisites"
+    )
+    return graph
+
+
+def get_course_graph() -> CourseGraph:
+    """Get the global course graph snapshot, building it on first use"""
+    if _course_graph is None:
+        return load_course_graph(neo4j_driver)
+    return _course_graph
@@ -1,9 +1,14 @@
 """
 Course service - handles course-related business logic
 """
-from typing import List, Dict, Any, Optional
-from app.database.neo4j_driver import Neo4jDriver
+from typing import List, Dict, Any, Optional, Iterable
+import asyncio
+from app.config import settings
+from app.database.neo4j_driver import Neo4jDriver, AsyncNeo4jDriver
 from app.schemas.course import CourseBase, CourseDetail
+from app.services.course_graph import CourseGraph, get_course_graph
+from app.services.prerequisite_paths import PrerequisitePathEngine
+from app.services.learning_path_planner import LearningPathPlanner
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,118 +17,154 @@ logger = logging.getLogger(__name__)
 class CourseService:
     """Service for course operations"""
 
-    def __init__(self, db: Neo4jDriver):
+    def __init__(self,
+                 db: Neo4jDriver,
+                 graph: Optional[CourseGraph] = None,
+                 async_db: Optional[AsyncNeo4jDriver] = None):
         self.db = db
+        self.async_db = async_db
+        # Read paths are served from the compiled in-memory snapshot
+        self.graph = graph if graph is not None else get_course_graph()
 
     def get_all_courses(self) -> List[CourseBase]:
         """Get all courses from the knowledge graph"""
-        if self.db._driver is None:
-            # Demo mode - use mock data
-            from app.database.mock_data import get_mock_courses
-            return [CourseBase(**course) for course in get_mock_courses()]
-
-        query = """
-        MATCH (c:Course)
-        RETURN c.id as id, c.label as label,
-               c.difficulty as difficulty, c.credits as credits,
-               c.course_type as course_type
-        ORDER BY c.id
-        """
-        results = self.db.execute_query(query)
-        return [CourseBase(**record) for record in results]
+        return [CourseBase(**course) for course in self.graph.courses]
 
-    def get_course_by_id(self, course_id: int) -> Optional[CourseDetail]:
+    async def get_course_by_id(self, course_id: int) -> Optional[CourseDetail]:
         """Get detailed course information by ID"""
-        if self.db._driver is None:
-            # Demo mode - use mock data
-            from app.database.mock_data import get_mock_course_by_id
-            course_data = get_mock_course_by_id(course_id)
-            if course_data:
-                return CourseDetail(**course_data)
-            return None
-
-        query = """
-        MATCH (c:Course {id: $course_id})
-        OPTIONAL MATCH (prereq:Course)-[:PREREQUISITE]->(c)
-        RETURN c.id as id, c.label as label,
-               c.difficulty as difficulty, c.credits as credits,
-               c.course_type as course_type,
-               c.description as description,
-               c.knowledge_points as knowledge_points,
-               collect(DISTINCT prereq.id) as prerequisites
+        record = self.graph.course_detail(course_id)
+        if record is not None:
+            return CourseDetail(**record)
+        return (await self.get_courses_by_ids([course_id])).get(course_id)
+
+    def _async_connected(self) -> bool:
+        return self.async_db is not None and self.async_db._driver is not None
+
+    async def _query(self,
+                     query: str,
+                     parameters: Dict[str, Any],
+                     name: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        results = self.db.execute_query(query, {"course_id": course_id})
-
-        if not results:
-            return None
+        Run a read query without blocking the event loop
 
-        record = results[0]
-        # Filter out None values from prerequisites
-        record['prerequisites'] = [pid for pid in record.get('prerequisites', []) if pid is not None]
-        # Ensure knowledge_points is a list
-        if not record.get('knowledge_points'):
-            record['knowledge_points'] = []
+        Uses the async driver when connected, otherwise runs the sync driver
+        in a worker thread.
+        """
+        if self._async_connected():
+            return await self.async_db.execute_query(query, parameters, name=name)
+        return await asyncio.to_thread(self.db.execute_query, query, parameters, name=name)
 
-        return CourseDetail(**record)
+    async def get_courses_by_ids(self, course_ids: Iterable[int]) -> Dict[int, CourseDetail]:
+        """
+        Get detailed course information for many courses at once
 
-    def search_courses(self, keyword: str, search_type: str = "fuzzy") -> List[CourseBase]:
-        """Search courses by keyword"""
-        if self.db._driver is None:
-            # Demo mode - use mock data
-            from app.database.mock_data import search_mock_courses
-            return [CourseBase(**course) for course in search_mock_courses(keyword)]
+        Courses are resolved from the snapshot in one dict lookup pass; any
+        IDs missing from it (e.g. added since the snapshot was built) are
+        fetched from Neo4j with a single UNWIND query.
 
-        if search_type == "exact":
-            query = """
-            MATCH (c:Course)
-            WHERE c.label = $keyword
-            RETURN c.id as id, c.label as label,
-                   c.difficulty as difficulty, c.credits as credits,
-                   c.course_type as course_type
-            """
-        else:  # fuzzy search
+        Returns:
+            Mapping from course ID to course detail; unknown IDs are omitted
+        """
+        courses: Dict[int, CourseDetail] = {}
+        missing = []
+        for course_id in dict.fromkeys(course_ids):
+            record = self.graph.course_detail(course_id)
+            if record is not None:
+                courses[course_id] = CourseDetail(**record)
+            else:
+                missing.append(course_id)
+
+        if missing and (self._async_connected() or self.db._driver is not None):
             query = """
-            MATCH (c:Course)
-            WHERE c.label CONTAINS $keyword
+            UNWIND $course_ids AS course_id
+            MATCH (c:Course {id: course_id})
+            OPTIONAL MATCH (prereq:Course)-[:PREREQUISITE]->(c)
             RETURN c.id as id, c.label as label,
                    c.difficulty as difficulty, c.credits as credits,
-                   c.course_type as course_type
-            ORDER BY c.id
+                   c.course_type as course_type,
+                   c.description as description,
+                   c.knowledge_points as knowledge_points,
+                   collect(DISTINCT prereq.id) as prerequisites
             """
-
-        results = self.db.execute_query(query, {"keyword": keyword})
-        return [CourseBase(**record) for record in results]
-
-    def get_prerequisites(self, course_id: int, max_depth: int = 5) -> List[List[int]]:
-        """Get all prerequisite paths for a course"""
-        if self.db._driver is None:
-            # Demo mode - use mock data
-            from app.database.mock_data import get_mock_prerequisites
-            return get_mock_prerequisites(course_id, max_depth)
-
-        query = """
-        MATCH path = (prereq:Course)-[:PREREQUISITE*1..$max_depth]->(c:Course {id: $course_id})
-        RETURN [node in nodes(path) | node.id] as path_nodes
-        ORDER BY length(path)
+            for record in await self._query(query, {"course_ids": missing}, "courses.by_ids"):
+                record['prerequisites'] = sorted(pid for pid in record.get('prerequisites', []) if pid is not None)
+                if not record.get('knowledge_points'):
+                    record['knowledge_points'] = []
+                courses[record['id']] = CourseDetail(**record)
+
+        return courses
+
+    def search_courses(self,
+                       keyword: str,
+                       search_type: str = "fuzzy",
+                       limit: Optional[int] = None) -> List[CourseBase]:
         """
+        Search courses by keyword
 
-        results = self.db.execute_query(query, {
-            "course_id": course_id,
-            "max_depth": max_depth
-        })
+        Fuzzy search is ranked and matches labels, knowledge points,
+        pinyin or initials, tolerating a typo.
+        """
+        index = self.graph.search_index
+        if search_type == "exact":
+            indices = index.exact(keyword)[:limit]
+        else:  # fuzzy search
+            indices = [idx for idx, _ in index.search(keyword, limit)]
+        return [CourseBase(**self.graph.courses[idx]) for idx in indices]
+
+    def get_prerequisite_paths(self, course_id: int, max_depth: int = 5) -> PrerequisitePathEngine:
+        """Get the lazy prerequisite path engine for a course"""
+        return PrerequisitePathEngine(self.graph, course_id, max_depth)
+
+    def get_prerequisites(self,
+                          course_id: int,
+                          max_depth: int = 5,
+                          offset: int = 0,
+                          limit: Optional[int] = None) -> List[List[int]]:
+        """
+        Get prerequisite paths for a course
 
-        return [record['path_nodes'] for record in results]
+        Each path runs from a prerequisite to the target course, has at most
+        ``max_depth`` edges, and paths are ordered by length. Only the
+        requested page of paths is enumerated.
+        """
+        return self.get_prerequisite_paths(course_id, max_depth).page(offset, limit)
 
     def get_direct_prerequisites(self, course_id: int) -> List[int]:
         """Get direct prerequisites for a course"""
-        query = """
-        MATCH (prereq:Course)-[:PREREQUISITE]->(c:Course {id: $course_id})
-        RETURN prereq.id as prereq_id
-        ORDER BY prereq.id
+        return self.graph.prerequisite_ids(course_id)
+
+    def get_all_prerequisites(self, course_id: int) -> List[int]:
+        """Get all transitive prerequisites for a course"""
+        return self.graph.closure.ancestors(course_id)
+
+    def get_missing_prerequisites(self, course_id: int, completed_courses: List[int]) -> List[int]:
+        """Get transitive prerequisites of a course not covered by completed courses"""
+        closure = self.graph.closure
+        return closure.missing(course_id, closure.satisfied_mask(completed_courses))
+
+    def is_unlocked(self, course_id: int, completed_courses: List[int]) -> bool:
+        """Check whether all direct prerequisites of a course are satisfied"""
+        closure = self.graph.closure
+        return closure.is_unlocked(course_id, closure.satisfied_mask(completed_courses))
+
+    def plan_learning_path(self,
+                           target_course_ids: List[int],
+                           completed_courses: List[int],
+                           max_credits: Optional[float] = None) -> Dict[str, Any]:
         """
+        Plan a semester-by-semester schedule reaching the target courses
+
+        Args:
+            target_course_ids: Target course IDs
+            completed_courses: Completed course IDs
+            max_credits: Credit cap per semester (defaults to settings)
 
-        results = self.db.execute_query(query, {"course_id": course_id})
-        return [record['prereq_id'] for record in results]
+        Returns:
+            Dictionary with the prerequisite-ordered ``sequence`` and ``semesters``
+        """
+        if max_credits is None:
+            max_credits = settings.semester_credit_cap
+        return LearningPathPlanner(self.graph).plan(target_course_ids, completed_courses, max_credits)
 
     def get_learning_path(self,
                          target_course_id: int,
@@ -131,45 +172,15 @@ class CourseService:
         """
         Generate a learning path to a target course
         considering already completed courses
-        """
-        # Get all prerequisites
-        all_paths = self.get_prerequisites(target_course_id)
-
-        if not all_paths:
-            return [target_course_id]
-
-        # Find the shortest path that includes uncompleted courses
-        incomplete_courses = set()
-        for path in all_paths:
-            for course_id in path:
-                if course_id not in completed_courses and course_id != target_course_id:
-                    incomplete_courses.add(course_id)
-
-        # Simple topological sort for incomplete courses
-        # This is a simplified version - could be enhanced with proper graph algorithms
-        ordered_path = sorted(list(incomplete_courses))
-        ordered_path.append(target_course_id)
 
-        return ordered_path
+        Returns:
+            Unsatisfied prerequisites and the target in a valid prerequisite order
+        """
+        return self.plan_learning_path([target_course_id], completed_courses)["sequence"]
 
     def get_course_statistics(self) -> Dict[str, Any]:
         """Get knowledge graph statistics"""
-        if self.db._driver is None:
-            # Demo mode - use mock data
-            from app.database.mock_data import get_mock_courses, get_mock_relationships
-            courses = get_mock_courses()
-            relationships = get_mock_relationships()
-            return {
-                "total_courses": len(courses),
-                "total_relationships": len(relationships)
-            }
-
-        query = """
-        MATCH (c:Course)
-        WITH count(c) as total_courses
-        MATCH ()-[r:PREREQUISITE]->()
-        RETURN total_courses, count(r) as total_relationships
-        """
-
-        result = self.db.execute_query(query)
-        return result[0] if result else {"total_courses": 0, "total_relationships": 0}
+        return {
+            "total_courses": len(self.graph),
+            "total_relationships": self.graph.num_relationships
+        }
@@ -0,0 +1,329 @@
+"""
+IRT Calibration - offline 2PL parameter estimation
+
+Fits difficulty and discrimination for every course from a historical
+students × courses score matrix using marginal maximum likelihood (EM over a
+fixed ability quadrature grid). Scores (0-100) are treated as fractional
+responses y = score / 100 of a two-parameter logistic model
+
+    P(θ) = sigmoid(a * (θ - b))
+
+Responses are held as sparse CSR matrices of the observed entries only;
+the E-step runs sparse × dense products over row chunks of students
+(optionally in parallel), the M-step fits all courses at once with
+analytic gradients.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple, Union, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+import logging
+import numpy as np
+from scipy import sparse
+from scipy.optimize import minimize
+from scipy.special import expit, log_expit, logsumexp
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+# Parameter bounds and weak priors keeping sparse courses well-posed
+DISCRIMINATION_BOUNDS = (0.05, 4.0)
+DIFFICULTY_BOUNDS = (-4.0, 4.0)
+DIFFICULTY_PRIOR_SD = 2.0
+LOG_DISCRIMINATION_PRIOR_SD = 0.5
+
+
+def quadrature_grid(n_points: int = 41, limit: float = 4.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fixed ability grid with standard normal prior weights
+
+    Returns:
+        Tuple of (theta grid, log prior weights), both of length ``n_points``
+    """
+    theta = np.linspace(-limit, limit, n_points)
+    log_weights = -0.5 * theta ** 2
+    return theta, log_weights - logsumexp(log_weights)
+
+
+def _sparse_responses(score_matrix: Union[np.ndarray, sparse.spmatrix]) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    """
+    Convert a score matrix to (fractional responses, observed mask) CSR matrices
+
+    Both matrices share the sparsity pattern of the observed entries; a
+    score of 0 is kept as an explicit entry.
+    """
+    if sparse.issparse(score_matrix):
+        coo = sparse.coo_matrix(score_matrix)
+        rows, cols, scores = coo.row, coo.col, coo.data.astype(np.float64)
+    else:
+        dense = np.asarray(score_matrix, dtype=np.float64)
+        rows, cols = np.nonzero(~np.isnan(dense))
+        scores = dense[rows, cols]
+    shape = score_matrix.shape
+    responses = sparse.csr_matrix((np.clip(scores / 100.0, 0.0, 1.0), (rows, cols)), shape=shape)
+    observed = sparse.csr_matrix((np.ones(len(scores)), (rows, cols)), shape=shape)
+    return responses, observed
+
+
+class IRTCalibrator:
+    """
+    2PL calibration by EM over a quadrature grid
+
+    Attributes after ``fit``:
+        difficulty: Course difficulty (b) per column
+        discrimination: Course discrimination (a) per column
+        log_likelihood: Marginal log-likelihood of the final iteration
+        iterations: Number of EM iterations run
+        response_counts: Observed scores per column
+    """
+
+    def __init__(self,
+                 n_quadrature: int = 41,
+                 max_iter: int = 100,
+                 tol: float = 1e-4,
+                 chunk_size: int = 20000,
+                 n_workers: int = 1):
+        self.theta, self.log_prior = quadrature_grid(n_quadrature)
+        self.max_iter = max_iter
+        self.tol = tol
+        self.chunk_size = chunk_size
+        self.n_workers = n_workers
+
+        self.difficulty: Optional[np.ndarray] = None
+        self.discrimination: Optional[np.ndarray] = None
+        self.log_likelihood: float = float("nan")
+        self.iterations: int = 0
+        self.response_counts: Optional[np.ndarray] = None
+
+    def _e_step_chunk(self,
+                      responses: sparse.csr_matrix,
+                      observed: sparse.csr_matrix,
+                      log_p: np.ndarray,
+                      log_q: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Posterior-weighted expected counts for one chunk of students
+
+        Returns:
+            Tuple of (expected correct C×Q, expected trials C×Q, chunk log-likelihood)
+        """
+        incorrect = observed - responses
+        # Students × grid log-likelihood, one sparse × dense product per term
+        log_lik = responses @ log_p + incorrect @ log_q + self.log_prior
+        marginal = logsumexp(log_lik, axis=1, keepdims=True)
+        posterior = np.exp(log_lik - marginal)
+        return responses.T @ posterior, observed.T @ posterior, float(marginal.sum())
+
+    def _e_step(self,
+                responses: sparse.csr_matrix,
+                observed: sparse.csr_matrix,
+                a: np.ndarray,
+                b: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Expected counts over all students, processed in chunks"""
+        z = a[:, None] * (self.theta[None, :] - b[:, None])
+        log_p, log_q = log_expit(z), log_expit(-z)
+
+        starts = range(0, responses.shape[0], self.chunk_size)
+
+        def run(start: int):
+            stop = start + self.chunk_size
+            return self._e_step_chunk(responses[start:stop], observed[start:stop], log_p, log_q)
+
+        if self.n_workers > 1:
+            # NumPy releases the GIL inside matrix products, so threads scale
+            with ThreadPoolExecutor(max_workers=self.n_workers) as pool:
+                parts = list(pool.map(run, starts))
+        else:
+            parts = [run(start) for start in starts]
+
+        expected_correct = sum(part[0] for part in parts)
+        expected_trials = sum(part[1] for part in parts)
+        log_likelihood = sum(part[2] for part in parts)
+        return expected_correct, expected_trials, log_likelihood
+
+    def _m_step_objective(self,
+                          params: np.ndarray,
+                          expected_correct: np.ndarray,
+                          expected_trials: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Negative expected complete-data log-posterior and its analytic gradient"""
+        n_courses = expected_correct.shape[0]
+        a, b = params[:n_courses], params[n_courses:]
+        delta = self.theta[None, :] - b[:, None]
+        z = a[:, None] * delta
+
+        log_lik = expected_correct * log_expit(z) + (expected_trials - expected_correct) * log_expit(-z)
+        residual = expected_correct - expected_trials * expit(z)
+
+        log_a = np.log(a)
+        value = (log_lik.sum()
+                 - 0.5 * np.sum((b / DIFFICULTY_PRIOR_SD) ** 2)
+                 - 0.5 * np.sum((log_a / LOG_DISCRIMINATION_PRIOR_SD) ** 2))
+        grad_a = (residual * delta).sum(axis=1) - log_a / (LOG_DISCRIMINATION_PRIOR_SD ** 2 * a)
+        grad_b = -a * residual.sum(axis=1) - b / DIFFICULTY_PRIOR_SD ** 2
+        return -value, -np.concatenate([grad_a, grad_b])
+
+    def _m_step(self,
+                expected_correct: np.ndarray,
+                expected_trials: np.ndarray,
+                a: np.ndarray,
+                b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Maximize the expected log-posterior for all courses jointly"""
+        n_courses = a.shape[0]
+        bounds = [DISCRIMINATION_BOUNDS] * n_courses + [DIFFICULTY_BOUNDS] * n_courses
+        result = minimize(
+            self._m_step_objective,
+            np.concatenate([a, b]),
+            args=(expected_correct, expected_trials),
+            jac=True,
+            method="L-BFGS-B",
+            bounds=bounds
+        )
+        return result.x[:n_courses], result.x[n_courses:]
+
+    def fit(self, score_matrix: Union[np.ndarray, sparse.spmatrix]) -> "IRTCalibrator":
+        """
+        Calibrate course parameters
+
+        Args:
+            score_matrix: Students × courses scores (0-100). For sparse input
+                every stored entry is an observed score; for dense input NaN
+                marks an unobserved course.
+
+        Returns:
+            The fitted calibrator; with ``max_iter=0`` the starting values
+            (a = 1, b = 0) are kept
+        """
+        responses, observed = _sparse_responses(score_matrix)
+        n_courses = responses.shape[1]
+        a = np.ones(n_courses)
+        b = np.zeros(n_courses)
+        log_likelihood = float("nan")
+        iteration = 0
+
+        for iteration in range(1, self.max_iter + 1):
+            expected_correct, expected_trials, log_likelihood = self._e_step(responses, observed, a, b)
+            new_a, new_b = self._m_step(expected_correct, expected_trials, a, b)
+            change = max(np.max(np.abs(new_a - a), initial=0.0), np.max(np.abs(new_b - b), initial=0.0))
+            a, b = new_a, new_b
+            logger.info(f"EM iteration {iteration}: log-likelihood {log_likelihood:.3f}, max change {change:.2e}")
+            if change < self.tol:
+                break
+        if iteration == 0:
+            _, _, log_likelihood = self._e_step(responses, observed, a, b)
+
+        self.discrimination = a
+        self.difficulty = b
+        self.log_likelihood = log_likelihood
+        self.iterations = iteration
+        self.response_counts = np.asarray(observed.sum(axis=0)).reshape(-1)
+        return self
+
+    def to_artifact(self, course_names: Sequence[str]) -> Dict[str, Any]:
+        """
+        Build the versioned parameter artifact for fitted parameters
+
+        Args:
+            course_names: Course name of each calibrated column
+
+        Returns:
+            JSON-serializable artifact dictionary
+        """
+        if self.difficulty is None:
+            raise RuntimeError("Calibrator not fitted. Call fit() first.")
+
+        courses = {
+            name: {
+                "difficulty": round(float(b), 6),
+                "discrimination": round(float(a), 6),
+                "n_responses": int(n)
+            }
+            for name, a, b, n in zip(course_names, self.discrimination, self.difficulty, self.response_counts)
+        }
+        created_at = datetime.now()
+        digest = hashlib.sha1(json.dumps(courses, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        return {
+            "version": f"{created_at.strftime('%Y%m%dT%H%M%S')}-{digest.hexdigest()[:8]}",
+            "created_at": created_at.isoformat(),
+            "model": "2pl",
+            "iterations": self.iterations,
+            "log_likelihood": self.log_likelihood,
+            "courses": courses
+        }
+
+
+def calibrate(score_matrix: Union[np.ndarray, sparse.spmatrix],
+              course_names: Sequence[str],
+              **options) -> Dict[str, Any]:
+    """
+    Fit 2PL parameters and return the parameter artifact
+
+    Args:
+        score_matrix: Students × courses scores (0-100)
+        course_names: Course name of each column
+        **options: Passed through to ``IRTCalibrator``
+
+    Returns:
+        Parameter artifact dictionary
+    """
+    calibrator = IRTCalibrator(**options).fit(score_matrix)
+    artifact = calibrator.to_artifact(course_names)
+    artifact["n_students"] = int(score_matrix.shape[0])
+    return artifact
+
+
+def resolve_parameters_path(path: Union[str, Path]) -> Path:
+    """Resolve a parameter artifact path relative to the backend directory"""
+    path = Path(path)
+    return path if path.is_absolute() else BACKEND_DIR / path
+
+
+def save_parameters(artifact: Dict[str, Any], path: Union[str, Path]) -> Path:
+    """Write a parameter artifact as JSON"""
+    path = resolve_parameters_path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_parameters(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """
+    Load a parameter artifact
+
+    Returns:
+        The artifact dictionary, or None if the file does not exist
+    """
+    path = resolve_parameters_path(path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_score_matrix(path: Union[str, Path]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Load a historical score matrix
+
+    Supported formats:
+        .npz: arrays ``scores`` (students × courses, NaN = missing) and ``courses``
+        .csv: header row of course names, one student per row, empty cell = missing;
+              a leading ``student_id`` column is ignored
+
+    Returns:
+        Tuple of (score matrix, course names)
+    """
+    path = Path(path)
+    if path.suffix == ".npz":
+        with np.load(path, allow_pickle=False) as data:
+            return data["scores"].astype(np.float64), [str(name) for name in data["courses"]]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip().split(",")
+    first_column = 1 if header and header[0] == "student_id" else 0
+    scores = np.genfromtxt(
+        path, delimiter=",", skip_header=1, dtype=np.float64,
+        usecols=range(first_column, len(header)), filling_values=np.nan
+    )
+    return np.atleast_2d(scores), header[first_column:]
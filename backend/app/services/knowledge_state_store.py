@@ -0,0 +1,192 @@
+"""
+Knowledge State Store - server-side running knowledge states
+
+Keeps a per-student, per-domain log-likelihood over the tracker's ability
+grid so a single grade event is folded in with an online Bayesian update
+that only touches the domains covered by the graded course.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timezone
+import threading
+import logging
+import numpy as np
+from app.config import settings
+from app.services.knowledge_tracking import IRTKnowledgeTracker, get_knowledge_tracker
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc(moment: Optional[datetime]) -> datetime:
+    """Timezone-aware UTC timestamp; naive times are taken as local time, None as now"""
+    if moment is None:
+        return datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+class StudentKnowledgeState:
+    """Running grade history and per-domain grid log-likelihoods of one student"""
+
+    def __init__(self, parameters_version: str):
+        self.parameters_version = parameters_version
+        self.course_scores: Dict[str, float] = {}
+        # When the current score of each course was issued (UTC)
+        self.course_graded_at: Dict[str, datetime] = {}
+        self.domain_log_likelihood: Dict[str, np.ndarray] = {}
+        self.domain_information: Dict[str, np.ndarray] = {}
+
+
+class KnowledgeStateStore:
+    """
+    In-memory store of student knowledge states updated from grade events
+
+    A new course costs O(domains of the graded course × grid size). A
+    regrade replaces the previous score: the domains of the course are
+    recomputed from the stored scores, so repeated regrades do not
+    accumulate floating-point drift. Events older than the stored grade of
+    the same course (late or replayed deliveries) are ignored. States are
+    evicted least-recently-updated first beyond ``max_students``.
+    """
+
+    def __init__(self, tracker: IRTKnowledgeTracker, max_students: int = 100000):
+        self.tracker = tracker
+        self.max_students = max_students
+        self._students: "OrderedDict[str, StudentKnowledgeState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _contribution(self, course_idx: int, score: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Grid log-likelihood and information contributed by one course score"""
+        y = min(max(score / 100.0, 0.0), 1.0)
+        tracker = self.tracker
+        log_lik = y * tracker.log_p[course_idx] + (1.0 - y) * tracker.log_q[course_idx]
+        return log_lik, tracker.item_information[course_idx]
+
+    def _apply(self,
+               state: StudentKnowledgeState,
+               course_name: str,
+               score: float,
+               domains: Optional[Iterable[str]] = None):
+        """Add one course score to a student state (optionally only to some of its domains)"""
+        course_idx = self.tracker.course_index[course_name]
+        log_lik, information = self._contribution(course_idx, score)
+        grid_size = log_lik.shape[0]
+        course_domains = self.tracker.course_knowledge_mapping[course_name]
+        for domain in course_domains if domains is None else set(course_domains).intersection(domains):
+            if domain not in state.domain_log_likelihood:
+                state.domain_log_likelihood[domain] = np.zeros(grid_size)
+                state.domain_information[domain] = np.zeros(grid_size)
+            state.domain_log_likelihood[domain] += log_lik
+            state.domain_information[domain] += information
+
+    def _recompute(self, state: StudentKnowledgeState, domains: Iterable[str]):
+        """Recompute some domains of a student state from the stored course scores"""
+        domains = set(domains)
+        for domain in domains:
+            state.domain_log_likelihood.pop(domain, None)
+            state.domain_information.pop(domain, None)
+        for course_name, score in state.course_scores.items():
+            self._apply(state, course_name, score, domains)
+
+    def _rebuild(self, state: StudentKnowledgeState):
+        """Recompute a student state after the tracker parameters changed"""
+        state.domain_log_likelihood.clear()
+        state.domain_information.clear()
+        for course_name, score in state.course_scores.items():
+            self._apply(state, course_name, score)
+        state.parameters_version = self.tracker.parameters_version
+
+    def _summarize(self, state: StudentKnowledgeState, domains) -> Dict[str, Tuple[float, float]]:
+        """EAP ability and standard error for the given domains of a student"""
+        domains = [d for d in domains if d in state.domain_log_likelihood]
+        if not domains:
+            return {}
+        theta, se = self.tracker._posterior_summary(
+            np.vstack([state.domain_log_likelihood[d] for d in domains]),
+            np.vstack([state.domain_information[d] for d in domains]),
+            "eap"
+        )
+        return {d: (float(theta[k]), float(se[k])) for k, d in enumerate(domains)}
+
+    def record_grade(self,
+                     student_id: str,
+                     course_name: str,
+                     score: float,
+                     occurred_at: Optional[datetime] = None) -> Tuple[Dict[str, Tuple[float, float]], bool]:
+        """
+        Fold a single grade event into a student's running state
+
+        Args:
+            student_id: Student ID
+            course_name: Graded course name
+            score: Course score (0-100)
+            occurred_at: When the grade was issued; the time of receipt when omitted
+
+        Returns:
+            Tuple of ((ability, standard error) of the domains covered by the
+            course, whether the event was applied). An event older than the
+            stored grade of the course is not applied.
+        """
+        if course_name not in self.tracker.course_index:
+            raise ValueError(f"Course {course_name} not in mapping")
+        graded_at = _as_utc(occurred_at)
+
+        with self._lock:
+            state = self._students.get(student_id)
+            if state is None:
+                state = StudentKnowledgeState(self.tracker.parameters_version)
+                self._students[student_id] = state
+            elif state.parameters_version != self.tracker.parameters_version:
+                self._rebuild(state)
+            self._students.move_to_end(student_id)
+            domains = self.tracker.course_knowledge_mapping[course_name]
+
+            latest = state.course_graded_at.get(course_name)
+            if latest is not None and graded_at < latest:
+                logger.info(
+                    f"Ignoring stale grade for {student_id} / {course_name}: "
+                    f"issued {graded_at.isoformat()}, current grade issued {latest.isoformat()}"
+                )
+                return self._summarize(state, domains), False
+
+            regrade = course_name in state.course_scores
+            state.course_scores[course_name] = score
+            state.course_graded_at[course_name] = graded_at
+            if regrade:
+                self._recompute(state, domains)
+            else:
+                self._apply(state, course_name, score)
+
+            while len(self._students) > self.max_students:
+                self._students.popitem(last=False)
+
+            return self._summarize(state, domains), True
+
+    def get_abilities(self, student_id: str) -> Optional[Dict[str, Tuple[float, float]]]:
+        """
+        Current (ability, standard error) of every domain a student has grades in
+
+        Returns:
+            Domain abilities, or None if the student has no recorded grades
+        """
+        with self._lock:
+            state = self._students.get(student_id)
+            if state is None:
+                return None
+            if state.parameters_version != self.tracker.parameters_version:
+                self._rebuild(state)
+            return self._summarize(state, sorted(state.domain_log_likelihood))
+
+    def __len__(self) -> int:
+        return len(self._students)
+
+
+# Global instance
+knowledge_state_store = KnowledgeStateStore(
+    get_knowledge_tracker(),
+    max_students=settings.knowledge_state_max_students
+)
+
+
+def get_knowledge_state_store() -> KnowledgeStateStore:
+    """Get the global knowledge state store instance"""
+    return knowledge_state_store
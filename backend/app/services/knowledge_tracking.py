@@ -2,31 +2,83 @@
 Knowledge Tracking Service - IRT Model Implementation
 Item Response Theory (IRT) based knowledge state estimation
 """
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional, Sequence, Union
+import json
 import numpy as np
-from scipy.optimize import minimize
-from scipy.special import expit  # sigmoid function
+from scipy import sparse
+from scipy.special import expit, log_expit, logit, logsumexp  # sigmoid function
 import logging
+from app.config import settings
+from app.services.irt_calibration import load_parameters, quadrature_grid, resolve_parameters_path
 
 logger = logging.getLogger(__name__)
 
+# Ability grid size for EAP/MLE estimation
+QUADRATURE_POINTS = 41
+
+# IRT parameters for courses without calibrated parameters
+DEFAULT_ITEM_PARAMETERS = {"difficulty": 0.0, "discrimination": 1.0}
+
+# Ability estimation methods accepted by the tracker
+ESTIMATION_METHODS = ("eap", "mle")
+
+# Mastery levels are clipped away from 0 and 1 before mapping back to ability
+READINESS_EPSILON = 1e-3
+
 
 class IRTKnowledgeTracker:
     """
     IRT-based knowledge tracking system
 
-    Uses a simplified IRT model to estimate student knowledge state
-    from course scores. Maps courses to knowledge domains and estimates
-    mastery level for each domain.
+    Uses a 2PL IRT model to estimate student knowledge state from course
+    scores. Maps courses to knowledge domains and estimates ability per
+    domain on a fixed quadrature grid (EAP or MLE), reported as a mastery
+    level in [0, 1].
     """
 
-    def __init__(self):
+    def __init__(self, course_knowledge_mapping: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            course_knowledge_mapping: Course name to knowledge domains mapping;
+                loaded from settings (or the built-in mapping) when omitted
+        """
         # Course to knowledge domain mapping
         # This mapping defines which knowledge domains each course covers
-        self.course_knowledge_mapping = self._init_course_knowledge_mapping()
+        if course_knowledge_mapping is None:
+            course_knowledge_mapping = self._init_course_knowledge_mapping()
+        self.course_knowledge_mapping = course_knowledge_mapping
+
+        # Sparse course → domain incidence matrix for batch estimation
+        self.course_names = list(self.course_knowledge_mapping)
+        self.course_index = {name: i for i, name in enumerate(self.course_names)}
+        self.domains = sorted({
+            domain
+            for domains in self.course_knowledge_mapping.values()
+            for domain in domains
+        })
+        domain_index = {domain: j for j, domain in enumerate(self.domains)}
+        rows, cols = [], []
+        for name, domains in self.course_knowledge_mapping.items():
+            for domain in domains:
+                rows.append(self.course_index[name])
+                cols.append(domain_index[domain])
+        self.domain_incidence = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self.course_names), len(self.domains))
+        )
+
+        # Ability quadrature grid shared by all estimates
+        self.theta_grid, self.log_prior = quadrature_grid(QUADRATURE_POINTS)
+        self.score_trials = settings.knowledge_score_trials
 
-        # IRT parameters for courses (difficulty and discrimination)
+        # IRT parameters for courses (difficulty and discrimination),
+        # overridden by the calibrated artifact when one is available
         self.course_parameters = self._init_course_parameters()
+        self.parameters_version = "builtin"
+        self._build_item_curves()
+        artifact = load_parameters(settings.irt_parameters_path)
+        if artifact:
+            self.apply_calibrated_parameters(artifact)
 
     def _init_course_knowledge_mapping(self) -> Dict[str, List[str]]:
         """
@@ -35,6 +87,13 @@ class IRTKnowledgeTracker:
         Returns:
             Dictionary mapping course names to knowledge domains
         """
+        if settings.course_domains_path:
+            path = resolve_parameters_path(settings.course_domains_path)
+            with open(path, 'r', encoding='utf-8') as f:
+                mapping = json.load(f)
+            logger.info(f"Loaded knowledge domains of {len(mapping)} courses from {path}")
+            return mapping
+
         # Simplified mapping - in production this should be loaded from database
         return {
             "数学分析": ["数学基础", "微积分"],
@@ -93,20 +152,122 @@ class IRTKnowledgeTracker:
             "深度学习": {"difficulty": 2.2, "discrimination": 1.3},
         }
 
-    def _score_to_ability(self, score: float) -> float:
+    def apply_calibrated_parameters(self, artifact: Dict) -> None:
+        """
+        Override course parameters with a calibration artifact
+
+        Args:
+            artifact: Parameter artifact produced by ``app.services.irt_calibration``
+        """
+        for course_name, params in artifact["courses"].items():
+            self.course_parameters[course_name] = {
+                "difficulty": params["difficulty"],
+                "discrimination": params["discrimination"]
+            }
+        self.parameters_version = artifact["version"]
+        self._build_item_curves()
+        logger.info(
+            f"Loaded calibrated IRT parameters {self.parameters_version} "
+            f"for {len(artifact['courses'])} courses"
+        )
+
+    def _build_item_curves(self) -> None:
+        """
+        Precompute 2PL item response curves on the ability grid
+
+        Courses without parameters use difficulty 0 and discrimination 1.
         """
-        Convert raw score (0-100) to IRT ability parameter
+        params = [self.course_parameters.get(name, DEFAULT_ITEM_PARAMETERS) for name in self.course_names]
+        self.item_difficulty = np.array([p["difficulty"] for p in params])
+        self.item_discrimination = np.array([p["discrimination"] for p in params])
+        z = self.item_discrimination[:, None] * (self.theta_grid[None, :] - self.item_difficulty[:, None])
+        # Courses × grid log P(correct) and log P(incorrect)
+        self.log_p = log_expit(z)
+        self.log_q = log_expit(-z)
+        self.item_information = self.item_discrimination[:, None] ** 2 * expit(z) * expit(-z)
+
+        # Mean a·b of the mapped courses with parameters: the expected-miss
+        # logit of the catalog's average course for an average (θ = 0)
+        # student. Personalized difficulty is centred on it, so it does not
+        # depend on where a calibration put the origin of the b scale.
+        products = [
+            p["discrimination"] * p["difficulty"]
+            for name, p in self.course_parameters.items()
+            if name in self.course_knowledge_mapping
+        ]
+        self.difficulty_offset = float(np.mean(products)) if products else 0.0
+
+    def _posterior_summary(self,
+                           log_likelihood: np.ndarray,
+                           information: np.ndarray,
+                           method: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ability estimates and standard errors from grid log-likelihoods
 
         Args:
-            score: Raw score in range [0, 100]
+            log_likelihood: Rows × grid log-likelihood
+            information: Rows × grid test information
+            method: "eap" for posterior mean/SD under a N(0, 1) prior,
+                "mle" for the grid maximum likelihood with SE 1/sqrt(information)
 
         Returns:
-            Ability estimate in range [-3, 3]
+            Tuple of (theta, standard error) arrays, one entry per row
+        """
+        if method == "mle":
+            best = np.argmax(log_likelihood, axis=1)
+            theta = self.theta_grid[best]
+            info = np.take_along_axis(information, best[:, None], axis=1)[:, 0]
+            return theta, 1.0 / np.sqrt(np.maximum(info, 1e-12))
+
+        if method != "eap":
+            raise ValueError(f"Unknown ability estimation method: {method}")
+        log_post = log_likelihood + self.log_prior
+        log_post -= logsumexp(log_post, axis=1, keepdims=True)
+        posterior = np.exp(log_post)
+        theta = posterior @ self.theta_grid
+        variance = posterior @ self.theta_grid ** 2 - theta ** 2
+        return theta, np.sqrt(np.maximum(variance, 0.0))
+
+    def estimate_abilities(self,
+                           course_scores: Dict[str, float],
+                           method: str = "eap") -> Dict[str, Tuple[float, float]]:
         """
-        # Simple linear transformation with bounds
-        # In production, use proper IRT estimation
-        normalized = (score - 60) / 20  # Center at 60, scale by 20
-        return np.clip(normalized, -3, 3)
+        Estimate per-domain IRT ability from course scores
+
+        A one-row case of ``estimate_ability_matrix``, so single and batch
+        estimates always agree.
+
+        Args:
+            course_scores: Dictionary mapping course names to scores (0-100)
+            method: "eap" (default) or "mle"
+
+        Returns:
+            Dictionary mapping knowledge domains to (ability, standard error)
+        """
+        self.validate_methods([method])
+        known = {}
+        for course_name, score in course_scores.items():
+            if course_name not in self.course_index:
+                logger.warning(f"Course {course_name} not in mapping, skipping")
+                continue
+            known[course_name] = score
+        if not known:
+            return {}
+
+        theta, se = self.estimate_ability_matrix(
+            np.array([list(known.values())], dtype=np.float64), list(known), method
+        )
+        return {
+            self.domains[j]: (float(theta[0, j]), float(se[0, j]))
+            for j in np.flatnonzero(~np.isnan(theta[0]))
+        }
+
+    @staticmethod
+    def validate_methods(methods: Sequence[str]) -> None:
+        """Raise ValueError for an unknown ability estimation method"""
+        for method in methods:
+            if method not in ESTIMATION_METHODS:
+                raise ValueError(f"Unknown ability estimation method: {method}")
 
     def estimate_knowledge_state(self,
                                  course_scores: Dict[str, float]) -> Dict[str, float]:
@@ -119,36 +280,153 @@ class IRTKnowledgeTracker:
         Returns:
             Dictionary mapping knowledge domains to mastery levels (0-1)
         """
-        # Initialize knowledge domain abilities
-        domain_abilities = {}
-        domain_counts = {}
+        # Transform abilities to [0, 1] using sigmoid
+        return {
+            domain: float(expit(theta))
+            for domain, (theta, _) in self.estimate_abilities(course_scores).items()
+        }
 
-        # Aggregate scores by knowledge domain
-        for course_name, score in course_scores.items():
-            if course_name not in self.course_knowledge_mapping:
-                logger.warning(f"Course {course_name} not in mapping, skipping")
+    def estimate_ability_matrix(self,
+                                score_matrix: Union[np.ndarray, sparse.spmatrix],
+                                course_names: Optional[Sequence[str]] = None,
+                                method: Union[str, Sequence[str]] = "eap",
+                                chunk_size: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimate per-domain abilities for many students at once
+
+        Observed (student, course) entries are turned into grid
+        log-likelihoods and summed into (student, domain) rows with one
+        sparse product against the course → domain incidence matrix,
+        processed in chunks of ``chunk_size`` students. A score of s counts
+        as s% successes out of ``score_trials`` binomial trials.
+
+        Args:
+            score_matrix: Students × courses scores (0-100). For sparse input
+                every stored entry is an observed score; for dense input NaN
+                marks an unobserved course.
+            course_names: Course name of each column, defaults to ``self.course_names``
+            method: "eap" (default) or "mle" for every student, or one
+                method per row
+            chunk_size: Number of students processed per pass
+
+        Returns:
+            Tuple of (ability, standard error) students × ``self.domains``
+            matrices, NaN where no course of the domain was observed
+        """
+        if course_names is None:
+            course_names = self.course_names
+        n_students = score_matrix.shape[0]
+        if isinstance(method, str):
+            row_methods = None
+            self.validate_methods([method])
+        else:
+            if len(method) != n_students:
+                raise ValueError(f"Got {len(method)} estimation methods for {n_students} students")
+            row_methods = np.asarray(method, dtype=object)
+            self.validate_methods(set(method))
+
+        if sparse.issparse(score_matrix):
+            coo = sparse.coo_matrix(score_matrix)
+            rows, cols, scores = coo.row, coo.col, coo.data.astype(np.float64)
+        else:
+            dense = np.asarray(score_matrix, dtype=np.float64)
+            rows, cols = np.nonzero(~np.isnan(dense))
+            scores = dense[rows, cols]
+        n_domains = len(self.domains)
+
+        # Map input columns onto the tracker's course index, dropping unknown courses
+        column_map = np.array([self.course_index.get(name, -1) for name in course_names], dtype=np.int64)
+        tracker_cols = column_map[cols] if len(cols) else cols
+        known = tracker_cols >= 0
+        rows, tracker_cols, scores = rows[known], tracker_cols[known], scores[known]
+        responses = np.clip(scores / 100.0, 0.0, 1.0)
+
+        # Expand every observed entry into one (entry, domain) pair per covered domain
+        incidence = self.domain_incidence
+        domains_per_entry = np.diff(incidence.indptr)[tracker_cols]
+        entry = np.repeat(np.arange(len(rows)), domains_per_entry)
+        first_pair = np.cumsum(domains_per_entry) - domains_per_entry
+        offset_in_row = np.arange(len(entry)) - first_pair[entry]
+        pair_domain = incidence.indices[incidence.indptr[tracker_cols][entry] + offset_in_row]
+        pair_student = rows[entry]
+
+        theta = np.full((n_students, n_domains), np.nan)
+        se = np.full((n_students, n_domains), np.nan)
+        order = np.argsort(pair_student, kind="stable")
+        bounds = np.searchsorted(pair_student[order], np.arange(0, n_students + chunk_size, chunk_size))
+
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            chunk = order[lo:hi]
+            if len(chunk) == 0:
                 continue
+            e = entry[chunk]
+            c = tracker_cols[e]
+            y = responses[e][:, None]
+            pair_log_lik = self.score_trials * (y * self.log_p[c] + (1.0 - y) * self.log_q[c])
+
+            # Sum pairs into unique (student, domain) rows with one sparse product
+            keys = pair_student[chunk] * n_domains + pair_domain[chunk]
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            aggregate = sparse.csr_matrix(
+                (np.ones(len(chunk)), (inverse.reshape(-1), np.arange(len(chunk)))),
+                shape=(len(unique_keys), len(chunk))
+            )
+            log_lik = aggregate @ pair_log_lik
+            information = self.score_trials * (aggregate @ self.item_information[c])
+            if row_methods is None:
+                groups = [(method, slice(None))]
+            else:
+                key_methods = row_methods[unique_keys // n_domains]
+                groups = [(m, key_methods == m) for m in ESTIMATION_METHODS]
+            for group_method, rows_of_group in groups:
+                group_keys = unique_keys[rows_of_group]
+                if len(group_keys) == 0:
+                    continue
+                group_theta, group_se = self._posterior_summary(
+                    log_lik[rows_of_group], information[rows_of_group], group_method
+                )
+                theta.flat[group_keys] = group_theta
+                se.flat[group_keys] = group_se
+
+        return theta, se
+
+    def estimate_knowledge_matrix(self,
+                                  score_matrix: Union[np.ndarray, sparse.spmatrix],
+                                  course_names: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Estimate domain mastery for many students at once
 
-            # Convert score to ability
-            ability = self._score_to_ability(score)
+        Args:
+            score_matrix: Students × courses scores (0-100), see ``estimate_ability_matrix``
+            course_names: Course name of each column, defaults to ``self.course_names``
 
-            # Update all related knowledge domains
-            for domain in self.course_knowledge_mapping[course_name]:
-                if domain not in domain_abilities:
-                    domain_abilities[domain] = 0.0
-                    domain_counts[domain] = 0
+        Returns:
+            Students × ``self.domains`` mastery matrix, NaN where no course
+            of the domain was observed
+        """
+        theta, _ = self.estimate_ability_matrix(score_matrix, course_names)
+        # Transform abilities to [0, 1] using sigmoid
+        return expit(theta)
 
-                domain_abilities[domain] += ability
-                domain_counts[domain] += 1
+    def estimate_knowledge_state_batch(self,
+                                       score_matrix: Union[np.ndarray, sparse.spmatrix],
+                                       course_names: Optional[Sequence[str]] = None) -> List[Dict[str, float]]:
+        """
+        Estimate knowledge states for many students at once
 
-        # Average abilities for each domain and normalize to [0, 1]
-        knowledge_state = {}
-        for domain in domain_abilities:
-            avg_ability = domain_abilities[domain] / domain_counts[domain]
-            # Transform from [-3, 3] to [0, 1] using sigmoid
-            knowledge_state[domain] = expit(avg_ability)
+        Args:
+            score_matrix: Students × courses scores (0-100), see ``estimate_ability_matrix``
+            course_names: Course name of each column, defaults to ``self.course_names``
 
-        return knowledge_state
+        Returns:
+            One domain → mastery dictionary per student row
+        """
+        mastery = self.estimate_knowledge_matrix(score_matrix, course_names)
+        observed = ~np.isnan(mastery)
+        return [
+            {self.domains[j]: float(mastery[s, j]) for j in np.flatnonzero(observed[s])}
+            for s in range(mastery.shape[0])
+        ]
 
     def analyze_knowledge_state(self,
                                knowledge_state: Dict[str, float]) -> Tuple[float, List[str], List[str]]:
@@ -226,24 +504,36 @@ class IRTKnowledgeTracker:
         else:
             avg_readiness = np.mean(readiness_scores)
 
-        # Personalized difficulty = base difficulty - student readiness
-        # Higher readiness → lower perceived difficulty
-        personalized_difficulty = base_difficulty - (avg_readiness - 0.5) * 2
+        # Personalized difficulty from the 2PL: logit of the expected share
+        # of the score missed at the student's ability, relative to the
+        # average course. Higher readiness → lower perceived difficulty
+        theta = logit(np.clip(avg_readiness, READINESS_EPSILON, 1.0 - READINESS_EPSILON))
+        miss_logit = course_params["discrimination"] * (base_difficulty - theta)
 
         # Normalize to [0, 1]
-        difficulty_score = expit(personalized_difficulty / 2)
+        difficulty_score = float(expit(miss_logit - self.difficulty_offset))
 
-        # Convert to label
+        return difficulty_score, self.difficulty_label(difficulty_score)
+
+    @staticmethod
+    def difficulty_label(difficulty_score: float) -> str:
+        """
+        Convert a personalized difficulty score (0-1) to a label
+
+        Args:
+            difficulty_score: Personalized difficulty in range [0, 1]
+
+        Returns:
+            Difficulty label
+        """
         if difficulty_score < 0.3:
-            difficulty_label = "简单"
+            return "简单"
         elif difficulty_score < 0.6:
-            difficulty_label = "中等"
+            return "中等"
         elif difficulty_score < 0.8:
-            difficulty_label = "较难"
+            return "较难"
         else:
-            difficulty_label = "困难"
-
-        return difficulty_score, difficulty_label
+            return "困难"
 
 
 # Global instance
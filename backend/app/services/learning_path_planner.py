@@ -0,0 +1,185 @@
+"""
+Learning path planner - prerequisite-ordered semester schedules
+
+Orders the courses a student still needs with Kahn's algorithm over the
+needed part of the prerequisite graph only, then packs them into semesters
+under a credit cap so that every course comes after its prerequisites.
+"""
+from typing import Dict, List, Iterable, Any, Tuple
+from collections import deque
+import heapq
+import logging
+from app.services.prerequisite_closure import _bits
+
+logger = logging.getLogger(__name__)
+
+
+class LearningPathPlanner:
+    """Plans semester-by-semester schedules on a course graph snapshot"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.closure = graph.closure
+
+    def _needed_masks(self, target_ids: Iterable[int], completed_courses: Iterable[int]) -> Tuple[int, int]:
+        """
+        Bitsets of needed courses and of prerequisites shared by several targets
+
+        The union of the targets' ancestor closures is taken once, so a
+        prerequisite shared by several targets is only planned once. Known
+        targets are always needed, even when already completed.
+        """
+        closure = self.closure
+        satisfied = closure.satisfied_mask(completed_courses)
+        needed = shared = targets = 0
+        for course_id in dict.fromkeys(target_ids):
+            idx = self.graph.index_of(course_id)
+            if idx is None:
+                continue
+            targets |= 1 << idx
+            if (satisfied >> idx) & 1:
+                continue
+            ancestors = closure.ancestor_bits(idx)
+            shared |= needed & ancestors
+            needed |= (1 << idx) | ancestors
+        return (needed & ~satisfied) | targets, shared & ~satisfied
+
+    def needed_indices(self, target_ids: Iterable[int], completed_courses: Iterable[int]) -> List[int]:
+        """
+        Snapshot indices of target courses and their unsatisfied prerequisites
+
+        A completed course also satisfies all of its own prerequisites.
+        Unknown targets are left out; completed targets are kept.
+        """
+        return _bits(self._needed_masks(target_ids, completed_courses)[0]).tolist()
+
+    def topological_order(self, needed: List[int]) -> List[int]:
+        """
+        Kahn's algorithm restricted to the needed courses, O(V + E)
+
+        Prerequisites outside ``needed`` are already satisfied and ignored.
+        Ready courses are taken in ascending index (course ID) order.
+        """
+        graph = self.graph
+        needed_set = set(needed)
+        in_degree = {
+            idx: sum(1 for p in graph.prerequisite_indices(idx).tolist() if p in needed_set)
+            for idx in needed
+        }
+        queue = deque(idx for idx in needed if in_degree[idx] == 0)
+        order = []
+        while queue:
+            idx = queue.popleft()
+            order.append(idx)
+            for succ in graph.successor_indices(idx).tolist():
+                if succ in needed_set:
+                    in_degree[succ] -= 1
+                    if in_degree[succ] == 0:
+                        queue.append(succ)
+
+        if len(order) < len(needed):
+            logger.warning(f"Learning path has prerequisite cycles; {len(needed) - len(order)} courses appended unordered")
+            ordered = set(order)
+            order.extend(idx for idx in needed if idx not in ordered)
+        return order
+
+    def _credits(self, idx: int) -> float:
+        return float(self.graph.courses[idx]["credits"] or 0.0)
+
+    def pack_semesters(self, order: List[int], max_credits: float) -> List[List[int]]:
+        """
+        Pack topologically ordered courses into semesters
+
+        A course is only scheduled once all of its needed prerequisites are in
+        earlier semesters. Among ready courses, those heading the longest
+        remaining prerequisite chain go first, so the schedule is not
+        stretched by a late start on a long chain. A course worth more than
+        ``max_credits`` gets a semester of its own. Ready courses are kept in
+        a heap, so each semester only pops the courses it tries to place.
+        """
+        graph = self.graph
+        position = {idx: k for k, idx in enumerate(order)}
+
+        # Longest chain of needed courses that depend on each course
+        chain = {}
+        for idx in reversed(order):
+            chain[idx] = 1 + max(
+                (chain[s] for s in graph.successor_indices(idx).tolist() if s in chain),
+                default=0
+            )
+
+        remaining = {
+            idx: sum(1 for p in graph.prerequisite_indices(idx).tolist() if p in position)
+            for idx in order
+        }
+
+        def entry(idx: int):
+            return -chain[idx], position[idx], idx
+
+        ready = [entry(idx) for idx in order if remaining[idx] == 0]
+        heapq.heapify(ready)
+        # Once less than this is left, no other course fits the semester
+        min_credits = min((self._credits(idx) for idx in order), default=0.0)
+
+        semesters = []
+        while ready:
+            semester, deferred, credits = [], [], 0.0
+            while ready and (not semester or max_credits - credits >= min_credits):
+                item = heapq.heappop(ready)
+                course_credits = self._credits(item[2])
+                if not semester or credits + course_credits <= max_credits:
+                    semester.append(item[2])
+                    credits += course_credits
+                else:
+                    deferred.append(item)
+            semesters.append(semester)
+
+            for item in deferred:
+                heapq.heappush(ready, item)
+            for idx in semester:
+                for succ in graph.successor_indices(idx).tolist():
+                    if succ in remaining:
+                        remaining[succ] -= 1
+                        if remaining[succ] == 0:
+                            heapq.heappush(ready, entry(succ))
+
+        scheduled = sum(len(s) for s in semesters)
+        if scheduled < len(order):
+            # Courses on a prerequisite cycle never become ready
+            scheduled_set = {idx for s in semesters for idx in s}
+            semesters.append([idx for idx in order if idx not in scheduled_set])
+        return semesters
+
+    def plan(self,
+             target_ids: Iterable[int],
+             completed_courses: Iterable[int],
+             max_credits: float) -> Dict[str, Any]:
+        """
+        Plan a schedule reaching all target courses
+
+        Args:
+            target_ids: Target course IDs
+            completed_courses: Completed course IDs
+            max_credits: Credit cap per semester
+
+        Returns:
+            Dictionary with the flat prerequisite ``sequence`` of course IDs,
+            ``semesters`` (each with its course IDs and credit total) and
+            ``shared_prerequisites`` needed by more than one target
+        """
+        needed, shared = self._needed_masks(target_ids, completed_courses)
+        order = self.topological_order(_bits(needed).tolist())
+        ids = self.graph.course_ids
+        semesters = [
+            {
+                "semester": number,
+                "course_ids": ids[semester].tolist(),
+                "credits": sum(self._credits(idx) for idx in semester)
+            }
+            for number, semester in enumerate(self.pack_semesters(order, max_credits), start=1)
+        ]
+        return {
+            "sequence": [course_id for s in semesters for course_id in s["course_ids"]],
+            "semesters": semesters,
+            "shared_prerequisites": ids[_bits(shared)].tolist()
+        }
@@ -0,0 +1,176 @@
+"""
+Prerequisite closure - memoized transitive prerequisite queries on bitsets
+
+This is not a precomputed index: ancestors (all transitive prerequisites)
+and descendants of a course are found by a DFS over the snapshot's CSR
+adjacency on first use, and the result is kept as a Python integer bitset
+over snapshot indices in a size-bounded LRU cache. A miss costs one DFS over
+the reachable subgraph, a hit is a dictionary lookup; nothing proportional
+to courses² is built up front (a full closure of 100k courses could take
+up to ~1.25 GB per direction).
+"""
+from typing import Dict, List, Iterable, Optional, Union, Callable
+import logging
+import numpy as np
+from app.cache import TTLCache
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A set of courses: either a bitset over snapshot indices or course IDs
+CourseSet = Union[int, Iterable[int]]
+
+
+def _bits(mask: int) -> np.ndarray:
+    """Indices of the set bits of a bitset, ascending"""
+    if not mask:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
+
+def _mask(indices: Iterable[int]) -> int:
+    """Bitset with the given indices set"""
+    indices = np.fromiter(indices, dtype=np.int64)
+    if not len(indices):
+        return 0
+    flags = np.zeros(int(indices.max()) + 1, dtype=bool)
+    flags[indices] = True
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+class PrerequisiteClosure:
+    """
+    Transitive closure over PREREQUISITE edges, memoized per course
+
+    Completing a course implies its own prerequisites are satisfied, so
+    "missing" and "unlocked" checks are made against the satisfied set
+    (completed courses plus all their ancestors). The satisfied set is
+    computed per request by one multi-source DFS, O(V + E) in the worst
+    case and proportional to the completed courses' ancestry in practice.
+    """
+
+    def __init__(self, graph, cache_size: int = None):
+        """
+        Args:
+            graph: Course graph snapshot
+            cache_size: Ancestor/descendant sets kept per direction
+                (defaults to ``settings.prerequisite_closure_cache_size``)
+        """
+        self.graph = graph
+        cache_size = settings.prerequisite_closure_cache_size if cache_size is None else cache_size
+        self._ancestors = TTLCache(max_size=cache_size, ttl_seconds=0)
+        self._descendants = TTLCache(max_size=cache_size, ttl_seconds=0)
+
+    @staticmethod
+    def _reach(sources: Iterable[int], neighbours: Callable[[int], np.ndarray]) -> int:
+        """Bitset of all indices reachable from ``sources`` (excluded unless on a cycle)"""
+        seen = set()
+        stack = list(sources)
+        while stack:
+            for nxt in neighbours(stack.pop()).tolist():
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return _mask(seen)
+
+    def ancestor_bits(self, idx: int) -> int:
+        """Bitset of all transitive prerequisites of a course index"""
+        bits = self._ancestors.get(idx)
+        if bits is None:
+            bits = self._reach([idx], self.graph.prerequisite_indices)
+            self._ancestors.put(idx, bits)
+        return bits
+
+    def descendant_bits(self, idx: int) -> int:
+        """Bitset of all courses that transitively require a course index"""
+        bits = self._descendants.get(idx)
+        if bits is None:
+            bits = self._reach([idx], self.graph.successor_indices)
+            self._descendants.put(idx, bits)
+        return bits
+
+    def descendant_counts(self) -> List[int]:
+        """
+        Number of courses that transitively require each course, for all courses
+
+        One pass from the last courses back in topological order: a course's
+        descendants are the union of its successors and their descendants.
+        A bitset is dropped once all of its course's prerequisites have used
+        it, so only the frontier is held. Courses on or leading into a
+        prerequisite cycle fall back to ``descendant_bits``.
+        """
+        graph = self.graph
+        n = len(graph)
+        pending = np.diff(graph.succ_indptr).tolist()   # successors not yet done
+        uses = np.diff(graph.prereq_indptr).tolist()    # prerequisites not yet done
+        counts: List[Optional[int]] = [None] * n
+        bits: Dict[int, int] = {}
+        stack = [idx for idx in range(n) if pending[idx] == 0]
+        while stack:
+            idx = stack.pop()
+            mask = 0
+            for succ in graph.successor_indices(idx).tolist():
+                mask |= bits[succ] | (1 << succ)
+                uses[succ] -= 1
+                if uses[succ] == 0:
+                    del bits[succ]
+            counts[idx] = mask.bit_count()
+            if uses[idx]:
+                bits[idx] = mask
+            for prereq in graph.prerequisite_indices(idx).tolist():
+                pending[prereq] -= 1
+                if pending[prereq] == 0:
+                    stack.append(prereq)
+        return [
+            count if count is not None else self.descendant_bits(idx).bit_count()
+            for idx, count in enumerate(counts)
+        ]
+
+    def _ids(self, mask: int) -> List[int]:
+        return self.graph.course_ids[_bits(mask)].tolist()
+
+    def completed_mask(self, course_ids: Iterable[int]) -> int:
+        """Bitset of the given course IDs; unknown IDs are ignored"""
+        indices = (self.graph.index_of(course_id) for course_id in course_ids)
+        return _mask(idx for idx in indices if idx is not None)
+
+    def satisfied_mask(self, completed: CourseSet) -> int:
+        """Bitset of completed courses plus all of their transitive prerequisites"""
+        completed = completed if isinstance(completed, int) else self.completed_mask(completed)
+        # One DFS from all completed courses rather than one per course
+        return completed | self._reach(_bits(completed).tolist(), self.graph.prerequisite_indices)
+
+    def ancestors(self, course_id: int) -> List[int]:
+        """IDs of all transitive prerequisites of a course"""
+        idx = self.graph.index_of(course_id)
+        return self._ids(self.ancestor_bits(idx)) if idx is not None else []
+
+    def descendants(self, course_id: int) -> List[int]:
+        """IDs of all courses that transitively require a course"""
+        idx = self.graph.index_of(course_id)
+        return self._ids(self.descendant_bits(idx)) if idx is not None else []
+
+    def missing(self, course_id: int, satisfied: int) -> List[int]:
+        """
+        IDs of transitive prerequisites of a course not yet satisfied
+
+        Args:
+            course_id: Target course ID
+            satisfied: Bitset from ``satisfied_mask``
+        """
+        idx = self.graph.index_of(course_id)
+        return self._ids(self.ancestor_bits(idx) & ~satisfied) if idx is not None else []
+
+    def is_unlocked(self, course_id: int, satisfied: int) -> bool:
+        """
+        Whether all direct prerequisites of a course are satisfied
+
+        Args:
+            course_id: Target course ID
+            satisfied: Bitset from ``satisfied_mask``
+        """
+        idx = self.graph.index_of(course_id)
+        return idx is not None and all(
+            (satisfied >> prereq) & 1 for prereq in self.graph.prerequisite_indices(idx).tolist()
+        )
@@ -0,0 +1,152 @@
+"""
+Prerequisite path engine - bounded enumeration of prerequisite paths
+
+The number of prerequisite paths into a course grows exponentially with depth
+on a dense graph, so paths are never materialized up front. Path counts come
+from a dynamic program over walk lengths; paths themselves are produced
+lazily, shortest first, and any page of them can be reached by skipping whole
+subtrees using those counts.
+"""
+from typing import Dict, Iterator, List, Any, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PrerequisitePathEngine:
+    """
+    Prerequisite paths of one course up to a maximum depth
+
+    A path runs from a prerequisite to the target course and follows
+    PREREQUISITE edges; its length is its number of edges. Paths are ordered
+    by length, then by course index along the path from the target outward.
+    """
+
+    def __init__(self, graph, course_id: int, max_depth: int = 5):
+        """
+        Args:
+            graph: Course graph snapshot
+            course_id: Target course ID
+            max_depth: Maximum path length in edges
+        """
+        self.graph = graph
+        self.course_id = course_id
+        self.max_depth = max(0, max_depth)
+        self.target = graph.index_of(course_id)
+
+        # Prerequisite lists of every course reachable within max_depth
+        self._prereqs: Dict[int, List[int]] = {}
+        if self.target is not None:
+            frontier = [self.target]
+            for _ in range(self.max_depth + 1):
+                next_frontier = []
+                for idx in frontier:
+                    if idx not in self._prereqs:
+                        self._prereqs[idx] = graph.prerequisite_indices(idx).tolist()
+                        next_frontier.extend(self._prereqs[idx])
+                frontier = next_frontier
+
+        # walks[r][v]: number of prerequisite walks of exactly r edges from v
+        self._walks: List[Dict[int, int]] = [dict.fromkeys(self._prereqs, 1)]
+        for _ in range(self.max_depth):
+            previous = self._walks[-1]
+            self._walks.append({
+                idx: sum(previous.get(u, 0) for u in prereqs)
+                for idx, prereqs in self._prereqs.items()
+            })
+
+    def counts_by_length(self) -> Dict[int, int]:
+        """Number of paths of each length, for lengths that have any"""
+        if self.target is None:
+            return {}
+        counts = {}
+        for length in range(1, self.max_depth + 1):
+            count = self._walks[length][self.target]
+            if not count:
+                break
+            counts[length] = count
+        return counts
+
+    def count(self) -> int:
+        """Total number of paths, without enumerating them"""
+        return sum(self.counts_by_length().values())
+
+    def _walk(self, idx: int, remaining: int, suffix: List[int], skip: int) -> Iterator[List[int]]:
+        """Walks of exactly ``remaining`` more edges from ``idx``, skipping the first ``skip``"""
+        if remaining == 0:
+            yield suffix
+            return
+        walks = self._walks[remaining - 1]
+        for prereq in self._prereqs[idx]:
+            count = walks.get(prereq, 0)
+            if skip >= count:
+                skip -= count
+                continue
+            yield from self._walk(prereq, remaining - 1, [prereq] + suffix, skip)
+            skip = 0
+
+    def iter_paths(self, offset: int = 0) -> Iterator[List[int]]:
+        """
+        Lazily yield paths as course ID lists, shortest first
+
+        Args:
+            offset: Number of leading paths to skip; skipping costs
+                O(depth × degree), not O(offset)
+        """
+        ids = self.graph.course_ids
+        for length, count in self.counts_by_length().items():
+            if offset >= count:
+                offset -= count
+                continue
+            for path in self._walk(self.target, length, [self.target], offset):
+                yield ids[path].tolist()
+            offset = 0
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[List[int]]:
+        """Paths ``offset`` to ``offset + limit`` (all remaining if limit is None)"""
+        paths = []
+        if limit is not None and limit <= 0:
+            return paths
+        for path in self.iter_paths(offset):
+            paths.append(path)
+            if limit is not None and len(paths) >= limit:
+                break
+        return paths
+
+
+def build_path_tree(paths: Sequence[Sequence[int]], labels: Dict[int, str]) -> Optional[Dict[str, Any]]:
+    """
+    Merge paths sharing the same target-side prefix into one tree
+
+    Paths into the same course share everything from the target back to where
+    they diverge, so the tree stores each shared prefix once. A node is marked
+    ``is_path`` when the path ending at it is itself one of ``paths``.
+
+    Args:
+        paths: Paths from prerequisite to target, all ending at the same course
+        labels: Course name of each course ID
+
+    Returns:
+        Root node for the target course, or None if there are no paths
+    """
+    if not paths:
+        return None
+
+    def make_node(course_id: int) -> Dict[str, Any]:
+        return {"id": course_id, "name": labels.get(course_id), "is_path": False, "children": []}
+
+    root = make_node(paths[0][-1])
+    children_index: Dict[int, Dict[int, Dict[str, Any]]] = {id(root): {}}
+    for path in paths:
+        node = root
+        for course_id in reversed(path[:-1]):
+            children = children_index[id(node)]
+            child = children.get(course_id)
+            if child is None:
+                child = make_node(course_id)
+                children[course_id] = child
+                children_index[id(child)] = {}
+                node["children"].append(child)
+            node = child
+        node["is_path"] = True
+    return root
@@ -0,0 +1,434 @@
+"""
+Recommendation scoring engine - vectorized course match scores
+
+Keeps per-course IRT parameters and the course×domain membership matrix as
+NumPy/SciPy arrays aligned with the course graph snapshot, so the match
+score of every course is computed in one vectorized pass and only the
+top-k winners are turned into response objects.
+"""
+from typing import List, Dict, Any, Iterable, Optional, Callable, TypeVar
+import hashlib
+import json
+import logging
+import numpy as np
+from scipy import sparse
+from scipy.special import expit, logit
+from app.cache import TTLCache
+from app.config import settings
+from app.metrics import registry
+from app.services.course_graph import CourseGraph, get_course_graph
+from app.services.knowledge_tracking import READINESS_EPSILON, IRTKnowledgeTracker, get_knowledge_tracker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def canonical_inputs(knowledge_state: Dict[str, float],
+                     completed_courses: Iterable[int],
+                     quantum: float) -> list:
+    """Sorted completed-course set and knowledge state quantized to ``quantum``"""
+    quantized = sorted(
+        (domain, int(round(level / quantum)))
+        for domain, level in knowledge_state.items()
+    )
+    return [sorted(set(completed_courses)), quantized]
+
+
+def input_seed(knowledge_state: Dict[str, float], completed_courses: Iterable[int]) -> int:
+    """
+    Random seed of a student's score jitter and reason wording
+
+    Derived from the same canonical inputs as the recommendation cache key,
+    so a cached result and a fresh computation use the same variation.
+    """
+    canonical = json.dumps(
+        canonical_inputs(knowledge_state, completed_courses, settings.recommendation_cache_quantum),
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return int.from_bytes(hashlib.sha1(canonical.encode("utf-8")).digest()[:8], "big")
+
+
+class RecommendationScorer:
+    """
+    Vectorized course recommendation scorer
+
+    Match score is composed of:
+    1. Prerequisites satisfaction (35%)
+    2. Knowledge readiness (40%)
+    3. Optimal challenge curve (25%)
+    plus a small variation to keep recommendations diverse, seeded by the
+    student's canonical inputs so identical requests get identical results.
+    """
+
+    def __init__(self, graph: CourseGraph, tracker: IRTKnowledgeTracker):
+        self.graph = graph
+        self.tracker = tracker
+        self.parameters_version = tracker.parameters_version
+
+        n_courses = len(graph)
+        labels = [course["label"] for course in graph.courses]
+        self.course_names = labels
+
+        # Knowledge domains covered by the catalog
+        self.domains = sorted({
+            domain
+            for domains in tracker.course_knowledge_mapping.values()
+            for domain in domains
+        })
+        self.domain_index = {domain: j for j, domain in enumerate(self.domains)}
+
+        # Per-course IRT parameters; courses without parameters or domain
+        # mapping fall back to a fixed medium difficulty
+        self.base_difficulty = np.zeros(n_courses)
+        self.discrimination = np.ones(n_courses)
+        self.personalized = np.zeros(n_courses, dtype=bool)
+        rows, cols = [], []
+        for i, label in enumerate(labels):
+            params = tracker.course_parameters.get(label)
+            domains = tracker.course_knowledge_mapping.get(label)
+            if params is None or domains is None:
+                continue
+            self.personalized[i] = True
+            self.base_difficulty[i] = params["difficulty"]
+            self.discrimination[i] = params["discrimination"]
+            for domain in domains:
+                rows.append(i)
+                cols.append(self.domain_index[domain])
+
+        # Course × domain membership matrix
+        self.membership = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(n_courses, len(self.domains))
+        )
+
+        # Course × prerequisite matrix, reusing the snapshot's CSR arrays
+        self.prerequisites = sparse.csr_matrix(
+            (np.ones(graph.prereq_indices.shape[0]), graph.prereq_indices, graph.prereq_indptr),
+            shape=(n_courses, n_courses)
+        )
+
+    def knowledge_matrix(self, knowledge_states: List[Dict[str, float]]):
+        """
+        Convert knowledge state dicts into aligned value and presence matrices
+
+        Returns:
+            Tuple of (values, present) arrays of shape students × domains
+        """
+        values = np.zeros((len(knowledge_states), len(self.domains)))
+        present = np.zeros((len(knowledge_states), len(self.domains)))
+        for s, knowledge_state in enumerate(knowledge_states):
+            for domain, level in knowledge_state.items():
+                j = self.domain_index.get(domain)
+                if j is not None:
+                    values[s, j] = level
+                    present[s, j] = 1.0
+        return values, present
+
+    def completed_matrix(self, completed_courses: List[Iterable[int]]) -> np.ndarray:
+        """Boolean students × courses mask of completed courses"""
+        mask = np.zeros((len(completed_courses), len(self.graph)), dtype=bool)
+        for s, course_ids in enumerate(completed_courses):
+            for course_id in course_ids:
+                idx = self.graph.index_of(course_id)
+                if idx is not None:
+                    mask[s, idx] = True
+        return mask
+
+    def difficulty_scores(self, values: np.ndarray, present: np.ndarray) -> np.ndarray:
+        """
+        Personalized difficulty (0-1) of every course for every student
+
+        Vectorized form of ``IRTKnowledgeTracker.calculate_course_difficulty_for_student``
+        over students × domain matrices; returns a students × courses matrix.
+        """
+        sums = (self.membership @ (values * present).T).T
+        counts = (self.membership @ present.T).T
+        avg_readiness = np.divide(sums, counts, out=np.full_like(sums, 0.5), where=counts > 0)
+        theta = logit(np.clip(avg_readiness, READINESS_EPSILON, 1.0 - READINESS_EPSILON))
+        miss_logit = self.discrimination * (self.base_difficulty - theta)
+        return np.where(self.personalized, expit(miss_logit - self.tracker.difficulty_offset), 0.5)
+
+    def missing_counts(self, completed: np.ndarray) -> np.ndarray:
+        """
+        Number of missing direct prerequisites per student and course
+
+        One sparse product over all students, O(prerequisite edges) per
+        student; no per-row deduplication, which costs more than it saves.
+        """
+        return (self.prerequisites @ (~completed).astype(np.float64).T).T
+
+    @staticmethod
+    def match_scores(difficulty: np.ndarray,
+                     missing_counts: np.ndarray,
+                     jitter: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Match scores (display range 0.3-0.95) from difficulty and missing prerequisite counts
+
+        Args:
+            difficulty: Students × courses personalized difficulty
+            missing_counts: Students × courses missing prerequisite counts
+            jitter: Students × courses variation in [-0.03, 0.03], no variation when omitted
+        """
+        # 1. Prerequisites (35%) - strong penalty for missing prerequisites
+        penalty = np.minimum(0.35, missing_counts * 0.12)
+        prereq_score = np.where(missing_counts == 0, 0.35, np.maximum(0, 0.35 - penalty))
+
+        # 2. Knowledge readiness (40%) - bell curve peaking at moderate readiness
+        readiness = 1.0 - difficulty
+        readiness_score = 0.40 * np.select(
+            [
+                readiness > 0.85,   # Too easy - discourage
+                readiness >= 0.6,   # Sweet spot - high readiness
+                readiness >= 0.4,   # Moderate - acceptable
+                readiness >= 0.25,  # Below threshold - penalize
+            ],
+            [
+                0.5 + 0.5 * (1 - readiness) / 0.15,
+                1.0,
+                0.6 + 0.4 * (readiness - 0.4) / 0.2,
+                0.3 + 0.3 * (readiness - 0.25) / 0.15,
+            ],
+            default=0.3 * readiness / 0.25  # Too difficult - strong penalty
+        )
+
+        # 3. Optimal challenge curve (25%) - not too easy, not too hard
+        challenge_score = np.select(
+            [
+                (difficulty >= 0.3) & (difficulty <= 0.5),
+                ((difficulty >= 0.2) & (difficulty < 0.3)) | ((difficulty > 0.5) & (difficulty <= 0.6)),
+                ((difficulty >= 0.1) & (difficulty < 0.2)) | ((difficulty > 0.6) & (difficulty <= 0.7)),
+                difficulty < 0.1,
+                difficulty <= 0.8,
+            ],
+            [0.25, 0.20, 0.15, 0.08, 0.10],
+            default=0.05
+        )
+
+        match_score = prereq_score + readiness_score + challenge_score
+
+        # Add variation to ensure diversity (±3%)
+        if jitter is not None:
+            match_score = match_score + jitter
+
+        # Clamp to [0, 1] and scale to 60-95% range for display
+        # Scale: map [0.5, 1.0] -> [0.6, 0.95], map [0, 0.5) -> [0.3, 0.6)
+        match_score = np.clip(match_score, 0.0, 1.0)
+        return np.where(
+            match_score >= 0.5,
+            0.6 + (match_score - 0.5) * 0.7,
+            0.3 + match_score * 0.6
+        )
+
+    def recommend(self,
+                  knowledge_state: Dict[str, float],
+                  completed_courses: Iterable[int],
+                  max_recommendations: int) -> List[Dict[str, Any]]:
+        """
+        Score every course for one student and return the top-k
+
+        Args:
+            knowledge_state: Domain to mastery level mapping
+            completed_courses: IDs of completed courses
+            max_recommendations: Number of courses to return
+
+        Returns:
+            Top courses by match score, best first
+        """
+        return self.recommend_batch([knowledge_state], [completed_courses], max_recommendations)[0]
+
+    def recommend_batch(self,
+                        knowledge_states: List[Dict[str, float]],
+                        completed_courses: List[Iterable[int]],
+                        max_recommendations: int,
+                        max_cells: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Score every course for many students at once and return per-student top-k
+
+        Students are scored as a students × courses matrix, in chunks of at
+        most ``max_cells`` matrix cells (at least one student per chunk), so
+        peak memory stays bounded however large the catalog is.
+
+        Args:
+            knowledge_states: Domain to mastery level mapping per student
+            completed_courses: IDs of completed courses per student
+            max_recommendations: Number of courses to return per student
+            max_cells: Students × courses cells per matrix pass (defaults to settings)
+
+        Returns:
+            Top courses by match score for each student, best first
+        """
+        if max_cells is None:
+            max_cells = settings.recommendation_batch_max_cells
+        chunk_size = max(1, max_cells // max(1, len(self.graph)))
+        results: List[List[Dict[str, Any]]] = []
+        k = min(max_recommendations, len(self.graph))
+        for start in range(0, len(knowledge_states), chunk_size):
+            values, present = self.knowledge_matrix(knowledge_states[start:start + chunk_size])
+            completed = self.completed_matrix(completed_courses[start:start + chunk_size])
+
+            difficulty = self.difficulty_scores(values, present)
+            missing_counts = self.missing_counts(completed)
+            seeds = [
+                input_seed(state, done)
+                for state, done in zip(knowledge_states[start:start + chunk_size],
+                                       completed_courses[start:start + chunk_size])
+            ]
+            jitter = np.vstack([
+                np.random.default_rng(seed).uniform(-0.03, 0.03, size=len(self.graph)) for seed in seeds
+            ])
+            scores = self.match_scores(difficulty, missing_counts, jitter)
+
+            # Completed courses are never recommended
+            scores[completed] = -np.inf
+            if k <= 0:
+                results.extend([] for _ in range(scores.shape[0]))
+                continue
+
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+
+            for s in range(scores.shape[0]):
+                results.append([
+                    self._result(int(i), scores[s, i], difficulty[s, i], completed[s], seeds[s])
+                    for i in top[s]
+                    if np.isfinite(scores[s, i])
+                ])
+        return results
+
+    def _result(self,
+                idx: int,
+                score: float,
+                difficulty: float,
+                completed: np.ndarray,
+                seed: int) -> Dict[str, Any]:
+        """Build the result record for a single recommended course"""
+        prereqs = self.graph.prerequisite_indices(idx)
+        missing = self.graph.course_ids[prereqs[~completed[prereqs]]].tolist()
+        return {
+            "course_id": int(self.graph.course_ids[idx]),
+            "course_name": self.course_names[idx],
+            "match_score": float(score),
+            "difficulty_score": float(difficulty),
+            "difficulty_label": self.tracker.difficulty_label(difficulty),
+            "knowledge_readiness": float(1.0 - difficulty),
+            "prerequisites_met": not missing,
+            "missing_prerequisites": missing,
+            "reason_seed": seed ^ int(self.graph.course_ids[idx]),
+        }
+
+
+# Global scorer, rebuilt when the course graph or tracker is replaced
+_scorer: Optional[RecommendationScorer] = None
+
+
+def get_recommendation_scorer() -> RecommendationScorer:
+    """Get the recommendation scorer for the current graph snapshot and tracker"""
+    global _scorer
+    graph = get_course_graph()
+    tracker = get_knowledge_tracker()
+    if (_scorer is None
+            or _scorer.graph is not graph
+            or _scorer.tracker is not tracker
+            or _scorer.parameters_version != tracker.parameters_version):
+        _scorer = RecommendationScorer(graph, tracker)
+        logger.info(f"Built recommendation scorer for graph {graph.version}: {len(graph)} courses")
+    return _scorer
+
+
+class RecommendationCache:
+    """
+    Memoized recommendation results keyed by canonicalized inputs
+
+    The key is a hash of the sorted completed-course set, the knowledge
+    state quantized to ``quantum`` and ``max_recommendations``, so students
+    with nearly identical requests share one entry. Results are computed
+    from the quantized state itself, so an entry is a pure function of its
+    key whichever request filled it. Entries are dropped whenever the
+    catalog snapshot or tracker parameters change.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, quantum: float):
+        if quantum <= 0:
+            raise ValueError(f"Recommendation cache quantum must be positive, got {quantum}")
+        self.quantum = quantum
+        self.cache = TTLCache(max_size, ttl_seconds)
+        self._generation = None
+
+    def quantize(self, knowledge_state: Dict[str, float]) -> Dict[str, float]:
+        """Knowledge state with every level rounded to the nearest multiple of ``quantum``"""
+        return {
+            domain: round(level / self.quantum) * self.quantum
+            for domain, level in knowledge_state.items()
+        }
+
+    def make_key(self,
+                 knowledge_state: Dict[str, float],
+                 completed_courses: Iterable[int],
+                 max_recommendations: int) -> str:
+        """Canonical hash of a recommendation request"""
+        canonical = json.dumps(
+            canonical_inputs(knowledge_state, completed_courses, self.quantum) + [max_recommendations],
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+    def get_or_compute(self,
+                       scorer: RecommendationScorer,
+                       knowledge_state: Dict[str, float],
+                       completed_courses: Iterable[int],
+                       max_recommendations: int,
+                       compute: Callable[[Dict[str, float], List[int]], T]) -> T:
+        """
+        Return cached recommendations, computing and storing them on a miss
+
+        Args:
+            scorer: Scorer the results are computed with, used for invalidation
+            knowledge_state: Domain to mastery level mapping
+            completed_courses: IDs of completed courses
+            max_recommendations: Number of courses requested
+            compute: Produces the results from the quantized knowledge state
+                and the sorted completed-course IDs
+        """
+        generation = (scorer.graph.version, scorer.parameters_version)
+        if generation != self._generation:
+            if self._generation is not None:
+                logger.info("Catalog or tracker parameters changed, clearing recommendation cache")
+                self.cache.clear()
+            self._generation = generation
+
+        # Always compute from the canonical inputs, so results do not depend
+        # on whether the cache is enabled or which request filled an entry
+        knowledge_state = self.quantize(knowledge_state)
+        completed_courses = sorted(set(completed_courses))
+        if not self.cache.enabled:
+            return compute(knowledge_state, completed_courses)
+
+        key = self.make_key(knowledge_state, completed_courses, max_recommendations)
+        result = self.cache.get(key)
+        if result is None:
+            result = compute(knowledge_state, completed_courses)
+            self.cache.put(key, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the cache"""
+        return self.cache.stats()
+
+
+# Global instance
+recommendation_cache = RecommendationCache(
+    max_size=settings.recommendation_cache_size,
+    ttl_seconds=settings.recommendation_cache_ttl_seconds,
+    quantum=settings.recommendation_cache_quantum
+)
+registry.register_cache("recommendation", recommendation_cache.stats)
+
+
+def get_recommendation_cache() -> RecommendationCache:
+    """Get the global recommendation cache instance"""
+    return recommendation_cache
@@ -0,0 +1,189 @@
+"""
+Course search index - ranked fuzzy search over course labels
+
+A character n-gram inverted index over course labels and knowledge points,
+built once per course graph snapshot. Candidates are gathered from the
+postings of the query's longer n-grams only, so lookups touch a handful of
+short posting lists regardless of catalog size; candidates are then ranked
+by IDF-weighted n-gram coverage, which also tolerates a mistyped character.
+
+Labels are also indexed by full pinyin and pinyin initials, so "shujujiegou" and "sjjg" both find 数据结构.
+"""
+from typing import Dict, List, Set, Tuple, Optional, Iterable
+from collections import defaultdict
+from functools import lru_cache
+import math
+import re
+import logging
+from pypinyin import lazy_pinyin
+
+logger = logging.getLogger(__name__)
+
+# Field weights and the n-gram sizes each field is indexed with
+FIELD_WEIGHTS = {"label": 1.0, "knowledge": 0.6, "pinyin": 0.9, "initials": 0.8}
+FIELD_GRAM_SIZES = {"label": (1, 2), "knowledge": (1, 2), "pinyin": (4,), "initials": (2, 3)}
+PINYIN_FIELDS = ("pinyin", "initials")
+
+# Minimum share of the query's (IDF-weighted) n-grams a result must contain
+MIN_COVERAGE = 0.5
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip whitespace"""
+    return _WHITESPACE.sub("", text or "").lower()
+
+
+def ngrams(text: str, sizes: Iterable[int]) -> Set[str]:
+    """Character n-grams of the given sizes; texts shorter than n yield themselves"""
+    grams = set()
+    for n in sizes:
+        if len(text) <= n:
+            if text:
+                grams.add(text)
+        else:
+            grams.update(text[i:i + n] for i in range(len(text) - n + 1))
+    return grams
+
+
+@lru_cache(maxsize=None)
+def _char_pinyin(char: str) -> str:
+    return lazy_pinyin(char)[0]
+
+
+def pinyin_forms(label: str) -> Tuple[str, str]:
+    """
+    Full pinyin and pinyin initials of a label
+
+    Characters are converted one at a time through a cache, which keeps
+    index builds fast on large catalogs; polyphonic characters take their
+    most common reading.
+    """
+    syllables = [_char_pinyin(char) for char in normalize(label)]
+    return "".join(syllables), "".join(s[0] for s in syllables)
+
+
+class CourseSearchIndex:
+    """
+    N-gram inverted index over the courses of a graph snapshot
+
+    Results are ranked by the best field's weighted n-gram coverage plus
+    bonuses for exact, prefix and substring label matches; every label
+    containing the query is always returned.
+    """
+
+    def __init__(self, graph, use_pinyin: bool = True):
+        """
+        Args:
+            graph: Course graph snapshot
+            use_pinyin: Also index pinyin forms
+        """
+        self.graph = graph
+        self.pinyin_enabled = use_pinyin
+        fields = ("label", "knowledge") + (PINYIN_FIELDS if self.pinyin_enabled else ())
+
+        self._texts: Dict[str, List[str]] = {field: [] for field in fields}
+        self._postings: Dict[str, Dict[str, List[int]]] = {field: defaultdict(list) for field in fields}
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+
+        for idx, course in enumerate(graph.courses):
+            texts = {
+                "label": normalize(course["label"]),
+                "knowledge": [normalize(point) for point in course["knowledge_points"]]
+            }
+            if self.pinyin_enabled:
+                texts["pinyin"], texts["initials"] = pinyin_forms(course["label"])
+            self._exact[course["label"]].append(idx)
+
+            for field in fields:
+                text = texts[field]
+                if field == "knowledge":
+                    grams = set().union(*(ngrams(point, FIELD_GRAM_SIZES[field]) for point in text))
+                    text = "|".join(text)
+                else:
+                    grams = ngrams(text, FIELD_GRAM_SIZES[field])
+                self._texts[field].append(text)
+                postings = self._postings[field]
+                for gram in grams:
+                    postings[gram].append(idx)
+
+        self._postings = {field: dict(postings) for field, postings in self._postings.items()}
+        self._exact = dict(self._exact)
+        logger.info(
+            f"Built course search index: {len(graph)} courses, "
+            f"{sum(len(p) for p in self._postings.values())} n-grams, pinyin {'on' if self.pinyin_enabled else 'off'}"
+        )
+
+    def _idf(self, field: str, gram: str) -> Optional[float]:
+        """Inverse document frequency of a gram, None if it is not indexed"""
+        df = len(self._postings[field].get(gram, ()))
+        return math.log(1.0 + len(self.graph) / df) if df else None
+
+    def exact(self, keyword: str) -> List[int]:
+        """Snapshot indices of courses whose label equals the keyword"""
+        return list(self._exact.get(keyword, ()))
+
+    def search(self, keyword: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Ranked fuzzy search
+
+        Args:
+            keyword: Query text (Chinese, or pinyin / initials)
+            limit: Maximum number of results
+
+        Returns:
+            List of (snapshot index, score), best first
+        """
+        query = normalize(keyword)
+        if not query:
+            return []
+        fields = list(self._postings)
+        if not query.isascii():
+            fields = [f for f in fields if f not in PINYIN_FIELDS]
+
+        scores: Dict[int, float] = {}
+        for field in fields:
+            sizes = FIELD_GRAM_SIZES[field]
+            query_grams = ngrams(query, sizes)
+            # Candidates come from the longest grams only: short posting lists
+            seed_size = max((n for n in sizes if n <= len(query)), default=None)
+            if seed_size is None:
+                continue
+            seeds = {g for g in query_grams if len(g) == seed_size}
+            hits: Dict[int, int] = defaultdict(int)
+            postings = self._postings[field]
+            for gram in seeds:
+                for idx in postings.get(gram, ()):
+                    hits[idx] += 1
+            # Courses sharing too few seeds cannot reach the minimum coverage
+            required = max(1, int(len(seeds) * MIN_COVERAGE))
+            candidates = [idx for idx, count in hits.items() if count >= required]
+            if not candidates:
+                continue
+
+            # Grams found nowhere (e.g. from a typo) get the average weight
+            weights = {gram: self._idf(field, gram) for gram in query_grams}
+            known = [w for w in weights.values() if w is not None]
+            default = sum(known) / len(known)
+            weights = {gram: default if w is None else w for gram, w in weights.items()}
+            total = sum(weights.values())
+            texts = self._texts[field]
+            for idx in candidates:
+                # Candidates are few, so their grams are recomputed rather than stored
+                text = texts[idx]
+                candidate_grams = ngrams(text, sizes) if field != "knowledge" else \
+                    set().union(*(ngrams(point, sizes) for point in text.split("|")))
+                coverage = sum(w for gram, w in weights.items() if gram in candidate_grams) / total
+                contains = query in text
+                if coverage < MIN_COVERAGE and not contains:
+                    continue
+                score = FIELD_WEIGHTS[field] * coverage
+                if contains:
+                    score += 1.0 if text == query else 0.5 if text.startswith(query) else 0.3
+                if score > scores.get(idx, 0.0):
+                    scores[idx] = score
+
+        courses = self.graph.courses
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], len(courses[item[0]]["label"]), item[0]))
+        return ranked[:limit] if limit is not None else ranked
@@ -0,0 +1,292 @@
+"""
+Synthetic data - course catalogs and student populations for scale testing
+
+Catalogs are layered prerequisite DAGs: courses are split into layers
+(roughly semesters) and every prerequisite edge points from an earlier layer
+to a later one, mostly from the layer just before and mostly within the same
+knowledge domain. Low-numbered courses of a layer are preferred as
+prerequisites, which gives the heavy-tailed fan-out of real foundation
+courses. Course IDs are assigned layer by layer, so every ID prefix is
+closed under prerequisites.
+
+Student score matrices follow the 2PL model used by the knowledge tracker:
+correlated per-domain abilities, per-course difficulty and discrimination,
+and enrollments that respect prerequisites and study progress. Scores are
+integers in [0, 100], 100 * P(θ) with logit noise, so most grades fall
+between 70 and 95 with a failing tail of around a tenth.
+"""
+from typing import Any, Dict, List, Optional
+import logging
+import numpy as np
+from scipy.special import expit
+
+logger = logging.getLogger(__name__)
+
+# Knowledge domains and the subject words course labels are built from
+DOMAIN_TOPICS = {
+    "数学基础": ["数学分析", "高等数学", "复变函数", "数学建模", "最优化方法"],
+    "代数": ["线性代数", "抽象代数", "矩阵论", "数值代数"],
+    "概率统计": ["概率论", "数理统计", "随机过程", "统计学习"],
+    "离散结构": ["离散数学", "图论", "组合数学", "数理逻辑"],
+    "编程基础": ["程序设计", "C语言程序设计", "Python程序设计", "Java程序设计"],
+    "算法基础": ["数据结构", "算法设计与分析", "计算复杂性", "算法竞赛"],
+    "计算机系统": ["计算机组成原理", "操作系统", "体系结构", "嵌入式系统"],
+    "网络通信": ["计算机网络", "网络协议", "无线通信", "网络编程"],
+    "数据管理": ["数据库系统", "数据仓库", "数据挖掘", "大数据处理"],
+    "软件开发": ["软件工程", "软件测试", "面向对象设计", "Web开发"],
+    "人工智能": ["人工智能", "机器学习", "强化学习", "知识图谱"],
+    "神经网络": ["深度学习", "神经网络", "生成模型", "表示学习"],
+    "语言处理": ["自然语言处理", "信息检索", "语音识别", "文本挖掘"],
+    "图像处理": ["计算机视觉", "数字图像处理", "模式识别", "计算机图形学"],
+    "信息安全": ["密码学", "网络安全", "系统安全", "软件安全"],
+    "分布式系统": ["分布式计算", "并行计算", "云计算", "高性能计算"],
+}
+LABEL_PREFIXES = ["", "", "", "现代", "应用", "高级", "计算", "工程"]
+LABEL_SUFFIXES = ["", "导论", "基础", "原理", "实践", "专题", "(进阶)", "(A)", "(B)", "Ⅱ"]
+KNOWLEDGE_ASPECTS = ["基本概念", "核心方法", "建模与分析", "实验", "综合应用"]
+
+DIFFICULTY_LABELS = ["简单", "中等", "较难"]
+# 2PL difficulty (b) centre of each difficulty label; negative, since most
+# students pass most courses
+DIFFICULTY_THETA = {"简单": -2.3, "中等": -1.7, "较难": -1.1}
+CREDIT_CHOICES = np.array([1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0])
+CREDIT_WEIGHTS = np.array([0.05, 0.05, 0.25, 0.15, 0.3, 0.12, 0.04, 0.04])
+
+
+def domain_names(n_domains: int) -> List[str]:
+    """Names of ``n_domains`` knowledge domains; numbered once the built-in names run out"""
+    base = list(DOMAIN_TOPICS)
+    return [
+        base[j % len(base)] + (str(j // len(base) + 1) if j >= len(base) else "")
+        for j in range(n_domains)
+    ]
+
+
+def _layer_sizes(n_courses: int, n_layers: int, rng: np.random.Generator) -> np.ndarray:
+    """Courses per layer; upper layers are larger (more electives), none empty"""
+    n_layers = max(1, min(n_layers, n_courses))
+    weights = 1.0 + 0.3 * np.arange(n_layers)
+    sizes = np.ones(n_layers, dtype=np.int64)
+    sizes += rng.multinomial(n_courses - n_layers, weights / weights.sum())
+    return sizes
+
+
+def _labels(domains: np.ndarray, names: List[str], rng: np.random.Generator) -> List[str]:
+    """Unique course labels built from the subject words of each course's domain"""
+    topics = [DOMAIN_TOPICS[name.rstrip("0123456789")] for name in names]
+    topic_pick = rng.integers(0, 1 << 30, size=len(domains))
+    prefix_pick = rng.integers(0, len(LABEL_PREFIXES), size=len(domains))
+    suffix_pick = rng.integers(0, len(LABEL_SUFFIXES), size=len(domains))
+    seen: Dict[str, int] = {}
+    labels = []
+    for d, t, p, s in zip(domains.tolist(), topic_pick.tolist(), prefix_pick.tolist(), suffix_pick.tolist()):
+        words = topics[d]
+        label = LABEL_PREFIXES[p] + words[t % len(words)] + LABEL_SUFFIXES[s]
+        count = seen.get(label, 0) + 1
+        seen[label] = count
+        labels.append(label if count == 1 else f"{label}{count}")
+    return labels
+
+
+def generate_catalog(n_courses: int,
+                     n_layers: int = 8,
+                     avg_prerequisites: float = 2.0,
+                     max_prerequisites: int = 6,
+                     n_domains: int = 16,
+                     same_domain_ratio: float = 0.7,
+                     previous_layer_ratio: float = 0.7,
+                     secondary_domain_ratio: float = 0.5,
+                     knowledge_points: bool = True,
+                     seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Generate a layered prerequisite DAG catalog
+
+    Args:
+        n_courses: Number of courses
+        n_layers: Number of layers (roughly semesters)
+        avg_prerequisites: Mean number of direct prerequisites of a course
+            outside the first layer
+        max_prerequisites: Cap on direct prerequisites per course
+        n_domains: Number of knowledge domains
+        same_domain_ratio: Share of prerequisites drawn from the course's own domain
+        previous_layer_ratio: Share of prerequisites drawn from the layer just before
+        secondary_domain_ratio: Share of courses covering a second domain
+        knowledge_points: Also generate knowledge points for every course
+        seed: Random seed
+
+    Returns:
+        Dictionary with ``courses`` and ``relationships`` in the
+        course_data.json format, ``domains`` (course label → knowledge
+        domains) and ``layers`` (courses per layer, in ID order)
+    """
+    rng = np.random.default_rng(seed)
+    names = domain_names(n_domains)
+    sizes = _layer_sizes(n_courses, n_layers, rng)
+    n_layers = len(sizes)
+    starts = np.concatenate(([0], np.cumsum(sizes)))
+    layer = np.repeat(np.arange(n_layers), sizes)
+
+    # Domain popularity is skewed; within a layer courses are grouped by domain
+    popularity = 1.0 / np.arange(1, n_domains + 1) ** 0.6
+    domain = rng.choice(n_domains, size=n_courses, p=popularity / popularity.sum())
+    order = np.lexsort((domain, layer))
+    domain = domain[order]
+    # (layer, domain) → contiguous index range
+    group_start = np.searchsorted(layer * n_domains + domain, np.arange(n_layers * n_domains + 1))
+
+    # Edges: draw source layer, then a preferred (low-index) course in it
+    counts = np.minimum(rng.poisson(avg_prerequisites, size=n_courses), max_prerequisites)
+    counts[layer == 0] = 0
+    target = np.repeat(np.arange(n_courses), counts)
+    target_layer = layer[target]
+    previous = rng.random(len(target)) < previous_layer_ratio
+    source_layer = np.where(previous, target_layer - 1, (rng.random(len(target)) * target_layer).astype(np.int64))
+    skew = rng.random(len(target)) ** 2
+
+    lo, hi = starts[source_layer], starts[source_layer + 1]
+    group = source_layer * n_domains + domain[target]
+    g_lo, g_hi = group_start[group], group_start[group + 1]
+    same = (rng.random(len(target)) < same_domain_ratio) & (g_hi > g_lo)
+    lo, hi = np.where(same, g_lo, lo), np.where(same, g_hi, hi)
+    source = lo + (skew * (hi - lo)).astype(np.int64)
+
+    edges = np.unique(source * n_courses + target)
+    source, target = edges // n_courses, edges % n_courses
+
+    # Harder, more often elective courses in upper layers
+    depth = layer / max(n_layers - 1, 1)
+    u = rng.random(n_courses) + 0.6 * depth - 0.3
+    difficulty = np.digitize(u, [0.35, 0.75])
+    credits = rng.choice(CREDIT_CHOICES, size=n_courses, p=CREDIT_WEIGHTS / CREDIT_WEIGHTS.sum())
+    required = rng.random(n_courses) < 0.75 - 0.55 * depth
+
+    labels = _labels(domain, names, rng)
+    secondary = rng.choice(n_domains, size=n_courses)
+    has_secondary = (rng.random(n_courses) < secondary_domain_ratio) & (secondary != domain)
+
+    courses = []
+    domains = {}
+    aspect_pick = rng.integers(0, len(KNOWLEDGE_ASPECTS), size=(n_courses, 2)).tolist() if knowledge_points else None
+    for i in range(n_courses):
+        course = {
+            "id": i + 1,
+            "label": labels[i],
+            "difficulty": DIFFICULTY_LABELS[difficulty[i]],
+            "credits": float(credits[i]),
+            "course_type": "必修" if required[i] else "选修"
+        }
+        course_domains = [names[domain[i]]]
+        if has_secondary[i]:
+            course_domains.append(names[secondary[i]])
+        if knowledge_points:
+            course["knowledge_points"] = [
+                f"{name}{KNOWLEDGE_ASPECTS[a]}" for name, a in zip(course_domains, aspect_pick[i])
+            ]
+        courses.append(course)
+        domains[labels[i]] = course_domains
+
+    relationships = [{"from": int(s) + 1, "to": int(t) + 1} for s, t in zip(source.tolist(), target.tolist())]
+    logger.info(f"Generated synthetic catalog: {n_courses} courses, {len(relationships)} prerequisites, {n_layers} layers")
+    return {
+        "courses": courses,
+        "relationships": relationships,
+        "domains": domains,
+        "layers": sizes.tolist()
+    }
+
+
+def generate_scores(catalog: Dict[str, Any],
+                    n_students: int,
+                    n_courses: Optional[int] = None,
+                    required_enrollment: float = 0.95,
+                    elective_enrollment: float = 0.35,
+                    ability_correlation: float = 0.5,
+                    seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Generate a students × courses score matrix for a catalog
+
+    Each student has studied up to a random layer and takes a course only
+    after all of its prerequisites among the covered courses. Scores follow the 2PL model on the mean
+    ability of the course's domains, with noise on the logit scale.
+
+    Args:
+        catalog: Catalog from ``generate_catalog``
+        n_students: Number of students
+        n_courses: Courses covered by the matrix, spread evenly over the
+            layers; defaults to min(catalog size, 300)
+        required_enrollment: Probability of taking an eligible required course
+        elective_enrollment: Probability of taking an eligible elective course
+        ability_correlation: Correlation between a student's domain abilities
+        seed: Random seed
+
+    Returns:
+        Dictionary with ``scores`` (students × courses, NaN = not taken),
+        ``courses`` (course labels), and the true 2PL ``difficulty`` and
+        ``discrimination`` of each course
+    """
+    rng = np.random.default_rng(seed)
+    sizes = np.array(catalog["layers"])
+    n_courses = min(n_courses or 300, int(sizes.sum()))
+
+    # Courses spread evenly over the layers, and over the domains within each
+    quota = np.zeros_like(sizes)
+    while quota.sum() < n_courses:
+        spare = np.flatnonzero(quota < sizes)
+        quota[spare[:n_courses - quota.sum()]] += 1
+    starts = np.concatenate(([0], np.cumsum(sizes)))
+    selected = np.concatenate([
+        np.linspace(starts[l], starts[l + 1] - 1, quota[l]).round().astype(np.int64)
+        for l in range(len(sizes)) if quota[l]
+    ])
+    layer = np.repeat(np.arange(len(sizes)), quota)
+    courses = [catalog["courses"][i] for i in selected.tolist()]
+    column = {int(i) + 1: j for j, i in enumerate(selected.tolist())}
+
+    names = sorted({d for label_domains in catalog["domains"].values() for d in label_domains})
+    domain_index = {name: j for j, name in enumerate(names)}
+    general = rng.standard_normal((n_students, 1))
+    theta = np.sqrt(ability_correlation) * general + \
+        np.sqrt(1.0 - ability_correlation) * rng.standard_normal((n_students, len(names)))
+
+    # Prerequisites among the selected courses
+    prerequisites: List[List[int]] = [[] for _ in range(n_courses)]
+    for rel in catalog["relationships"]:
+        if rel["to"] in column and rel["from"] in column:
+            prerequisites[column[rel["to"]]].append(column[rel["from"]])
+
+    difficulty = np.array([DIFFICULTY_THETA[c["difficulty"]] for c in courses])
+    difficulty += rng.normal(0.0, 0.3, size=n_courses)
+    discrimination = rng.lognormal(0.0, 0.25, size=n_courses)
+    enrollment = np.array([
+        required_enrollment if c["course_type"] == "必修" else elective_enrollment
+        for c in courses
+    ])
+
+    progress = rng.integers(0, layer[-1], size=n_students, endpoint=True)
+    taken = np.zeros((n_students, n_courses), dtype=bool)
+    scores = np.full((n_students, n_courses), np.nan, dtype=np.float32)
+    for j in range(n_courses):
+        eligible = (layer[j] <= progress) & (rng.random(n_students) < enrollment[j])
+        if prerequisites[j]:
+            eligible &= taken[:, prerequisites[j]].all(axis=1)
+        taken[:, j] = eligible
+        students = np.flatnonzero(eligible)
+        if not len(students):
+            continue
+        course_domains = [domain_index[d] for d in catalog["domains"][courses[j]["label"]]]
+        ability = theta[np.ix_(students, course_domains)].mean(axis=1)
+        z = discrimination[j] * (ability - difficulty[j]) + rng.normal(0.0, 0.4, size=len(students))
+        scores[students, j] = np.rint(100.0 * expit(z))
+
+    observed = ~np.isnan(scores)
+    if observed.any():
+        logger.info(
+            f"Generated synthetic scores: {n_students} students × {n_courses} courses, "
+            f"{observed.mean():.1%} observed, {(scores[observed] < 60).mean():.1%} failing"
+        )
+    return {
+        "scores": scores,
+        "courses": [c["label"] for c in courses],
+        "difficulty": difficulty,
+        "discrimination": discrimination
+    }
@@ -0,0 +1,399 @@
+"""
+Benchmark Script
+Times the knowledge state, recommendation, prerequisite path, learning
+path and prerequisite closure hot paths in-process (no server, no database) on the demo catalog and
+on synthetic catalogs, and writes the results as JSON
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.course_graph import CourseGraph
+from app.services.course_service import CourseService
+from app.services.knowledge_tracking import IRTKnowledgeTracker
+from app.services.prerequisite_closure import PrerequisiteClosure
+from app.services.recommendation import RecommendationScorer
+from app.services.synthetic_data import DIFFICULTY_THETA, generate_catalog
+
+RESULTS_FORMAT_VERSION = 2
+# Least repeats and timed calls per repeat a case is run with
+MIN_REPEATS = 3
+MIN_RUN_CALLS = 20
+# Comparisons with fewer repeats than this on either side are underpowered:
+# they use the squared threshold and are reported without failing the run
+POWERED_REPEATS = 5
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark service hot paths in-process")
+    parser.add_argument("--sizes", default="demo,1000,10000,100000",
+                        help="Comma-separated catalogs: 'demo' or a synthetic course count (default: %(default)s)")
+    parser.add_argument("--cases", default=None, help="Comma-separated case names to run (default: all)")
+    parser.add_argument("--calls", type=int, default=200,
+                        help=f"Timed calls per case, split across repeats (at least {MIN_RUN_CALLS} per repeat)")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help=f"Timed runs per case, at least {MIN_REPEATS}; compare uses the fastest run's p50 "
+                             "(default: %(default)s)")
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="Stop timing a case after this long (at least 5 calls per repeat are timed)")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed warm-up calls per case")
+    parser.add_argument("--batch-size", type=int, default=256, help="Students per batch recommendation call")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for catalogs and inputs")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Results JSON path (default: benchmarks/results-<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Report a regression when the best-of-repeats p50 exceeds the baseline's by this "
+                             "factor and lies above every baseline repeat. Comparisons with fewer than "
+                             f"{POWERED_REPEATS} repeats or {MIN_RUN_CALLS} calls per repeat on either side are "
+                             "underpowered: they use the squared factor and only warn (default: %(default)s)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="Ignore p50 slowdowns smaller than this many milliseconds (default: %(default)s)")
+    return parser.parse_args()
+
+
+def percentiles(samples_ns: List[int]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    ms = np.array(samples_ns, dtype=np.float64) / 1e6
+    return {
+        "mean": float(ms.mean()),
+        "min": float(ms.min()),
+        "p50": float(np.percentile(ms, 50)),
+        "p95": float(np.percentile(ms, 95)),
+        "p99": float(np.percentile(ms, 99)),
+        "max": float(ms.max())
+    }
+
+
+def measure_peak(fn: Callable[[], Any]) -> int:
+    """Peak Python heap allocation (bytes) during one call"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def timed_build(fn: Callable[[], Any]):
+    """Run a build step once, returning (result, seconds, peak bytes)"""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        return result, elapsed, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Workload:
+    """A catalog with its tracker, scorer, service and sampled inputs"""
+
+    def __init__(self, name: str, catalog: Optional[Dict[str, Any]], seed: int):
+        self.name = name
+        self.builds: Dict[str, Dict[str, float]] = {}
+        rng = random.Random(seed)
+
+        if catalog is None:
+            self.graph = self._build("graph", CourseGraph.from_mock_data)
+            self.tracker = self._build("tracker", IRTKnowledgeTracker)
+        else:
+            self.graph = self._build("graph", lambda: CourseGraph(
+                catalog["courses"], catalog["relationships"], source="synthetic"
+            ))
+            self.tracker = self._build("tracker", lambda: self._synthetic_tracker(catalog))
+        self._build("closure", lambda: self.graph.closure)
+        self.scorer = self._build("scorer", lambda: RecommendationScorer(self.graph, self.tracker))
+        self.service = CourseService(None, graph=self.graph)
+
+        # Inputs: students with scores on tracked courses, and targets deep in the DAG
+        tracked = [name for name in self.tracker.course_names if name in self.tracker.course_parameters] \
+            or self.tracker.course_names
+        closure = self.graph.closure
+        depth = {idx: len(closure.ancestors(int(self.graph.course_ids[idx]))) for idx in
+                 rng.sample(range(len(self.graph)), min(len(self.graph), 2000))}
+        deep = sorted(depth, key=depth.get, reverse=True)[:50]
+        self.targets = [int(self.graph.course_ids[idx]) for idx in deep]
+
+        self.students = []
+        for _ in range(256):
+            courses = rng.sample(tracked, min(len(tracked), 20))
+            scores = {course: float(rng.randint(45, 100)) for course in courses}
+            completed = closure.ancestors(rng.choice(self.targets))
+            completed = rng.sample(completed, len(completed) // 2)
+            self.students.append((scores, self.tracker.estimate_knowledge_state(scores), completed))
+
+    def _build(self, step: str, fn: Callable[[], Any]):
+        result, seconds, peak = timed_build(fn)
+        self.builds[step] = {"seconds": seconds, "peak_memory_bytes": peak}
+        return result
+
+    @staticmethod
+    def _synthetic_tracker(catalog: Dict[str, Any]) -> IRTKnowledgeTracker:
+        """Tracker over the catalog's domains, with parameters from its difficulty labels"""
+        tracker = IRTKnowledgeTracker(catalog["domains"])
+        tracker.apply_calibrated_parameters({
+            "version": "synthetic",
+            "courses": {
+                course["label"]: {"difficulty": DIFFICULTY_THETA[course["difficulty"]], "discrimination": 1.0}
+                for course in catalog["courses"]
+            }
+        })
+        return tracker
+
+    def cases(self, batch_size: int) -> Dict[str, Callable[[int], Any]]:
+        """Benchmark cases; each takes a call number used to vary its input"""
+        students, targets = self.students, self.targets
+        states = [state for _, state, _ in students]
+        completed = [done for _, _, done in students]
+        closure = self.graph.closure
+        target_indices = [self.graph.index_of(target) for target in targets]
+
+        def batch(i):
+            start = (i * batch_size) % len(students)
+            rows = [(start + k) % len(students) for k in range(batch_size)]
+            return self.scorer.recommend_batch([states[r] for r in rows], [completed[r] for r in rows], 10)
+
+        return {
+            "estimate_knowledge_state": lambda i: self.tracker.estimate_knowledge_state(students[i % len(students)][0]),
+            "recommend_courses": lambda i: self.scorer.recommend(states[i % len(states)], completed[i % len(completed)], 10),
+            "recommend_courses_batch": batch,
+            "get_prerequisites": lambda i: self.service.get_prerequisites(targets[i % len(targets)], 5, 0, 100),
+            "get_learning_path": lambda i: self.service.get_learning_path(
+                targets[i % len(targets)], completed[i % len(completed)]
+            ),
+            # Memoized closure lookups of the deep targets against a plain DFS per call
+            "closure_ancestors": lambda i: closure.ancestor_bits(target_indices[i % len(targets)]),
+            "closure_ancestors_dfs": lambda i: PrerequisiteClosure._reach(
+                [target_indices[i % len(targets)]], self.graph.prerequisite_indices
+            ),
+            "closure_satisfied_mask": lambda i: closure.satisfied_mask(completed[i % len(completed)]),
+        }
+
+
+def run_case(fn: Callable[[int], Any],
+             calls: int,
+             warmup: int,
+             max_seconds: float,
+             repeats: int = 1) -> Dict[str, Any]:
+    """
+    Time one case, then measure its allocation peak on a separate call
+
+    The timed calls are split into ``repeats`` runs; the p50 of each run is
+    kept so comparisons can use the fastest run and the spread between runs.
+    """
+    warmup_deadline = time.perf_counter_ns() + int(max_seconds * 1e9 / 4)
+    for i in range(warmup):
+        fn(i)
+        if i >= 1 and time.perf_counter_ns() > warmup_deadline:
+            break
+    repeats = max(1, repeats)
+    samples, repeat_p50 = [], []
+    for _ in range(repeats):
+        run = []
+        deadline = time.perf_counter_ns() + int(max_seconds * 1e9 / repeats)
+        for _ in range(max(MIN_RUN_CALLS, calls // repeats)):
+            i = len(samples) + len(run)
+            start = time.perf_counter_ns()
+            fn(i)
+            end = time.perf_counter_ns()
+            run.append(end - start)
+            if end > deadline and len(run) >= 5:
+                break
+        samples.extend(run)
+        repeat_p50.append(float(np.percentile(run, 50)) / 1e6)
+    return {
+        "calls": len(samples),
+        "latency_ms": percentiles(samples),
+        "repeat_p50_ms": repeat_p50,
+        "ops_per_second": len(samples) / (sum(samples) / 1e9),
+        "peak_memory_bytes": measure_peak(lambda: fn(len(samples)))
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current git commit, if available"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def repeat_p50(result: Dict[str, Any]) -> List[float]:
+    """Per-repeat p50 latencies (ms); results without repeats count as one run"""
+    return result.get("repeat_p50_ms") or [result["latency_ms"]["p50"]]
+
+
+def sample_size(result: Dict[str, Any]) -> str:
+    """Repeats × timed calls per repeat, e.g. ``5×40``"""
+    runs = len(repeat_p50(result))
+    return f"{runs}×{result.get('calls', runs) // runs}"
+
+
+def is_underpowered(result: Dict[str, Any]) -> bool:
+    """Whether a result has too few repeats or calls per repeat to gate on"""
+    runs = len(repeat_p50(result))
+    return runs < POWERED_REPEATS or result.get("calls", runs) < runs * MIN_RUN_CALLS
+
+
+def compare(results: Dict[str, Any],
+            baseline_path: str,
+            threshold: float,
+            min_delta_ms: float = 0.0) -> Dict[str, List[str]]:
+    """
+    Compare results against a baseline results file
+
+    A case regresses only when its fastest repeat's p50 exceeds the
+    baseline's fastest by more than ``threshold`` × and ``min_delta_ms``,
+    and is also slower than every baseline repeat, so run-to-run noise on
+    either side is not reported. When either side has fewer than
+    ``POWERED_REPEATS`` repeats or ``MIN_RUN_CALLS`` calls per repeat, the
+    comparison is underpowered: the threshold is squared and a slowdown
+    beyond it is only a possible regression.
+
+    Returns:
+        Dictionary with ``regressions``, ``possible_regressions`` (from
+        underpowered comparisons), ``underpowered``, ``added`` (cases not
+        in the baseline) and ``missing`` (baseline cases not run)
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    before = {(r["catalog"], r["case"]): r for r in baseline["results"]}
+    current = {(r["catalog"], r["case"]): r for r in results["results"]}
+
+    regressions, possible, underpowered = [], [], []
+    for key, result in current.items():
+        if key not in before:
+            continue
+        old_runs, runs = repeat_p50(before[key]), repeat_p50(result)
+        old, new = min(old_runs), min(runs)
+        limit, found = threshold, regressions
+        if is_underpowered(before[key]) or is_underpowered(result):
+            limit, found = threshold ** 2, possible
+            underpowered.append(
+                f"{key[0]} / {key[1]}: {sample_size(before[key])} baseline vs {sample_size(result)} "
+                f"repeats×calls, threshold {limit:.2f}×"
+            )
+        if new > old * limit and new - old > min_delta_ms and new > max(old_runs):
+            found.append(
+                f"{key[0]} / {key[1]}: best p50 {old:.3f} ms → {new:.3f} ms ({new / old:.2f}×, "
+                f"baseline repeats {old:.3f}–{max(old_runs):.3f} ms)"
+            )
+    return {
+        "regressions": regressions,
+        "possible_regressions": possible,
+        "underpowered": underpowered,
+        "added": [f"{catalog} / {case}" for catalog, case in current if (catalog, case) not in before],
+        "missing": [f"{catalog} / {case}" for catalog, case in before if (catalog, case) not in current]
+    }
+
+
+def main():
+    """Main benchmark function"""
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if args.repeats < MIN_REPEATS:
+        print(f"Note: --repeats {args.repeats} raised to {MIN_REPEATS}")
+        args.repeats = MIN_REPEATS
+    selected = set(args.cases.split(",")) if args.cases else None
+
+    print("=" * 60)
+    print("SmartPath In-Process Benchmarks")
+    print("=" * 60)
+
+    results = {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine()
+        },
+        "settings": {
+            "calls": args.calls,
+            "repeats": args.repeats,
+            "warmup": args.warmup,
+            "max_seconds": args.max_seconds,
+            "batch_size": args.batch_size,
+            "seed": args.seed
+        },
+        "catalogs": [],
+        "results": []
+    }
+
+    for size in args.sizes.split(","):
+        size = size.strip()
+        if size == "demo":
+            name, catalog = "demo", None
+        else:
+            name, catalog = f"synthetic-{int(size)}", generate_catalog(int(size), seed=args.seed)
+        workload = Workload(name, catalog, args.seed)
+        results["catalogs"].append({
+            "catalog": name,
+            "courses": len(workload.graph),
+            "relationships": workload.graph.num_relationships,
+            "builds": workload.builds
+        })
+        print(f"\n{name}: {len(workload.graph)} courses, {workload.graph.num_relationships} prerequisites "
+              f"(graph built in {workload.builds['graph']['seconds']:.2f}s)")
+
+        for case, fn in workload.cases(args.batch_size).items():
+            if selected and case not in selected:
+                continue
+            result = run_case(fn, args.calls, args.warmup, args.max_seconds, args.repeats)
+            results["results"].append({"catalog": name, "courses": len(workload.graph), "case": case, **result})
+            latency = result["latency_ms"]
+            print(f"  {case:<26} p50 {latency['p50']:9.3f} ms  p99 {latency['p99']:9.3f} ms  "
+                  f"peak {result['peak_memory_bytes'] / 1024:10.1f} KiB")
+
+    results["max_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output = Path(args.output) if args.output else \
+        Path(__file__).parent.parent / "benchmarks" / f"results-{datetime.now():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ Wrote results to {output}")
+
+    if args.compare:
+        report = compare(results, args.compare, args.threshold, args.min_delta_ms)
+        for label, key in (("new case(s) not in baseline", "added"), ("baseline case(s) not run", "missing"),
+                           ("underpowered comparison(s), too few samples to gate on", "underpowered"),
+                           ("possible regression(s) from underpowered comparisons", "possible_regressions")):
+            if report[key]:
+                print(f"\nNote: {len(report[key])} {label}:")
+                for line in report[key]:
+                    print(f"  - {line}")
+        regressions = report["regressions"]
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"✓ No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+IRT Calibration Script
+Fits 2PL course parameters from historical student scores and writes the
+versioned parameter artifact loaded by the knowledge tracker at startup
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.services.irt_calibration import calibrate, load_score_matrix, save_parameters
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Calibrate 2PL IRT parameters for courses")
+    parser.add_argument("scores", help="Score matrix (.npz with 'scores'/'courses', or .csv with course header)")
+    parser.add_argument("-o", "--output", default=settings.irt_parameters_path,
+                        help="Parameter artifact path (default: %(default)s)")
+    parser.add_argument("--max-iter", type=int, default=100, help="Maximum EM iterations")
+    parser.add_argument("--tol", type=float, default=1e-4, help="Convergence tolerance on parameters")
+    parser.add_argument("--quadrature-points", type=int, default=41, help="Ability grid size")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Students per E-step chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel E-step workers")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every EM iteration")
+    return parser.parse_args()
+
+
+def main():
+    """Main calibration function"""
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    print("=" * 60)
+    print("IRT Parameter Calibration (2PL)")
+    print("=" * 60)
+
+    scores, course_names = load_score_matrix(args.scores)
+    print(f"Loaded {scores.shape[0]} students × {scores.shape[1]} courses from {args.scores}\n")
+
+    start = time.perf_counter()
+    artifact = calibrate(
+        scores,
+        course_names,
+        n_quadrature=args.quadrature_points,
+        max_iter=args.max_iter,
+        tol=args.tol,
+        chunk_size=args.chunk_size,
+        n_workers=args.workers
+    )
+    elapsed = time.perf_counter() - start
+
+    path = save_parameters(artifact, args.output)
+    print(f"✓ Calibrated in {elapsed:.1f}s ({artifact['iterations']} EM iterations)")
+    print(f"✓ Log-likelihood: {artifact['log_likelihood']:.3f}")
+    print(f"✓ Wrote parameters {artifact['version']} to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Synthetic Data Generation Script
+Generates a layered course catalog, knowledge domain mapping and student
+score matrix for scale testing
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database.catalog_io import write_bulk, write_course_data
+from app.services.synthetic_data import generate_catalog, generate_scores
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic course catalog and student scores")
+    parser.add_argument("-n", "--courses", type=int, default=10000, help="Number of courses")
+    parser.add_argument("--layers", type=int, default=8, help="Prerequisite layers (roughly semesters)")
+    parser.add_argument("--avg-prerequisites", type=float, default=2.0, help="Mean direct prerequisites per course")
+    parser.add_argument("--max-prerequisites", type=int, default=6, help="Maximum direct prerequisites per course")
+    parser.add_argument("--domains", type=int, default=16, help="Number of knowledge domains")
+    parser.add_argument("--same-domain-ratio", type=float, default=0.7,
+                        help="Share of prerequisites from the course's own domain")
+    parser.add_argument("--no-knowledge-points", action="store_true", help="Leave out knowledge points")
+    parser.add_argument("--students", type=int, default=10000, help="Students in the score matrix (0 to skip)")
+    parser.add_argument("--score-courses", type=int, default=300,
+                        help="Courses in the score matrix, spread over the layers")
+    parser.add_argument("--format", choices=["json", "bulk", "both"], default="both",
+                        help="Catalog format: course_data.json, bulk directory or both (default: %(default)s)")
+    parser.add_argument("-o", "--output-dir", default=str(Path(__file__).parent.parent / "data" / "synthetic"),
+                        help="Output directory (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    return parser.parse_args()
+
+
+def main():
+    """Main generation function"""
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    output = Path(args.output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print("Synthetic Data Generation")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    catalog = generate_catalog(
+        args.courses,
+        n_layers=args.layers,
+        avg_prerequisites=args.avg_prerequisites,
+        max_prerequisites=args.max_prerequisites,
+        n_domains=args.domains,
+        same_domain_ratio=args.same_domain_ratio,
+        knowledge_points=not args.no_knowledge_points,
+        seed=args.seed
+    )
+    print(f"✓ Generated {len(catalog['courses'])} courses, {len(catalog['relationships'])} prerequisites "
+          f"in {len(catalog['layers'])} layers ({time.perf_counter() - start:.1f}s)")
+
+    if args.format in ("json", "both"):
+        path = write_course_data(catalog, output / "course_data.json")
+        print(f"✓ Wrote {path}")
+    if args.format in ("bulk", "both"):
+        metadata = {"generator": "synthetic", "seed": args.seed, "layers": catalog["layers"]}
+        path = write_bulk(catalog, output / "bulk", metadata)
+        print(f"✓ Wrote bulk catalog {path}")
+    with open(output / "domains.json", 'w', encoding='utf-8') as f:
+        json.dump(catalog["domains"], f, ensure_ascii=False)
+    print(f"✓ Wrote {output / 'domains.json'}")
+
+    if args.students > 0:
+        start = time.perf_counter()
+        population = generate_scores(catalog, args.students, args.score_courses, seed=args.seed)
+        scores = population["scores"]
+        observed = scores[~np.isnan(scores)]
+        np.savez_compressed(
+            output / "scores.npz",
+            scores=scores,
+            courses=np.array(population["courses"]),
+            difficulty=population["difficulty"],
+            discrimination=population["discrimination"]
+        )
+        print(f"✓ Generated {scores.shape[0]} students × {scores.shape[1]} courses "
+              f"({time.perf_counter() - start:.1f}s): {observed.size} scores, "
+              f"mean {observed.mean():.1f}, {(observed < 60).mean():.1%} failing")
+        print(f"✓ Wrote {output / 'scores.npz'}")
+
+    catalog_path = output / ("bulk" if args.format == "bulk" else "course_data.json")
+    print("\nYou can now:")
+    print(f"1. Serve the catalog in demo mode: DEMO_DATA_PATH={catalog_path}")
+    print(f"2. Import it into Neo4j: python scripts/init_neo4j.py {catalog_path}")
+    print(f"3. Calibrate IRT parameters: python scripts/calibrate_irt.py {output / 'scores.npz'}")
+    print(f"4. Use its domains for knowledge tracking: COURSE_DOMAINS_PATH={output / 'domains.json'}")
+
+
+if __name__ == "__main__":
+    main()
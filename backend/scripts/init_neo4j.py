@@ -1,7 +1,8 @@
 """
 Neo4j Database Initialization Script
-Loads course data from JSON and creates knowledge graph
+Loads course data from JSON (or a bulk catalog directory) and creates knowledge graph
 """
+import argparse
 import json
 import sys
 import os
@@ -11,14 +12,43 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.database.neo4j_driver import Neo4jDriver
+from app.database.catalog_io import batched, is_bulk_catalog, iter_bulk_records, read_manifest
 from app.config import settings
 
+DEFAULT_DATA_PATH = Path(__file__).parent.parent / "data" / "course_data.json"
 
-def load_course_data():
-    """Load course data from JSON file"""
-    data_file = Path(__file__).parent.parent / "data" / "course_data.json"
-    with open(data_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Import course data into Neo4j")
+    parser.add_argument("data", nargs="?", default=str(DEFAULT_DATA_PATH),
+                        help="course_data.json-style file or bulk catalog directory (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Records per import transaction")
+    parser.add_argument("-y", "--yes", action="store_true", help="Clear existing data without asking")
+    return parser.parse_args()
+
+
+def load_course_data(path=DEFAULT_DATA_PATH):
+    """
+    Load course data
+
+    A JSON file is read at once; for a bulk catalog directory the courses
+    and relationships are returned as streams, read while importing.
+
+    Returns:
+        Tuple of (courses, relationships, course count, relationship count)
+    """
+    if is_bulk_catalog(path):
+        manifest = read_manifest(path)
+        return (
+            iter_bulk_records(path, "courses"),
+            iter_bulk_records(path, "relationships"),
+            manifest["courses"],
+            manifest["relationships"]
+        )
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data['courses'], data['relationships'], len(data['courses']), len(data['relationships'])
 
 
 def clear_database(driver: Neo4jDriver):
@@ -45,9 +75,9 @@ def create_constraints(driver: Neo4jDriver):
         print(f"Note: Constraint creation skipped or already exists: {e}")
 
 
-def import_courses(driver: Neo4jDriver, courses):
-    """Import courses into Neo4j"""
-    print(f"Importing {len(courses)} courses...")
+def import_courses(driver: Neo4jDriver, courses, count: int, batch_size: int = 10000):
+    """Import courses into Neo4j, ``batch_size`` per transaction"""
+    print(f"Importing {count} courses...")
 
     query = """
     UNWIND $courses AS course
@@ -57,18 +87,21 @@ def import_courses(driver: Neo4jDriver, courses):
         difficulty: course.difficulty,
         credits: course.credits,
         course_type: course.course_type,
-        description: course.label,
-        knowledge_points: []
+        description: coalesce(course.description, course.label),
+        knowledge_points: coalesce(course.knowledge_points, [])
     })
     """
 
-    result = driver.execute_write(query, {"courses": courses})
-    print(f"✓ Created {result['nodes_created']} course nodes")
+    created = 0
+    for batch in batched(courses, batch_size):
+        result = driver.execute_write(query, {"courses": batch})
+        created += result['nodes_created']
+    print(f"✓ Created {created} course nodes")
 
 
-def import_relationships(driver: Neo4jDriver, relationships):
-    """Import prerequisite relationships"""
-    print(f"Importing {len(relationships)} prerequisite relationships...")
+def import_relationships(driver: Neo4jDriver, relationships, count: int, batch_size: int = 10000):
+    """Import prerequisite relationships, ``batch_size`` per transaction"""
+    print(f"Importing {count} prerequisite relationships...")
 
     query = """
     UNWIND $relationships AS rel
@@ -77,8 +110,11 @@ def import_relationships(driver: Neo4jDriver, relationships):
     CREATE (from)-[:PREREQUISITE]->(to)
     """
 
-    result = driver.execute_write(query, {"relationships": relationships})
-    print(f"✓ Created {result['relationships_created']} prerequisite relationships")
+    created = 0
+    for batch in batched(relationships, batch_size):
+        result = driver.execute_write(query, {"relationships": batch})
+        created += result['relationships_created']
+    print(f"✓ Created {created} prerequisite relationships")
 
 
 def verify_import(driver: Neo4jDriver):
@@ -115,6 +151,7 @@ def verify_import(driver: Neo4jDriver):
 
 def main():
     """Main initialization function"""
+    args = parse_args()
     print("=" * 60)
     print("Neo4j Knowledge Graph Initialization")
     print("=" * 60)
@@ -132,20 +169,21 @@ def main():
         print("✓ Connected successfully\n")
 
         # Load data
-        data = load_course_data()
-        print(f"Loaded data: {len(data['courses'])} courses, {len(data['relationships'])} relationships\n")
+        courses, relationships, course_count, relationship_count = load_course_data(args.data)
+        print(f"Loaded data: {course_count} courses, {relationship_count} relationships\n")
 
         # Confirm before clearing
-        response = input("This will clear existing data. Continue? (y/N): ")
-        if response.lower() != 'y':
-            print("Operation cancelled")
-            return
+        if not args.yes:
+            response = input("This will clear existing data. Continue? (y/N): ")
+            if response.lower() != 'y':
+                print("Operation cancelled")
+                return
 
         # Execute import steps
         clear_database(driver)
         create_constraints(driver)
-        import_courses(driver, data['courses'])
-        import_relationships(driver, data['relationships'])
+        import_courses(driver, courses, course_count, args.batch_size)
+        import_relationships(driver, relationships, relationship_count, args.batch_size)
         verify_import(driver)
 
         print("\n" + "=" * 60)
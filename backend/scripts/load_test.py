@@ -0,0 +1,366 @@
+"""
+Load Test Script
+Drives the API with concurrent virtual users, in-process through an ASGI
+transport (default) or against a running server, and reports latency
+percentiles, throughput and error rates per route
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Latency histogram bucket upper bounds (ms), doubling from 0.25 ms to ~65 s
+HISTOGRAM_BOUNDS_MS = [0.25 * 2 ** k for k in range(19)]
+
+DEFAULT_MIX = {
+    "list_courses": 5,
+    "course_detail": 25,
+    "suggest": 20,
+    "search": 15,
+    "prerequisites": 10,
+    "learning_path": 10,
+    "knowledge_state": 5,
+    "recommend": 10,
+}
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Concurrent load test for the SmartPath API")
+    parser.add_argument("--url", default=None,
+                        help="Base URL of a running server (default: drive app.main:app in-process)")
+    parser.add_argument("-c", "--concurrency", type=int, default=20, help="Virtual users at full load")
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="Seconds at full load")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds to ramp from 0 to full load")
+    parser.add_argument("--stages", default=None,
+                        help="Ramp profile overriding -c/-d/--ramp-up: comma-separated users:seconds "
+                             "targets, e.g. 10:10,50:30,50:60,0:10 (users change linearly within a stage)")
+    parser.add_argument("--mix", default=None,
+                        help="Request mix as name=weight pairs, e.g. course_detail=50,recommend=50 "
+                             f"(scenarios: {', '.join(DEFAULT_MIX)})")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds each user waits between requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("-o", "--output", default=None, help="Write the report as JSON to this path")
+    return parser.parse_args()
+
+
+def parse_stages(args) -> List[Tuple[int, float]]:
+    """Ramp profile as (target users, seconds) stages"""
+    if args.stages:
+        stages = []
+        for stage in args.stages.split(","):
+            users, seconds = stage.split(":")
+            stages.append((int(users), float(seconds)))
+        return stages
+    stages = [(args.concurrency, args.duration)]
+    if args.ramp_up > 0:
+        stages.insert(0, (args.concurrency, args.ramp_up))
+    return stages
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    """Scenario weights"""
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in spec.split(","):
+        name, weight = item.split("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown scenario: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+class RouteStats:
+    """Latency samples and outcome counts of one route"""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+        self.status_counts: Dict[str, int] = {}
+
+    def record(self, latency_ms: float, status: str, error: bool):
+        self.latencies_ms.append(latency_ms)
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if error:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """Percentiles, throughput, error rate and histogram"""
+        ms = np.array(self.latencies_ms)
+        counts = np.bincount(np.searchsorted(HISTOGRAM_BOUNDS_MS, ms), minlength=len(HISTOGRAM_BOUNDS_MS) + 1)
+        return {
+            "requests": len(ms),
+            "errors": self.errors,
+            "error_rate": self.errors / len(ms) if len(ms) else 0.0,
+            "throughput_rps": len(ms) / elapsed if elapsed else 0.0,
+            "latency_ms": {
+                "mean": float(ms.mean()),
+                "p50": float(np.percentile(ms, 50)),
+                "p95": float(np.percentile(ms, 95)),
+                "p99": float(np.percentile(ms, 99)),
+                "max": float(ms.max())
+            } if len(ms) else {},
+            "status_counts": self.status_counts,
+            "histogram": [
+                {"le_ms": bound, "count": int(count)}
+                for bound, count in zip(HISTOGRAM_BOUNDS_MS + [float("inf")], counts)
+                if count
+            ]
+        }
+
+
+class Scenarios:
+    """Request generators built from the catalog the target serves"""
+
+    def __init__(self, courses: List[Dict[str, Any]], domains: List[str], score_courses: List[str]):
+        self.course_ids = [c["id"] for c in courses]
+        self.labels = [c["label"] for c in courses]
+        self.domains = domains
+        self.score_courses = score_courses or self.labels
+
+    def build(self, name: str, rng: random.Random) -> Tuple[str, str, str, Dict[str, Any]]:
+        """One request of a scenario as (route, method, path, httpx keyword arguments)"""
+        course_id = rng.choice(self.course_ids)
+        label = rng.choice(self.labels)
+        if name == "list_courses":
+            return "GET /api/courses/", "GET", "/api/courses/", {}
+        if name == "course_detail":
+            return "GET /api/courses/{course_id}", "GET", f"/api/courses/{course_id}", {}
+        if name == "suggest":
+            prefix = label[:rng.randint(1, 2)]
+            return "GET /api/courses/suggest", "GET", "/api/courses/suggest", {"params": {"prefix": prefix}}
+        if name == "search":
+            body = {"keyword": label[:rng.randint(2, 4)], "search_type": "fuzzy", "limit": 20}
+            return "POST /api/courses/search", "POST", "/api/courses/search", {"json": body}
+        if name == "prerequisites":
+            body = {"course_id": course_id, "max_depth": 5, "limit": 100}
+            return "POST /api/courses/prerequisites", "POST", "/api/courses/prerequisites", {"json": body}
+        if name == "learning_path":
+            body = {"target_course_id": course_id, "completed_courses": rng.sample(self.course_ids, min(3, len(self.course_ids)))}
+            return "POST /api/courses/learning-path", "POST", "/api/courses/learning-path", {"json": body}
+        if name == "knowledge_state":
+            courses = rng.sample(self.score_courses, min(5, len(self.score_courses)))
+            body = {"student_id": f"load-{rng.randrange(10 ** 6)}",
+                    "course_scores": {c: rng.randint(50, 100) for c in courses}}
+            return "POST /api/knowledge/state", "POST", "/api/knowledge/state", {"json": body}
+        if name == "recommend":
+            body = {
+                "student_id": f"load-{rng.randrange(10 ** 6)}",
+                "knowledge_state": {d: round(rng.random(), 2) for d in rng.sample(self.domains, min(4, len(self.domains)))},
+                "completed_courses": rng.sample(self.course_ids, min(5, len(self.course_ids))),
+                "max_recommendations": 5
+            }
+            return "POST /api/knowledge/recommend", "POST", "/api/knowledge/recommend", {"json": body}
+        raise ValueError(f"Unknown scenario: {name}")
+
+
+class LoadTest:
+    """Closed-loop virtual users following a ramp profile"""
+
+    def __init__(self,
+                 client: httpx.AsyncClient,
+                 scenarios: Scenarios,
+                 stages: List[Tuple[int, float]],
+                 mix: Dict[str, float],
+                 think_time: float,
+                 seed: int):
+        self.client = client
+        self.scenarios = scenarios
+        self.stages = stages
+        self.mix_names = list(mix)
+        self.mix_weights = list(mix.values())
+        self.think_time = think_time
+        self.seed = seed
+        self.max_users = max(users for users, _ in stages)
+        self.duration = sum(seconds for _, seconds in stages)
+        self.routes: Dict[str, RouteStats] = {}
+        self.timeline: List[Dict[str, Any]] = []
+        self.active_users = 0
+        self._start = 0.0
+
+    def target_users(self, elapsed: float) -> int:
+        """Users wanted at a point of the profile, interpolated within stages"""
+        users, start = 0, 0.0
+        for target, seconds in self.stages:
+            if elapsed < start + seconds:
+                return round(users + (target - users) * (elapsed - start) / seconds)
+            users, start = target, start + seconds
+        return 0
+
+    async def _user(self, number: int):
+        rng = random.Random(self.seed * 100003 + number)
+        while True:
+            elapsed = time.perf_counter() - self._start
+            if elapsed >= self.duration:
+                return
+            if number >= self.target_users(elapsed):
+                await asyncio.sleep(0.05)
+                continue
+
+            scenario = rng.choices(self.mix_names, self.mix_weights)[0]
+            route, method, path, kwargs = self.scenarios.build(scenario, rng)
+            self.active_users += 1
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, **kwargs)
+                await response.aread()
+                status, error = str(response.status_code), response.status_code >= 400
+            except Exception as e:
+                # Any failure counts against its route; one bad request must not stop the run
+                status, error = type(e).__name__, True
+            finally:
+                self.active_users -= 1
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.routes.setdefault(route, RouteStats()).record(latency_ms, status, error)
+            self._second(start - self._start)["requests"] += 1
+            if error:
+                self._second(start - self._start)["errors"] += 1
+            if self.think_time:
+                await asyncio.sleep(self.think_time)
+
+    def _second(self, elapsed: float) -> Dict[str, Any]:
+        second = int(elapsed)
+        while len(self.timeline) <= second:
+            self.timeline.append({
+                "second": len(self.timeline),
+                "target_users": self.target_users(len(self.timeline)),
+                "requests": 0,
+                "errors": 0
+            })
+        return self.timeline[second]
+
+    async def run(self) -> float:
+        """Run the profile, returning the elapsed seconds"""
+        self._start = time.perf_counter()
+        await asyncio.gather(*(self._user(n) for n in range(self.max_users)))
+        return time.perf_counter() - self._start
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        overall = RouteStats()
+        for stats in self.routes.values():
+            overall.latencies_ms.extend(stats.latencies_ms)
+            overall.errors += stats.errors
+            for status, count in stats.status_counts.items():
+                overall.status_counts[status] = overall.status_counts.get(status, 0) + count
+        return {
+            "elapsed_seconds": elapsed,
+            "routes": {route: stats.summary(elapsed) for route, stats in sorted(self.routes.items())},
+            "overall": overall.summary(elapsed),
+            "timeline": self.timeline
+        }
+
+
+async def discover(client: httpx.AsyncClient, in_process: bool) -> Scenarios:
+    """
+    Fetch the catalog and knowledge domains the scenarios draw from
+
+    Args:
+        client: Client for the target
+        in_process: Whether the target is the app driven in this process
+    """
+    courses = (await client.get("/api/courses/")).raise_for_status().json()
+    domains = (await client.get("/api/knowledge/domains")).raise_for_status().json()["domains"]
+    score_courses = []
+    if in_process:
+        # In-process: score courses the tracker knows, so no request is wasted on unknown names
+        from app.services.knowledge_tracking import get_knowledge_tracker
+        labels = {c["label"] for c in courses}
+        score_courses = [name for name in get_knowledge_tracker().course_names if name in labels]
+    return Scenarios(courses, domains, score_courses)
+
+
+async def run(args) -> Dict[str, Any]:
+    """Set up the client (and the app, in-process) and run the load test"""
+    stages = parse_stages(args)
+    mix = parse_mix(args.mix)
+    max_users = max(users for users, _ in stages)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.url:
+        limits = httpx.Limits(max_connections=max_users, max_keepalive_connections=max_users)
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits) as client:
+            return await _run_with(client, args, stages, mix, args.url, in_process=False)
+
+    from app.main import app
+    async with app.router.lifespan_context(app):
+        # Unhandled app exceptions become 500 responses, as behind a real server
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=timeout) as client:
+            return await _run_with(client, args, stages, mix, "in-process", in_process=True)
+
+
+async def _run_with(client: httpx.AsyncClient,
+                    args,
+                    stages: List[Tuple[int, float]],
+                    mix: Dict[str, float],
+                    target: str,
+                    in_process: bool) -> Dict[str, Any]:
+    scenarios = await discover(client, in_process)
+    test = LoadTest(client, scenarios, stages, mix, args.think_time, args.seed)
+    print(f"Target: {target} ({len(scenarios.course_ids)} courses)")
+    print(f"Profile: {', '.join(f'{u} users / {s:g}s' for u, s in stages)}; {test.duration:g}s total\n")
+    elapsed = await test.run()
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "target": target,
+        "stages": [{"users": u, "seconds": s} for u, s in stages],
+        "mix": mix,
+        "think_time": args.think_time,
+        **test.report(elapsed)
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    """Per-route summary table"""
+    header = f"{'route':<34} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["routes"].items()) + [("TOTAL", report["overall"])]
+    for route, stats in rows:
+        latency = stats["latency_ms"]
+        if not latency:
+            continue
+        print(f"{route:<34} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} "
+              f"{stats['error_rate'] * 100:>6.2f} {latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}")
+
+
+def main():
+    """Main load test function"""
+    args = parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    print("=" * 60)
+    print("SmartPath Load Test")
+    print("=" * 60)
+
+    try:
+        report = asyncio.run(run(args))
+    except httpx.HTTPError as e:
+        print(f"\n❌ Could not reach {args.url or 'the app'}: {e}")
+        sys.exit(1)
+    print_report(report)
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ Wrote report to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Shared pytest fixtures
+
+Tests run against the demo catalog: no Neo4j connection is needed.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    """API client running the app lifespan in demo mode"""
+    with TestClient(app) as test_client:
+        yield test_client
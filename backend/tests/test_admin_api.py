@@ -0,0 +1,46 @@
+"""
+Admin API tests
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database.neo4j_driver import SlowQueryLog, get_slow_query_log
+from app.routers import admin_router
+
+
+def test_admin_endpoints_are_not_mounted_without_token(client):
+    assert client.get("/api/admin/slow-queries").status_code == 404
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(settings, "admin_api_token", "s3cret")
+    log = SlowQueryLog(threshold_ms=1.0, buffer_size=4, profile=False, sample_rate=0.0)
+    app = FastAPI()
+    app.include_router(admin_router)
+    app.dependency_overrides[get_slow_query_log] = lambda: log
+    return TestClient(app), log
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}, {"Authorization": "Basic s3cret"}])
+def test_admin_endpoints_require_the_token(admin, headers):
+    client, _ = admin
+    response = client.get("/api/admin/slow-queries", headers=headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+    assert client.delete("/api/admin/slow-queries", headers=headers).status_code == 401
+
+
+def test_admin_lists_and_clears_slow_queries(admin):
+    client, log = admin
+    headers = {"Authorization": "Bearer s3cret"}
+    log.observe("MATCH (c) RETURN c", "all_courses", {}, 0.5, 3, None, "read")
+
+    body = client.get("/api/admin/slow-queries", headers=headers).json()
+    assert body["total_slow_queries"] == 1
+    assert [q["query_name"] for q in body["slow_queries"]] == ["all_courses"]
+
+    assert client.delete("/api/admin/slow-queries", headers=headers).json() == {"cleared": True}
+    assert client.get("/api/admin/slow-queries", headers=headers).json()["slow_queries"] == []
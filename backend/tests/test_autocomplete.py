@@ -0,0 +1,69 @@
+"""
+Course autocomplete tests
+"""
+import random
+
+import pytest
+
+from app.services.autocomplete import CourseSuggestTrie
+from app.services.course_graph import CourseGraph
+from app.services.prerequisite_closure import PrerequisiteClosure
+from app.services.search_index import normalize, pinyin_forms
+from app.services.synthetic_data import generate_catalog
+
+
+def brute_force_suggest(graph, unlocks, prefixes, k):
+    """Best k courses with any key starting with each prefix, by a full scan"""
+    ranked = sorted(range(len(graph)), key=lambda i: (-unlocks[i], len(graph.courses[i]["label"]), i))
+    keys = {
+        idx: {normalize(graph.courses[idx]["label"]), *pinyin_forms(graph.courses[idx]["label"])}
+        for idx in ranked
+    }
+    expected = {}
+    for prefix in prefixes:
+        normalized = normalize(prefix)
+        matches = [idx for idx in ranked if normalized and any(key.startswith(normalized) for key in keys[idx])]
+        expected[prefix] = matches[:k]
+    return expected
+
+
+@pytest.fixture(scope="module", params=["demo", "synthetic"])
+def graph(request):
+    if request.param == "demo":
+        return CourseGraph.from_mock_data()
+    catalog = generate_catalog(1500, seed=8)
+    return CourseGraph(catalog["courses"], catalog["relationships"], source="synthetic")
+
+
+def test_suggestions_match_brute_force(graph):
+    trie = CourseSuggestTrie(graph, k=5)
+    rng = random.Random(1)
+    prefixes = ["", "sj", "shu", "数据", "zzz", "计算机"]
+    for course in rng.sample(graph.courses, 40):
+        for form in [course["label"], *sorted(pinyin_forms(course["label"]))]:
+            prefixes.append(form[:rng.randint(1, len(form))])
+    for prefix, expected in brute_force_suggest(graph, trie.unlocks, prefixes, 5).items():
+        assert trie.suggest(prefix) == expected, prefix
+        assert trie.suggest(prefix, limit=2) == trie.suggest(prefix)[:2]
+
+
+def test_unlock_counts_match_descendant_sets(graph):
+    closure = PrerequisiteClosure(graph)
+    counts = closure.descendant_counts()
+    assert counts == [closure.descendant_bits(idx).bit_count() for idx in range(len(graph))]
+
+
+def test_unlock_counts_with_a_prerequisite_cycle():
+    courses = [{"id": i, "label": f"课程{i}"} for i in range(1, 6)]
+    edges = [(1, 2), (2, 3), (3, 2), (3, 4), (5, 4)]
+    graph = CourseGraph(courses, [{"from": a, "to": b} for a, b in edges])
+    counts = PrerequisiteClosure(graph).descendant_counts()
+    assert counts == [3, 3, 3, 0, 1]
+
+
+def test_suggest_endpoint(client):
+    response = client.get("/api/courses/suggest", params={"prefix": "sjjg", "limit": 3})
+    assert response.status_code == 200
+    suggestions = response.json()["suggestions"]
+    assert suggestions and suggestions[0]["label"] == "数据结构"
+    assert all(s["unlocks"] >= 0 for s in suggestions)
@@ -0,0 +1,49 @@
+"""
+Benchmark baseline comparison tests
+"""
+import json
+
+import pytest
+
+from scripts.benchmark import compare
+
+
+def results(p50s, calls_per_repeat=40, case="recommend_courses"):
+    return {"results": [{
+        "catalog": "demo", "case": case, "calls": len(p50s) * calls_per_repeat,
+        "latency_ms": {"p50": min(p50s)}, "repeat_p50_ms": list(p50s)
+    }]}
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    def write(p50s, **kwargs):
+        path = tmp_path / "baseline.json"
+        path.write_text(json.dumps(results(p50s, **kwargs)))
+        return str(path)
+    return write
+
+
+def test_powered_slowdown_is_a_regression(baseline):
+    report = compare(results([1.5, 1.6, 1.5, 1.7, 1.6]), baseline([1.0, 1.1, 1.0, 1.2, 1.0]), 1.25)
+    assert len(report["regressions"]) == 1
+    assert report["underpowered"] == [] and report["possible_regressions"] == []
+
+
+def test_slowdown_within_baseline_spread_is_noise(baseline):
+    report = compare(results([1.3] * 5), baseline([1.0, 1.4, 1.1, 1.0, 1.2]), 1.25)
+    assert report["regressions"] == []
+
+
+@pytest.mark.parametrize("current,old", [
+    (dict(p50s=[1.5, 1.6]), dict(p50s=[1.0] * 5)),
+    (dict(p50s=[1.5] * 5), dict(p50s=[1.0] * 5, calls_per_repeat=6)),
+    (dict(p50s=[1.5] * 5), dict(p50s=[1.0])),
+])
+def test_underpowered_comparisons_widen_and_do_not_gate(baseline, current, old):
+    report = compare(results(**current), baseline(**old), 1.25)
+    assert report["regressions"] == [] and report["possible_regressions"] == []
+    assert len(report["underpowered"]) == 1 and "1.56×" in report["underpowered"][0]
+
+    report = compare(results([p * 1.2 for p in current["p50s"]]), baseline(**old), 1.25)
+    assert report["regressions"] == [] and len(report["possible_regressions"]) == 1
@@ -0,0 +1,59 @@
+"""
+Course graph snapshot tests
+"""
+import pytest
+
+from app.database.mock_data import get_mock_courses, get_mock_relationships
+from app.services.course_graph import CourseGraph
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return CourseGraph.from_mock_data()
+
+
+def test_snapshot_indexes_every_demo_course(graph):
+    courses = get_mock_courses()
+    assert len(graph) == len(courses)
+    assert list(graph.course_ids) == sorted(c["id"] for c in courses)
+    for course in courses:
+        assert graph.get(course["id"])["label"] == course["label"]
+    assert graph.get(-1) is None and graph.index_of(-1) is None
+
+
+def test_adjacency_matches_relationships(graph):
+    prerequisites, successors = {}, {}
+    for rel in get_mock_relationships():
+        prerequisites.setdefault(rel["to"], set()).add(rel["from"])
+        successors.setdefault(rel["from"], set()).add(rel["to"])
+    assert graph.num_relationships == sum(len(p) for p in prerequisites.values())
+    for course_id in graph.course_ids.tolist():
+        assert graph.prerequisite_ids(course_id) == sorted(prerequisites.get(course_id, ()))
+        assert graph.successor_ids(course_id) == sorted(successors.get(course_id, ()))
+
+
+def test_snapshot_is_read_only(graph):
+    with pytest.raises(TypeError):
+        graph.get(1)["label"] = "changed"
+    with pytest.raises(ValueError):
+        graph.course_ids[0] = 0
+
+
+def test_version_depends_only_on_content():
+    courses = [{"id": 2, "label": "B"}, {"id": 1, "label": "A"}]
+    relationships = [{"from": 1, "to": 2}]
+    first = CourseGraph(courses, relationships)
+    assert CourseGraph(courses[::-1], relationships).version == first.version
+    assert CourseGraph(courses, []).version != first.version
+
+
+def test_unknown_relationship_endpoints_are_skipped():
+    graph = CourseGraph([{"id": 1, "label": "A"}], [{"from": 1, "to": 99}])
+    assert graph.num_relationships == 0
+
+
+def test_course_detail_endpoint_reads_the_snapshot(client, graph):
+    detail = client.get("/api/courses/36").json()
+    assert detail["label"] == graph.get(36)["label"]
+    assert detail["prerequisites"] == graph.prerequisite_ids(36)
+    assert client.get("/api/courses/999999").status_code == 404
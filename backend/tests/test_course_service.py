@@ -0,0 +1,59 @@
+"""
+Course service tests
+"""
+import asyncio
+
+import pytest
+
+from app.services.course_graph import CourseGraph
+from app.services.course_service import CourseService
+
+
+class FakeDriver:
+    """Sync driver stand-in that records the queries it is asked to run"""
+
+    def __init__(self, records):
+        self._driver = object()
+        self.records = records
+        self.calls = []
+
+    def execute_query(self, query, parameters=None, use_cache=True, name=None):
+        self.calls.append((name, parameters))
+        return [dict(r) for r in self.records if r["id"] in parameters["course_ids"]]
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return CourseGraph.from_mock_data()
+
+
+def test_bulk_lookup_matches_single_lookups(graph):
+    service = CourseService(FakeDriver([]), graph=graph)
+    ids = [36, 1, 36, 999999, 29]
+    courses = asyncio.run(service.get_courses_by_ids(ids))
+
+    assert list(courses) == [36, 1, 29]
+    for course_id, course in courses.items():
+        assert course == asyncio.run(service.get_course_by_id(course_id))
+
+
+def test_courses_missing_from_snapshot_use_one_query(graph):
+    db = FakeDriver([
+        {"id": 5001, "label": "新课程", "difficulty": "中等", "credits": 3.0, "course_type": "选修",
+         "description": None, "knowledge_points": None, "prerequisites": [36, None, 1]},
+    ])
+    service = CourseService(db, graph=graph)
+    courses = asyncio.run(service.get_courses_by_ids([1, 5001, 5002]))
+
+    assert set(courses) == {1, 5001}
+    assert courses[5001].prerequisites == [1, 36]
+    assert courses[5001].knowledge_points == []
+    assert db.calls == [("courses.by_ids", {"course_ids": [5001, 5002]})]
+
+
+def test_demo_mode_never_queries(graph):
+    db = FakeDriver([])
+    db._driver = None
+    service = CourseService(db, graph=graph)
+    assert asyncio.run(service.get_courses_by_ids([999999])) == {}
+    assert db.calls == []
@@ -0,0 +1,67 @@
+"""
+Course API tests
+"""
+import json
+
+
+def test_prerequisite_stream_honours_offset_and_limit(client):
+    request = {"course_id": 36, "max_depth": 5, "offset": 1, "limit": 3}
+    page = client.post("/api/courses/prerequisites", json=request).json()
+    response = client.post("/api/courses/prerequisites/stream", json=request)
+    assert response.status_code == 200
+
+    streamed = [json.loads(line)["path"] for line in response.text.splitlines()]
+    assert len(streamed) == 3
+    assert streamed == page["path"]
+
+
+def test_prerequisite_stream_limit_zero_is_empty(client):
+    response = client.post("/api/courses/prerequisites/stream", json={"course_id": 36, "limit": 0})
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_learning_path_keeps_completed_target(client):
+    response = client.post("/api/courses/learning-path", json={
+        "target_course_id": 1, "completed_courses": [1]
+    })
+    assert response.status_code == 200
+    plan = response.json()
+    assert plan["recommended_sequence"] == [1]
+    assert plan["estimated_semesters"] == 1
+
+
+def test_learning_path_orders_prerequisites_first(client):
+    plan = client.post("/api/courses/learning-path", json={
+        "target_course_id": 36, "completed_courses": []
+    }).json()
+    sequence = plan["recommended_sequence"]
+    assert sequence[-1] == 36
+
+    semester_of = {cid: s["semester"] for s in plan["semesters"] for cid in s["course_ids"]}
+    for course_id in sequence:
+        for prereq in client.get(f"/api/courses/{course_id}").json()["prerequisites"]:
+            if prereq in semester_of:
+                assert semester_of[prereq] < semester_of[course_id]
+
+
+def test_multi_target_path_plans_shared_prerequisites_once(client):
+    plan = client.post("/api/courses/learning-path/multi", json={
+        "target_course_ids": [4, 10], "completed_courses": [1]
+    }).json()
+    sequence = plan["recommended_sequence"]
+    assert len(sequence) == len(set(sequence))
+
+    singles = [
+        set(client.post("/api/courses/learning-path", json={
+            "target_course_id": target, "completed_courses": [1]
+        }).json()["recommended_sequence"])
+        for target in (4, 10)
+    ]
+    assert set(sequence) == singles[0] | singles[1]
+    assert plan["shared_prerequisites"] and set(plan["shared_prerequisites"]) == singles[0] & singles[1]
+
+
+def test_multi_target_path_unknown_target_is_404(client):
+    response = client.post("/api/courses/learning-path/multi", json={"target_course_ids": [7, 999999]})
+    assert response.status_code == 404
@@ -0,0 +1,41 @@
+"""
+HTTP caching tests
+"""
+import pytest
+
+from app.http_cache import CachedJSONBody
+
+CATALOG_ENDPOINTS = ["/api/courses/", "/api/courses/stats/summary", "/api/knowledge/domains"]
+
+
+@pytest.mark.parametrize("path", CATALOG_ENDPOINTS)
+def test_matching_etag_gets_304(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and "max-age" in response.headers["cache-control"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        revalidated = client.get(path, headers={"If-None-Match": header})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+    changed = client.get(path, headers={"If-None-Match": '"stale"'})
+    assert changed.status_code == 200
+    assert changed.content == response.content
+
+
+def test_body_is_rebuilt_only_when_the_version_changes():
+    cached = CachedJSONBody()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"courses": len(builds)}
+
+    body, etag = cached.get("v1", build)
+    assert cached.get("v1", build) == (body, etag)
+    new_body, new_etag = cached.get("v2", build)
+    assert len(builds) == 2 and new_etag != etag
+    assert cached.stats() == {"size": 1, "hits": 1, "misses": 2}
@@ -0,0 +1,45 @@
+"""
+IRT calibration tests
+"""
+import numpy as np
+import pytest
+from scipy import sparse
+
+from app.services.irt_calibration import IRTCalibrator
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(0)
+    matrix = rng.uniform(30, 100, size=(200, 6))
+    matrix[rng.random(matrix.shape) < 0.3] = np.nan
+    return matrix
+
+
+def test_fit_with_zero_iterations_keeps_start_values(scores):
+    calibrator = IRTCalibrator(max_iter=0).fit(scores)
+    assert calibrator.iterations == 0
+    np.testing.assert_array_equal(calibrator.discrimination, np.ones(6))
+    np.testing.assert_array_equal(calibrator.difficulty, np.zeros(6))
+    assert np.isfinite(calibrator.log_likelihood)
+    assert calibrator.to_artifact([f"c{i}" for i in range(6)])["courses"]["c0"]["n_responses"] > 0
+
+
+def test_sparse_input_matches_dense(scores):
+    dense = IRTCalibrator(max_iter=20).fit(scores)
+    rows, cols = np.nonzero(~np.isnan(scores))
+    matrix = sparse.csr_matrix((scores[rows, cols], (rows, cols)), shape=scores.shape)
+    fitted = IRTCalibrator(max_iter=20).fit(matrix)
+    np.testing.assert_allclose(fitted.difficulty, dense.difficulty)
+    np.testing.assert_allclose(fitted.discrimination, dense.discrimination)
+    np.testing.assert_array_equal(fitted.response_counts, dense.response_counts)
+
+
+def test_recovers_difficulty_order_of_synthetic_scores():
+    rng = np.random.default_rng(1)
+    difficulty = np.array([-1.5, -0.5, 0.5, 1.5])
+    theta = rng.normal(size=(2000, 1))
+    p = 1.0 / (1.0 + np.exp(-(theta - difficulty)))
+    scores = 100.0 * np.clip(p + rng.normal(scale=0.05, size=p.shape), 0, 1)
+    fitted = IRTCalibrator().fit(scores)
+    assert list(np.argsort(fitted.difficulty)) == [0, 1, 2, 3]
@@ -0,0 +1,126 @@
+"""
+Knowledge tracking API tests
+"""
+import uuid
+
+
+def _student(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:8]}"
+
+
+def test_batch_recommendation_requires_each_knowledge_state(client):
+    response = client.post("/api/knowledge/recommend/batch", json={
+        "students": [
+            {"student_id": "a", "knowledge_state": {"数学基础": 0.7}},
+            {"student_id": "b", "knowledge_state": {}},
+        ]
+    })
+    assert response.status_code == 400
+    assert "student b" in response.json()["detail"]
+
+
+def test_batch_recommendation_matches_single(client):
+    students = [
+        {"student_id": "a", "knowledge_state": {"数学基础": 0.7}, "completed_courses": [1]},
+        {"student_id": "b", "knowledge_state": {"编程基础": 0.3, "数学基础": 0.5}},
+    ]
+    batch = client.post("/api/knowledge/recommend/batch", json={
+        "students": students, "max_recommendations": 4
+    }).json()
+    for student, result in zip(students, batch["results"]):
+        single = client.post("/api/knowledge/recommend", json={**student, "max_recommendations": 4}).json()
+        assert result["student_id"] == student["student_id"]
+        assert result["recommendations"] == single["recommendations"]
+
+
+SCORES = {"高等数学": 85, "数据结构": 70}
+
+
+def test_batch_state_honours_per_student_method(client):
+    students = [
+        {"student_id": "eap", "course_scores": SCORES, "method": "eap"},
+        {"student_id": "mle", "course_scores": SCORES, "method": "mle"},
+    ]
+    response = client.post("/api/knowledge/state/batch", json={"students": students})
+    assert response.status_code == 200
+    results = {r["student_id"]: r for r in response.json()["results"]}
+
+    for student in students:
+        single = client.post("/api/knowledge/state", json=student).json()
+        assert results[student["student_id"]]["ability_estimates"] == single["ability_estimates"]
+    assert results["eap"]["ability_estimates"] != results["mle"]["ability_estimates"]
+
+
+def test_state_rejects_unknown_method_and_out_of_range_scores(client):
+    for student in (
+        {"student_id": "a", "course_scores": SCORES, "method": "bogus"},
+        {"student_id": "a", "course_scores": {"高等数学": 150}},
+        {"student_id": "a", "course_scores": {"高等数学": -1}},
+    ):
+        assert client.post("/api/knowledge/state", json=student).status_code == 422
+        response = client.post("/api/knowledge/state/batch", json={"students": [student]})
+        assert response.status_code == 422
+
+
+def test_extreme_scores_reach_weaknesses_and_strengths(client):
+    courses = ["高等数学", "线性代数", "数据结构", "程序设计基础"]
+    low = client.post("/api/knowledge/state", json={
+        "student_id": "low", "course_scores": {name: 2 for name in courses}
+    }).json()
+    high = client.post("/api/knowledge/state", json={
+        "student_id": "high", "course_scores": {name: 98 for name in courses}
+    }).json()
+    assert low["weaknesses"] and set(low["weaknesses"]) == set(low["knowledge_vector"])
+    assert high["strengths"] and set(high["strengths"]) == set(high["knowledge_vector"])
+
+
+def test_stale_grade_event_is_ignored(client):
+    student_id = _student("stale")
+    newer = client.post("/api/knowledge/events/grade", json={
+        "student_id": student_id, "course_name": "高等数学", "score": 90,
+        "occurred_at": "2026-06-02T10:00:00+00:00"
+    }).json()
+    assert newer["applied"] is True
+
+    older = client.post("/api/knowledge/events/grade", json={
+        "student_id": student_id, "course_name": "高等数学", "score": 40,
+        "occurred_at": "2026-06-01T10:00:00+00:00"
+    }).json()
+    assert older["applied"] is False
+    assert older["ability_estimates"] == newer["ability_estimates"]
+
+    state = client.get(f"/api/knowledge/state/{student_id}").json()
+    assert state["knowledge_vector"] == newer["updated_domains"]
+
+
+def test_regrade_matches_single_grade(client):
+    regraded, graded_once = _student("regrade"), _student("once")
+    for score in (40, 95, 60, 77):
+        client.post("/api/knowledge/events/grade", json={
+            "student_id": regraded, "course_name": "数据结构", "score": score
+        })
+    once = client.post("/api/knowledge/events/grade", json={
+        "student_id": graded_once, "course_name": "数据结构", "score": 77
+    }).json()
+
+    state = client.get(f"/api/knowledge/state/{regraded}").json()
+    assert state["ability_estimates"] == once["ability_estimates"]
+
+
+def test_cached_recommendation_matches_fresh(client):
+    request = {
+        "student_id": "cache",
+        "knowledge_state": {"数学基础": 0.63, "编程基础": 0.41},
+        "completed_courses": [1],
+        "max_recommendations": 5
+    }
+    first = client.post("/api/knowledge/recommend", json=request).json()
+    second = client.post("/api/knowledge/recommend", json=request).json()
+    assert first["recommendations"] == second["recommendations"]
+
+    # Same inputs scored outside the cache
+    batch = client.post("/api/knowledge/recommend/batch", json={
+        "students": [{k: request[k] for k in ("student_id", "knowledge_state", "completed_courses")}],
+        "max_recommendations": 5
+    }).json()
+    assert batch["results"][0]["recommendations"] == first["recommendations"]
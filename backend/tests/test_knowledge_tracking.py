@@ -0,0 +1,72 @@
+"""
+Knowledge tracker tests
+"""
+import numpy as np
+import pytest
+from scipy import sparse
+
+from app.services.knowledge_tracking import IRTKnowledgeTracker
+
+
+@pytest.fixture(scope="module")
+def tracker():
+    return IRTKnowledgeTracker()
+
+
+@pytest.fixture(scope="module")
+def scores(tracker):
+    rng = np.random.default_rng(7)
+    matrix = rng.uniform(0, 100, size=(25, len(tracker.course_names)))
+    matrix[rng.random(matrix.shape) < 0.8] = np.nan
+    matrix[3] = np.nan  # a student without any score
+    return matrix
+
+
+def test_batch_estimates_match_single_student(tracker, scores):
+    batch = tracker.estimate_knowledge_state_batch(scores)
+    assert len(batch) == scores.shape[0]
+    assert batch[3] == {}
+    for row, state in zip(scores, batch):
+        observed = {name: score for name, score in zip(tracker.course_names, row) if not np.isnan(score)}
+        single = tracker.estimate_knowledge_state(observed)
+        assert state.keys() == single.keys()
+        for domain, level in single.items():
+            assert state[domain] == pytest.approx(level)
+
+
+def test_sparse_input_and_chunking_do_not_change_estimates(tracker, scores):
+    theta, se = tracker.estimate_ability_matrix(scores)
+    observed = ~np.isnan(scores)
+    coo = sparse.coo_matrix((scores[observed], np.nonzero(observed)), shape=scores.shape)
+    for matrix, chunk_size in ((coo.tocsr(), 4096), (scores, 4)):
+        other_theta, other_se = tracker.estimate_ability_matrix(matrix, chunk_size=chunk_size)
+        np.testing.assert_allclose(other_theta, theta)
+        np.testing.assert_allclose(other_se, se)
+
+
+def test_columns_are_matched_by_course_name(tracker):
+    names = list(reversed(tracker.course_names[:3])) + ["不存在的课程"]
+    matrix = np.array([[90.0, 60.0, 30.0, 100.0]])
+    state = tracker.estimate_knowledge_state_batch(matrix, names)[0]
+    assert state == pytest.approx(tracker.estimate_knowledge_state(dict(zip(names[:3], [90.0, 60.0, 30.0]))))
+
+
+
+def test_per_row_methods(tracker, scores):
+    methods = ["eap", "mle"] * (scores.shape[0] // 2) + ["eap"]
+    theta, _ = tracker.estimate_ability_matrix(scores, method=methods)
+    eap, _ = tracker.estimate_ability_matrix(scores, method="eap")
+    mle, _ = tracker.estimate_ability_matrix(scores, method="mle")
+    expected = np.where(np.array(methods)[:, None] == "eap", eap, mle)
+    np.testing.assert_allclose(theta, expected)
+    with pytest.raises(ValueError):
+        tracker.estimate_ability_matrix(scores, method=["eap"])
+
+
+def test_mastery_spans_the_strength_and_weakness_thresholds(tracker):
+    low = tracker.estimate_knowledge_state({name: 0 for name in tracker.course_names})
+    high = tracker.estimate_knowledge_state({name: 100 for name in tracker.course_names})
+    _, _, weaknesses = tracker.analyze_knowledge_state(low)
+    _, strengths, _ = tracker.analyze_knowledge_state(high)
+    assert set(weaknesses) == set(low) == set(tracker.domains)
+    assert set(strengths) == set(high) == set(tracker.domains)
@@ -0,0 +1,83 @@
+"""
+Learning path planner tests
+"""
+import random
+
+import pytest
+
+from app.services.course_graph import CourseGraph
+from app.services.learning_path_planner import LearningPathPlanner
+from app.services.synthetic_data import generate_catalog
+
+
+@pytest.fixture(scope="module")
+def graph():
+    catalog = generate_catalog(400, seed=13)
+    return CourseGraph(catalog["courses"], catalog["relationships"], source="synthetic")
+
+
+@pytest.fixture(scope="module")
+def planner(graph):
+    return LearningPathPlanner(graph)
+
+
+def needed_courses(graph, target, completed):
+    """Target plus every transitive prerequisite not satisfied by a completed course"""
+    closure = graph.closure
+    satisfied = set(completed)
+    for course_id in completed:
+        satisfied.update(closure.ancestors(course_id))
+    return {target} | {c for c in closure.ancestors(target) if c not in satisfied}
+
+
+def check_schedule(graph, plan, max_credits):
+    semester_of = {c: s["semester"] for s in plan["semesters"] for c in s["course_ids"]}
+    for semester in plan["semesters"]:
+        assert semester["credits"] == pytest.approx(sum(graph.get(c)["credits"] for c in semester["course_ids"]))
+        assert semester["credits"] <= max_credits or len(semester["course_ids"]) == 1
+    for course_id, number in semester_of.items():
+        for prereq in graph.prerequisite_ids(course_id):
+            if prereq in semester_of:
+                assert semester_of[prereq] < number
+    return semester_of
+
+
+def test_plan_schedules_exactly_the_needed_courses(graph, planner):
+    rng = random.Random(2)
+    ids = graph.course_ids.tolist()
+    for target in ids[-15:]:
+        completed = rng.sample(ids[:200], 20)
+        plan = planner.plan([target], completed, 12.0)
+        semester_of = check_schedule(graph, plan, 12.0)
+        assert set(semester_of) == needed_courses(graph, target, completed)
+        assert semester_of[target] == len(plan["semesters"])
+        assert len(plan["sequence"]) == len(semester_of)
+
+
+def test_completed_target_is_kept(graph, planner):
+    target = graph.course_ids.tolist()[-1]
+    plan = planner.plan([target], [target], 20.0)
+    assert plan["sequence"] == [target]
+    assert plan["shared_prerequisites"] == []
+
+
+def test_unknown_target_plans_nothing(planner):
+    assert planner.plan([-1], [], 20.0)["semesters"] == []
+
+
+def test_multi_target_plan_is_the_union_of_single_plans(graph, planner):
+    rng = random.Random(4)
+    ids = graph.course_ids.tolist()
+    for _ in range(10):
+        targets = rng.sample(ids[-100:], 3)
+        completed = rng.sample(ids[:150], 15)
+        plan = planner.plan(targets, completed, 15.0)
+        semester_of = check_schedule(graph, plan, 15.0)
+
+        needed = [needed_courses(graph, target, completed) for target in targets]
+        assert set(semester_of) == set().union(*needed)
+        assert len(plan["sequence"]) == len(set(plan["sequence"]))
+
+        # Prerequisites needed by more than one target are planned once and reported
+        shared = {c for c in semester_of if sum(c in n for n in needed) > 1} - set(targets)
+        assert set(plan["shared_prerequisites"]) - set(targets) == shared
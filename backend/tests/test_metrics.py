@@ -0,0 +1,44 @@
+"""
+Metrics registry and endpoint tests
+"""
+from app.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.labels("/a").observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.65' in lines
+
+
+def test_labels_are_escaped_and_caches_are_collected():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("queries_total", "Queries", ("query",)))
+    counter.labels('say "hi"\n').inc(2)
+    registry.register_cache("paths", lambda: {"hits": 3, "misses": 1, "size": 2})
+
+    body = registry.render()
+    assert 'queries_total{query="say \\"hi\\"\\n"} 2' in body
+    assert 'smartpath_cache_hits_total{cache="paths"} 3' in body
+    assert 'smartpath_cache_size{cache="paths"} 2' in body
+    assert "smartpath_cache_evictions_total" not in body
+
+
+def test_scrapes_and_health_checks_are_not_recorded(client):
+    client.get("/health")
+    client.get("/metrics")
+    client.get("/api/courses/1")
+    client.get("/no/such/route")
+    body = client.get("/metrics").text
+
+    assert 'route="/api/courses/{course_id}"' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'route="/metrics"' not in body
+    assert 'route="/health"' not in body
@@ -0,0 +1,325 @@
+"""
+Neo4j driver wrapper tests, against in-memory stand-ins for the neo4j driver
+"""
+import asyncio
+
+import pytest
+
+from neo4j import READ_ACCESS, WRITE_ACCESS, GraphDatabase
+
+from app.config import settings
+from app.database.neo4j_driver import (
+    AsyncNeo4jDriver, Neo4jDriver, QueryResultCache, SlowQueryLog, driver_options
+)
+from app.services.course_graph import CourseGraph
+from app.services.course_service import CourseService
+
+
+class FakeRecord:
+    def __init__(self, data):
+        self._data = data
+
+    def data(self):
+        return dict(self._data)
+
+
+class FakeSummary:
+    class counters:
+        nodes_created = 1
+        relationships_created = 0
+        properties_set = 2
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def __iter__(self):
+        return (FakeRecord(row) for row in self._rows)
+
+    def consume(self):
+        return FakeSummary()
+
+
+class FakeTransaction:
+    def __init__(self, db):
+        self.db = db
+
+    def run(self, query, parameters):
+        self.db.queries.append((query, parameters))
+        return FakeResult(self.db.rows)
+
+
+class FakeSession:
+    def __init__(self, db, options):
+        self.db = db
+        self.options = options
+
+    def __enter__(self):
+        self.db.sessions.append(self.options)
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_read(self, work, *args):
+        self.db.transactions.append(("read", work))
+        return work(FakeTransaction(self.db), *args)
+
+    def execute_write(self, work, *args):
+        self.db.transactions.append(("write", work))
+        return work(FakeTransaction(self.db), *args)
+
+
+class FakeDriver:
+    """Sync neo4j driver stand-in returning ``rows`` for every query"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries, self.sessions, self.transactions = [], [], []
+
+    def session(self, **options):
+        return FakeSession(self, options)
+
+
+def connected_driver(rows=(), **kwargs):
+    db = Neo4jDriver("bolt://fake", "neo4j", "secret", **kwargs)
+    db._driver = FakeDriver(rows)
+    return db
+
+
+class FakeAsyncResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self._rows:
+            await asyncio.sleep(0)
+            yield FakeRecord(row)
+
+    async def consume(self):
+        return FakeSummary()
+
+
+class FakeAsyncTransaction:
+    def __init__(self, db):
+        self.db = db
+
+    async def run(self, query, parameters):
+        self.db.queries.append((query, parameters))
+        return FakeAsyncResult(self.db.rows)
+
+
+class FakeAsyncSession:
+    def __init__(self, db, options):
+        self.db = db
+        self.options = options
+
+    async def __aenter__(self):
+        self.db.sessions.append(self.options)
+        self.db.active += 1
+        self.db.peak_active = max(self.db.peak_active, self.db.active)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.db.active -= 1
+        return False
+
+    async def execute_read(self, work, *args):
+        self.db.transactions.append(("read", work))
+        return await work(FakeAsyncTransaction(self.db), *args)
+
+    async def execute_write(self, work, *args):
+        self.db.transactions.append(("write", work))
+        return await work(FakeAsyncTransaction(self.db), *args)
+
+
+class FakeAsyncDriver:
+    """Async neo4j driver stand-in returning ``rows`` for every query"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries, self.sessions, self.transactions = [], [], []
+        self.active = self.peak_active = 0
+
+    def session(self, **options):
+        return FakeAsyncSession(self, options)
+
+
+def connected_async_driver(rows=(), **kwargs):
+    db = AsyncNeo4jDriver("bolt://fake", "neo4j", "secret", **kwargs)
+    db._driver = FakeAsyncDriver(rows)
+    return db
+
+
+def test_async_driver_requires_connection():
+    db = AsyncNeo4jDriver("bolt://fake", "neo4j", "secret")
+    with pytest.raises(RuntimeError):
+        asyncio.run(db.execute_query("RETURN 1"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(db.execute_write("CREATE (n)"))
+
+
+def test_async_driver_returns_records():
+    db = connected_async_driver([{"id": 1}, {"id": 2}])
+    assert asyncio.run(db.execute_query("MATCH (c) RETURN c.id as id", {"x": 1})) == [{"id": 1}, {"id": 2}]
+    assert db._driver.queries == [("MATCH (c) RETURN c.id as id", {"x": 1})]
+
+
+def test_async_reads_run_concurrently():
+    db = connected_async_driver([{"id": i} for i in range(3)])
+
+    async def main():
+        return await asyncio.gather(*(db.execute_query(f"RETURN {i}") for i in range(5)))
+
+    results = asyncio.run(main())
+    assert all(records == [{"id": 0}, {"id": 1}, {"id": 2}] for records in results)
+    assert len(db._driver.queries) == 5
+    assert db._driver.peak_active > 1
+
+
+class UnusedSyncDriver:
+    _driver = object()
+
+    def execute_query(self, *args, **kwargs):
+        raise AssertionError("sync driver used while the async driver is connected")
+
+
+def test_course_service_prefers_the_async_driver():
+    db = connected_async_driver([
+        {"id": 5001, "label": "新课程", "difficulty": "中等", "credits": 3.0, "course_type": "选修",
+         "description": None, "knowledge_points": None, "prerequisites": [1]},
+    ])
+    service = CourseService(UnusedSyncDriver(), graph=CourseGraph.from_mock_data(), async_db=db)
+    courses = asyncio.run(service.get_courses_by_ids([1, 5001]))
+    assert set(courses) == {1, 5001}
+    assert db._driver.queries[0][1] == {"course_ids": [5001]}
+
+
+def test_driver_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "neo4j_max_connection_pool_size", 7)
+    monkeypatch.setattr(settings, "neo4j_connection_acquisition_timeout", 2.5)
+    monkeypatch.setattr(settings, "neo4j_fetch_size", 50)
+    options = driver_options()
+    assert options["max_connection_pool_size"] == 7
+    assert options["connection_acquisition_timeout"] == 2.5
+    assert options["fetch_size"] == 50
+
+    created = {}
+
+    class Driver:
+        def verify_connectivity(self):
+            pass
+
+    def fake_driver(uri, auth, **kwargs):
+        created.update(kwargs, uri=uri)
+        return Driver()
+
+    monkeypatch.setattr(GraphDatabase, "driver", fake_driver)
+    db = Neo4jDriver("bolt://fake", "neo4j", "secret")
+    db.connect()
+    assert db._driver is not None
+    assert created == {**options, "uri": "bolt://fake"}
+
+
+@pytest.mark.parametrize("connect", [connected_driver, connected_async_driver])
+def test_queries_run_in_managed_transactions(monkeypatch, connect):
+    monkeypatch.setattr(settings, "neo4j_transaction_timeout", 4.0)
+    monkeypatch.setattr(settings, "neo4j_database", "courses")
+    db = connect([{"id": 1}])
+
+    def run(result):
+        return asyncio.run(result) if asyncio.iscoroutine(result) else result
+
+    assert run(db.execute_query("MATCH (c) RETURN c.id as id")) == [{"id": 1}]
+    assert run(db.execute_write("CREATE (c:Course)")) == {
+        "nodes_created": 1, "relationships_created": 0, "properties_set": 2
+    }
+
+    fake = db._driver
+    assert [s["default_access_mode"] for s in fake.sessions] == [READ_ACCESS, WRITE_ACCESS]
+    assert all(s["database"] == "courses" for s in fake.sessions)
+    assert [kind for kind, _ in fake.transactions] == ["read", "write"]
+    assert all(work.timeout == 4.0 for _, work in fake.transactions)
+
+
+@pytest.mark.parametrize("connect", [connected_driver, connected_async_driver])
+def test_writes_invalidate_cached_reads(connect):
+    cache = QueryResultCache(max_size=16, ttl_seconds=0)
+    db = connect([{"id": 1}], cache=cache)
+
+    def run(result):
+        return asyncio.run(result) if asyncio.iscoroutine(result) else result
+
+    query = "MATCH (c:Course) RETURN c.id as id"
+    assert run(db.execute_query(query)) == [{"id": 1}]
+    db._driver.rows = [{"id": 2}]
+    cached = run(db.execute_query(query))
+    assert cached == [{"id": 1}] and len(db._driver.queries) == 1
+
+    # Callers may modify what they get back without touching the cache
+    cached[0]["id"] = 99
+    assert run(db.execute_query(query)) == [{"id": 1}]
+    assert run(db.execute_query(query, {"other": True})) == [{"id": 2}]
+    assert run(db.execute_query(query, use_cache=False)) == [{"id": 2}]
+
+    version = cache.graph_version
+    run(db.execute_write("CREATE (c:Course {id: 2})"))
+    assert cache.graph_version == version + 1
+    assert run(db.execute_query(query)) == [{"id": 2}]
+
+
+class FailingWriteSession(FakeSession):
+    def execute_write(self, work, *args):
+        raise RuntimeError("write failed")
+
+
+def test_failed_write_still_invalidates():
+    cache = QueryResultCache(max_size=16, ttl_seconds=0)
+    db = connected_driver([{"id": 1}], cache=cache)
+    db.execute_query("RETURN 1")
+
+    db._driver.session = lambda **options: FailingWriteSession(db._driver, options)
+    with pytest.raises(RuntimeError):
+        db.execute_write("CREATE (c)")
+    assert cache.graph_version == 1 and cache.stats()["size"] == 0
+
+
+def test_cache_key_is_parameter_order_independent():
+    cache = QueryResultCache(max_size=16, ttl_seconds=0)
+    assert cache.make_key("q", {"a": 1, "b": 2}) == cache.make_key("q", {"b": 2, "a": 1})
+    assert cache.make_key("q", {"a": 1}) != cache.make_key("q", {"a": 2})
+
+
+class FailingReadSession(FakeSession):
+    def execute_read(self, work, *args):
+        self.db.transactions.append(("read", work))
+        raise RuntimeError("read failed")
+
+
+def test_failed_slow_queries_are_logged_but_never_profiled():
+    log = SlowQueryLog(threshold_ms=1e-9, buffer_size=4, profile=True, sample_rate=1.0)
+    db = connected_driver(slow_queries=log)
+    db._driver.session = lambda **options: FailingReadSession(db._driver, options)
+    with pytest.raises(RuntimeError):
+        db.execute_query("MATCH (c:Course) RETURN c", name="all_courses")
+
+    entry, = log.snapshot()["slow_queries"]
+    assert entry["query_name"] == "all_courses" and entry["rows"] is None
+    assert entry["error"] == "RuntimeError: read failed"
+    # No PROFILE re-run was started for the failed query
+    assert len(db._driver.transactions) == 1
+    assert not log.start_profile(entry)
+
+
+def test_slow_query_log_keeps_only_queries_over_the_threshold():
+    log = SlowQueryLog(threshold_ms=100.0, buffer_size=2, profile=False, sample_rate=0.0)
+    assert log.observe("RETURN 1", "fast", {}, 0.05, 1, None, "read") is None
+    for i in range(3):
+        log.observe(f"RETURN {i}", f"slow_{i}", {"i": i}, 0.2, 1, None, "read")
+    snapshot = log.snapshot()
+    assert snapshot["total_slow_queries"] == 3
+    assert [q["query_name"] for q in snapshot["slow_queries"]] == ["slow_2", "slow_1"]
@@ -0,0 +1,60 @@
+"""
+Prerequisite closure tests
+"""
+import random
+
+import pytest
+
+from app.services.course_graph import CourseGraph
+from app.services.prerequisite_closure import PrerequisiteClosure
+from app.services.synthetic_data import generate_catalog
+
+
+def naive_reach(start, neighbours):
+    """Course IDs reachable from ``start`` by a plain recursive DFS"""
+    seen = set()
+
+    def visit(course_id):
+        for nxt in neighbours(course_id):
+            if nxt not in seen:
+                seen.add(nxt)
+                visit(nxt)
+
+    visit(start)
+    return sorted(seen)
+
+
+@pytest.fixture(scope="module", params=["demo", "synthetic"])
+def graph(request):
+    if request.param == "demo":
+        return CourseGraph.from_mock_data()
+    catalog = generate_catalog(300, seed=3)
+    return CourseGraph(catalog["courses"], catalog["relationships"], source="synthetic")
+
+
+def test_ancestors_and_descendants_match_naive_dfs(graph):
+    closure = PrerequisiteClosure(graph, cache_size=16)
+    for course_id in graph.course_ids.tolist() * 2:
+        assert closure.ancestors(course_id) == naive_reach(course_id, graph.prerequisite_ids)
+        assert closure.descendants(course_id) == naive_reach(course_id, graph.successor_ids)
+    assert closure.ancestors(-1) == [] and closure.descendants(-1) == []
+
+
+def test_missing_and_unlocked_against_satisfied_set(graph):
+    closure = graph.closure
+    rng = random.Random(5)
+    ids = graph.course_ids.tolist()
+    for _ in range(20):
+        completed = rng.sample(ids, 10)
+        satisfied = set(completed)
+        for course_id in completed:
+            satisfied.update(naive_reach(course_id, graph.prerequisite_ids))
+        mask = closure.satisfied_mask(completed)
+        assert closure._ids(mask) == sorted(satisfied)
+        assert closure.satisfied_mask(mask) == mask
+
+        for course_id in rng.sample(ids, 10):
+            ancestors = naive_reach(course_id, graph.prerequisite_ids)
+            assert closure.missing(course_id, mask) == [a for a in ancestors if a not in satisfied]
+            assert closure.is_unlocked(course_id, mask) == \
+                all(p in satisfied for p in graph.prerequisite_ids(course_id))
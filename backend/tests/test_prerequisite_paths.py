@@ -0,0 +1,62 @@
+"""
+Prerequisite path engine tests
+"""
+import pytest
+
+from app.services.course_graph import CourseGraph
+from app.services.prerequisite_paths import PrerequisitePathEngine, build_path_tree
+from app.services.synthetic_data import generate_catalog
+
+
+def enumerate_paths(graph, course_id, max_depth):
+    """All prerequisite paths into a course, shortest first, by brute force"""
+    paths, level = [], [[course_id]]
+    for _ in range(max_depth):
+        level = [[prereq] + path for path in level for prereq in graph.prerequisite_ids(path[0])]
+        paths.extend(level)
+    return paths
+
+
+@pytest.fixture(scope="module")
+def graph():
+    catalog = generate_catalog(200, n_layers=5, avg_prerequisites=2.5, seed=11)
+    return CourseGraph(catalog["courses"], catalog["relationships"], source="synthetic")
+
+
+def test_paths_and_counts_match_enumeration(graph):
+    for course_id in graph.course_ids.tolist()[-20:]:
+        expected = enumerate_paths(graph, course_id, 4)
+        engine = PrerequisitePathEngine(graph, course_id, max_depth=4)
+        paths = list(engine.iter_paths())
+        assert engine.count() == len(expected)
+        assert sorted(paths) == sorted(expected)
+        assert [len(p) for p in paths] == sorted(len(p) for p in paths)
+
+
+def test_any_page_equals_a_slice(graph):
+    course_id = graph.course_ids.tolist()[-1]
+    engine = PrerequisitePathEngine(graph, course_id, max_depth=4)
+    paths = list(engine.iter_paths())
+    for offset in (0, 1, 7, len(paths) - 1, len(paths), len(paths) + 5):
+        assert engine.page(offset, 5) == paths[offset:offset + 5]
+        assert list(engine.iter_paths(offset)) == paths[offset:]
+    assert engine.page(0, 0) == []
+
+
+def test_path_tree_holds_every_path(graph):
+    course_id = graph.course_ids.tolist()[-1]
+    paths = PrerequisitePathEngine(graph, course_id, max_depth=3).page(0, 50)
+    tree = build_path_tree(paths, {})
+
+    found = []
+
+    def walk(node, suffix):
+        path = [node["id"]] + suffix
+        if node["is_path"]:
+            found.append(path)
+        for child in node["children"]:
+            walk(child, path)
+
+    walk(tree, [])
+    assert sorted(found) == sorted(paths)
+    assert build_path_tree([], {}) is None
@@ -0,0 +1,133 @@
+"""
+Recommendation scorer tests
+"""
+import numpy as np
+import pytest
+
+from app.services.course_graph import CourseGraph
+from app.services.knowledge_tracking import get_knowledge_tracker
+from app.services.recommendation import RecommendationCache, RecommendationScorer, input_seed
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return CourseGraph.from_mock_data()
+
+
+@pytest.fixture(scope="module")
+def scorer(graph):
+    return RecommendationScorer(graph, get_knowledge_tracker())
+
+
+def reference_recommend(graph, tracker, knowledge_state, completed, k):
+    """Per-course loop of the original /recommend endpoint, with the scorer's seeded jitter"""
+    completed = set(completed)
+    jitter = np.random.default_rng(input_seed(knowledge_state, completed)).uniform(-0.03, 0.03, size=len(graph))
+    scored = []
+    for idx, course in enumerate(graph.courses):
+        if course["id"] in completed:
+            continue
+        missing = [p for p in graph.prerequisite_ids(course["id"]) if p not in completed]
+        difficulty, _ = tracker.calculate_course_difficulty_for_student(course["label"], knowledge_state)
+
+        prereq = 0.35 if not missing else max(0.0, 0.35 - min(0.35, len(missing) * 0.12))
+
+        r = 1.0 - difficulty
+        if r > 0.85:
+            readiness = 0.40 * (0.5 + 0.5 * (1 - r) / 0.15)
+        elif r >= 0.6:
+            readiness = 0.40
+        elif r >= 0.4:
+            readiness = 0.40 * (0.6 + 0.4 * (r - 0.4) / 0.2)
+        elif r >= 0.25:
+            readiness = 0.40 * (0.3 + 0.3 * (r - 0.25) / 0.15)
+        else:
+            readiness = 0.40 * (0.3 * r / 0.25)
+
+        d = difficulty
+        if 0.3 <= d <= 0.5:
+            challenge = 0.25
+        elif 0.2 <= d < 0.3 or 0.5 < d <= 0.6:
+            challenge = 0.20
+        elif 0.1 <= d < 0.2 or 0.6 < d <= 0.7:
+            challenge = 0.15
+        elif d < 0.1:
+            challenge = 0.08
+        elif d <= 0.8:
+            challenge = 0.10
+        else:
+            challenge = 0.05
+
+        score = max(0.0, min(1.0, prereq + readiness + challenge + jitter[idx]))
+        score = 0.6 + (score - 0.5) * 0.7 if score >= 0.5 else 0.3 + score * 0.6
+        scored.append((course["id"], score, sorted(missing)))
+
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:k]
+
+
+STUDENTS = [
+    ({"数学基础": 0.8, "编程基础": 0.6}, [1, 29]),
+    ({"数学基础": 0.2}, []),
+    ({}, [1, 29, 33]),
+]
+
+
+@pytest.mark.parametrize("knowledge_state,completed", STUDENTS)
+def test_top_k_matches_per_course_scorer(graph, scorer, knowledge_state, completed):
+    expected = reference_recommend(graph, scorer.tracker, knowledge_state, completed, 10)
+    actual = scorer.recommend(knowledge_state, completed, 10)
+
+    assert [item["course_id"] for item in actual] == [course_id for course_id, _, _ in expected]
+    for item, (_, score, missing) in zip(actual, expected):
+        assert item["match_score"] == pytest.approx(score)
+        assert item["missing_prerequisites"] == missing
+        assert item["prerequisites_met"] == (not missing)
+
+
+def test_completed_courses_are_never_recommended(graph, scorer):
+    completed = graph.course_ids[: len(graph) - 3].tolist()
+    results = scorer.recommend({"数学基础": 0.5}, completed, len(graph))
+    assert sorted(item["course_id"] for item in results) == sorted(graph.course_ids[-3:].tolist())
+
+
+def test_batch_matches_single_for_any_chunk_size(graph, scorer):
+    states = [state for state, _ in STUDENTS] * 2
+    completed = [done for _, done in STUDENTS] * 2
+    single = [scorer.recommend(state, done, 8) for state, done in zip(states, completed)]
+    for max_cells in (1, len(graph) * 2, None):
+        assert scorer.recommend_batch(states, completed, 8, max_cells=max_cells) == single
+
+
+def test_missing_counts_match_direct_prerequisites(graph, scorer):
+    completed = scorer.completed_matrix([[], [1, 29, 33], graph.course_ids.tolist()])
+    counts = scorer.missing_counts(completed)
+    for s, done in enumerate(completed):
+        for idx in range(len(graph)):
+            prereqs = graph.prerequisite_indices(idx)
+            assert counts[s, idx] == np.count_nonzero(~done[prereqs])
+
+
+def test_cached_result_is_a_function_of_its_key(scorer):
+    cache = RecommendationCache(max_size=10, ttl_seconds=0, quantum=0.05)
+    calls = []
+
+    def compute(knowledge_state, completed_courses):
+        calls.append((knowledge_state, completed_courses))
+        return scorer.recommend(knowledge_state, completed_courses, 5)
+
+    first = cache.get_or_compute(scorer, {"数学基础": 0.612}, [29, 1], 5, compute)
+    second = cache.get_or_compute(scorer, {"数学基础": 0.588}, [1, 29, 1], 5, compute)
+    assert second == first and len(calls) == 1
+    assert calls[0] == ({"数学基础": pytest.approx(0.6)}, [1, 29])
+
+    # Computing without the cache gives the same result from either state
+    uncached = RecommendationCache(max_size=0, ttl_seconds=0, quantum=0.05)
+    assert uncached.get_or_compute(scorer, {"数学基础": 0.588}, [1, 29], 5, compute) == first
+
+
+def test_cache_is_cleared_when_the_catalog_changes(graph, scorer):
+    cache = RecommendationCache(max_size=10, ttl_seconds=0, quantum=0.05)
+    cache.get_or_compute(scorer, {"数学基础": 0.5}, [], 5, lambda state, done: ["old"])
+    other = RecommendationScorer(CourseGraph(graph.courses[:-1], []), scorer.tracker)
+    assert cache.get_or_compute(other, {"数学基础": 0.5}, [], 5, lambda state, done: ["new"]) == ["new"]
@@ -0,0 +1,37 @@
+"""
+Synthetic catalog and score generator tests
+"""
+import numpy as np
+
+from app.services.course_graph import CourseGraph
+from app.services.synthetic_data import generate_catalog, generate_scores
+
+
+def test_catalog_is_deterministic_for_a_seed():
+    assert generate_catalog(400, seed=7) == generate_catalog(400, seed=7)
+    assert generate_catalog(400, seed=7) != generate_catalog(400, seed=8)
+
+
+def test_catalog_is_a_layered_dag():
+    catalog = generate_catalog(600, seed=3)
+    starts = np.concatenate(([0], np.cumsum(catalog["layers"])))
+    layer = np.searchsorted(starts, np.arange(600), side="right") - 1
+    assert [c["id"] for c in catalog["courses"]] == list(range(1, 601))
+    for rel in catalog["relationships"]:
+        assert layer[rel["from"] - 1] < layer[rel["to"] - 1]
+    graph = CourseGraph(catalog["courses"], catalog["relationships"], source="synthetic")
+    assert len(graph) == 600
+
+
+def test_scores_are_deterministic_for_a_seed():
+    catalog = generate_catalog(300, seed=1)
+    first = generate_scores(catalog, 200, n_courses=80, seed=5)
+    second = generate_scores(catalog, 200, n_courses=80, seed=5)
+    other = generate_scores(catalog, 200, n_courses=80, seed=6)
+
+    np.testing.assert_array_equal(first["scores"], second["scores"])
+    assert first["courses"] == second["courses"]
+    assert not np.array_equal(first["scores"], other["scores"], equal_nan=True)
+
+    observed = first["scores"][~np.isnan(first["scores"])]
+    assert observed.size and observed.min() >= 0 and observed.max() <= 100